@@ -0,0 +1,57 @@
+"""
+Wall time of the bulk Graph paths with a default FacebookAPI() (default
+throttle included): insights for many posts one at a time versus multi-id
+`insights?ids=` reads, and bulk comment hiding through batch requests.
+
+    python benchmarks/bulk_bench.py --posts 200 --comments 2000 --latency 0.05
+
+Runs against a local stub server that sleeps `--latency` seconds per request.
+"""
+import argparse
+import json
+import time
+
+from stub_graph import StubGraphServer
+from facebook_api import FacebookAPI
+from token_registry import TokenRegistry
+
+
+def _responder(method: str, path: str, query: dict[str, list[str]]):
+    if "batch" in query:
+        return [{"code": 200, "body": json.dumps({"success": True})} for _ in json.loads(query["batch"][0])]
+    if "ids" in query:
+        return {post_id: {"data": []} for post_id in query["ids"][0].split(",")}
+    return {"data": []}
+
+
+def _timed(stub: StubGraphServer, fn) -> dict[str, float]:
+    requests_before = stub.requests
+    start = time.perf_counter()
+    fn()
+    return {"seconds": round(time.perf_counter() - start, 3), "requests": stub.requests - requests_before}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=200)
+    parser.add_argument("--comments", type=int, default=2000)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    post_ids = [f"123_{i}" for i in range(args.posts)]
+    comment_ids = [f"123_1_{i}" for i in range(args.comments)]
+    with StubGraphServer(_responder, latency=args.latency) as stub:
+        api = FacebookAPI(base_url=stub.base_url, tokens=TokenRegistry(None, "123", "x"))
+        results = {
+            "insights_one_by_one": _timed(
+                stub, lambda: [api.get_bulk_insights(post_id, ["post_clicks"]) for post_id in post_ids]
+            ),
+            "insights_multi_id": _timed(stub, lambda: api.get_posts_insights(post_ids, ["post_clicks"])),
+            "hide_comments_batched": _timed(stub, lambda: api.hide_comments(comment_ids)),
+        }
+
+    print(json.dumps({"posts": args.posts, "comments": args.comments, "latency": args.latency, **results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
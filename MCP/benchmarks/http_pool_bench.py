@@ -0,0 +1,66 @@
+"""
+Per-call latency of Graph requests with a fresh connection per call (the old
+`requests.request` path) versus the pooled keep-alive FacebookAPI session.
+
+    python benchmarks/http_pool_bench.py --calls 500
+
+Runs against a local stub server, so the gap shown is TCP setup only; against
+graph.facebook.com the unpooled path additionally pays a TLS handshake per call.
+"""
+import argparse
+import json
+import statistics
+import time
+
+import requests
+
+from stub_graph import StubGraphServer
+from facebook_api import FacebookAPI
+from throttle import Throttle
+from token_registry import TokenRegistry
+
+
+def _measure(fn, calls: int) -> dict[str, float]:
+    samples = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "mean_ms": round(statistics.fmean(samples), 3),
+        "p50_ms": round(samples[len(samples) // 2], 3),
+        "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=500)
+    args = parser.parse_args()
+
+    with StubGraphServer() as stub:
+        url = f"{stub.base_url}/123"
+
+        def unpooled():
+            requests.request("GET", url, params={"fields": "fan_count", "access_token": "x"}).json()
+
+        before_conns = stub.connections
+        before = _measure(unpooled, args.calls)
+        before["connections"] = stub.connections - before_conns
+
+        # No throttling: this measures transport latency only.
+        api = FacebookAPI(
+            base_url=stub.base_url,
+            tokens=TokenRegistry(None, "123", "x"),
+            throttle=Throttle(rate=float("inf"), burst=float("inf")),
+        )
+        before_conns = stub.connections
+        after = _measure(lambda: api._request("GET", "123", {"fields": "fan_count"}), args.calls)
+        after["connections"] = stub.connections - before_conns
+
+    print(json.dumps({"calls": args.calls, "unpooled": before, "pooled": after}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Keyword moderation over a large comment set: the old per-comment
+`any(k in message.lower() for k in keywords)` loop versus the compiled
+KeywordMatcher (one trie-shaped regex over diacritic-folded text).
+
+    python benchmarks/moderation_bench.py --comments 100000 --keywords 400
+
+Comments are synthetic Romanian/English text with diacritics; the keyword
+list is the built-in one padded with generated terms up to --keywords. The
+two approaches flag different sets (substring vs whole word, diacritics), so
+both counts are reported.
+"""
+import argparse
+import json
+import random
+import time
+
+import stub_graph  # noqa: F401  (puts the server modules on sys.path)
+from moderation import DEFAULT_KEYWORDS, KeywordMatcher, flag_comments
+
+WORDS = (
+    "livrare rapidă produs calitate mulțumesc super recomand comanda preț bun magazin "
+    "colet ajuns azi mâine frumos mărime culoare întârziată țeapă prost groaznică "
+    "great service fast delivery thanks love it bad terrible quality price"
+).split()
+
+
+def _comments(count: int, rng: random.Random) -> list[dict[str, str]]:
+    return [
+        {"id": f"c{i}", "message": " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 25)))}
+        for i in range(count)
+    ]
+
+
+def _keywords(count: int, rng: random.Random) -> list[str]:
+    terms = [t for lang_terms in DEFAULT_KEYWORDS.values() for t in lang_terms]
+    letters = "abcdefghijklmnopqrstuvwxyzăâîșț"
+    while len(terms) < count:
+        terms.append("".join(rng.choice(letters) for _ in range(rng.randint(4, 10))))
+    return terms
+
+
+def _timed(fn) -> tuple[float, int]:
+    start = time.perf_counter()
+    flagged = fn()
+    return time.perf_counter() - start, flagged
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--comments", type=int, default=100_000)
+    parser.add_argument("--keywords", type=int, default=400)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    comments = _comments(args.comments, rng)
+    keywords = _keywords(args.keywords, rng)
+    plain = [k.rstrip("*") for k in keywords]
+
+    naive_s, naive_flagged = _timed(
+        lambda: sum(1 for c in comments if any(k in c.get("message", "").lower() for k in plain))
+    )
+    build_start = time.perf_counter()
+    matcher = KeywordMatcher(keywords)
+    build_s = time.perf_counter() - build_start
+    compiled_s, compiled_flagged = _timed(lambda: sum(1 for _ in flag_comments(comments, matcher)))
+
+    print(json.dumps({
+        "comments": args.comments,
+        "keywords": len(matcher),
+        "naive": {
+            "seconds": round(naive_s, 3),
+            "comments_per_second": round(args.comments / naive_s),
+            "flagged": naive_flagged,
+        },
+        "compiled": {
+            "build_ms": round(build_s * 1000, 2),
+            "seconds": round(compiled_s, 3),
+            "comments_per_second": round(args.comments / compiled_s),
+            "flagged": compiled_flagged,
+        },
+        "speedup": round(naive_s / compiled_s, 1),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
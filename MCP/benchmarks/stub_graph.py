@@ -0,0 +1,80 @@
+"""Local stand-in for the Graph API used by the benchmarks (no network needed).
+
+Responders get (method, path, params); form-encoded POST bodies are merged
+into params.
+"""
+import json
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlparse
+
+# Benchmarks import the server modules the same way server.py does.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+Responder = Callable[[str, str, dict[str, list[str]]], Any]
+
+
+def default_responder(method: str, path: str, query: dict[str, list[str]]) -> Any:
+    return {"id": path.strip("/").split("/")[-1] or "root", "fan_count": 42, "success": True}
+
+
+class StubGraphServer:
+    """HTTP/1.1 keep-alive server answering every request via `responder`."""
+
+    def __init__(self, responder: Responder = default_responder, latency: float = 0.0):
+        self.responder = responder
+        self.latency = latency
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; avoid Nagle/delayed-ACK stalls.
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with stub._lock:
+                    stub.connections += 1
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if self.headers.get("Content-Type", "").startswith("application/x-www-form-urlencoded"):
+                    query.update(parse_qs(body.decode("utf-8")))
+                with stub._lock:
+                    stub.requests += 1
+                if stub.latency:
+                    time.sleep(stub.latency)
+                body = json.dumps(stub.responder(self.command, url.path, query)).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = do_DELETE = _handle
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v22.0"
+
+    def __enter__(self) -> "StubGraphServer":
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
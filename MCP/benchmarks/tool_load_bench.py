@@ -0,0 +1,109 @@
+"""
+Throughput of concurrent MCP tool calls: the async tool handlers in server.py
+versus the same tools registered as plain sync functions (the old handlers,
+which run on the event loop and so serve one Graph round-trip at a time).
+
+    python benchmarks/tool_load_bench.py --calls 200 --latency 0.05 --concurrency 1 10 50
+
+Tools are invoked through FastMCP.call_tool, so argument validation and result
+conversion are included. The stub Graph server adds `--latency` seconds to every
+request; uncached tools (posts, comments, publishing) are mixed round-robin.
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from mcp.server.fastmcp import FastMCP
+
+from stub_graph import StubGraphServer
+import server
+from facebook_api import FacebookAPI
+from throttle import Throttle
+from token_registry import TokenRegistry
+
+CALLS = [
+    ("get_page_posts", {}),
+    ("get_post_comments", {"post_id": "123_1"}),
+    ("post_to_facebook", {"message": "hello"}),
+]
+
+
+def _responder(method: str, path: str, query: dict[str, list[str]]):
+    if method == "POST":
+        return {"id": "123_99"}
+    return {"data": [{"id": "123_1", "message": "hi"}]}
+
+
+def _sync_mcp() -> FastMCP:
+    sync = FastMCP("FacebookMCPSync")
+
+    @sync.tool()
+    def get_page_posts(page_id: str | None = None):
+        return server.manager.get_page_posts(page_id=page_id)
+
+    @sync.tool()
+    def get_post_comments(post_id: str, page_id: str | None = None):
+        return server.manager.get_post_comments(post_id, page_id=page_id)
+
+    @sync.tool()
+    def post_to_facebook(message: str, page_id: str | None = None):
+        return server.manager.post_to_facebook(message, page_id=page_id)
+
+    return sync
+
+
+async def _load(mcp: FastMCP, calls: int, concurrency: int) -> dict[str, float]:
+    gate = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(i: int) -> None:
+        name, arguments = CALLS[i % len(CALLS)]
+        async with gate:
+            start = time.perf_counter()
+            await mcp.call_tool(name, arguments)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "calls_per_second": round(calls / elapsed, 1),
+        "p50_ms": round(latencies[len(latencies) // 2], 3),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub Graph latency per request (seconds)")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 10, 50])
+    args = parser.parse_args()
+
+    results = {}
+    with StubGraphServer(_responder, latency=args.latency) as stub:
+        # No throttling: this measures how many Graph round-trips overlap.
+        server.manager.api = FacebookAPI(
+            base_url=stub.base_url,
+            tokens=TokenRegistry(None, "123", "x"),
+            throttle=Throttle(rate=float("inf"), burst=float("inf")),
+        )
+        sync_mcp = _sync_mcp()
+        for concurrency in args.concurrency:
+            results[str(concurrency)] = {
+                "sync_tools": asyncio.run(_load(sync_mcp, args.calls, concurrency)),
+                "async_tools": asyncio.run(_load(server.mcp, args.calls, concurrency)),
+            }
+
+    print(json.dumps({
+        "calls": args.calls,
+        "latency_s": args.latency,
+        "tool_concurrency": server.TOOL_CONCURRENCY,
+        "by_concurrency": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
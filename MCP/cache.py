@@ -0,0 +1,94 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Iterable
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry TTLs.
+
+    Bounded both by entry count and by an approximate byte size (length of the
+    JSON encoding). Entries carry tags so writes can invalidate everything
+    derived from one post or from the comments of a page.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 8_000_000, clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, int, Any, frozenset[str]]] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "invalidations": 0}
+
+    def get(self, key: Hashable) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return False, None
+            expires_at, _, value, _ = entry
+            if expires_at <= self.clock():
+                self._drop(key)
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return False, None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return True, value
+
+    def set(self, key: Hashable, value: Any, ttl: float, tags: Iterable[str] = ()) -> None:
+        if ttl <= 0:
+            return
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (self.clock() + ttl, size, value, frozenset(tags))
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats["evictions"] += 1
+
+    def get_or_load(self, key: Hashable, ttl: float, loader: Callable[[], Any], tags: Iterable[str] = ()) -> Any:
+        """Return the cached value or call `loader`. Graph error payloads are not cached."""
+        hit, value = self.get(key)
+        if hit:
+            return value
+        value = loader()
+        if not (isinstance(value, dict) and "error" in value):
+            self.set(key, value, ttl, tags)
+        return value
+
+    def invalidate(self, tag: str) -> int:
+        with self._lock:
+            keys = [k for k, entry in self._entries.items() if tag in entry[3]]
+            for key in keys:
+                self._drop(key)
+            self._stats["invalidations"] += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hit_ratio": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+    def _drop(self, key: Hashable) -> None:
+        _, size, _, _ = self._entries.pop(key)
+        self._bytes -= size
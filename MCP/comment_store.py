@@ -0,0 +1,142 @@
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+from commenter_stats import graph_time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS comments (
+    comment_id TEXT PRIMARY KEY,
+    page_id TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    user_id TEXT,
+    user_name TEXT,
+    message TEXT,
+    created_time TEXT NOT NULL,
+    fetched_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS comments_post_time ON comments (post_id, created_time);
+
+CREATE TABLE IF NOT EXISTS comment_sync (
+    post_id TEXT PRIMARY KEY,
+    page_id TEXT NOT NULL,
+    last_created_time TEXT,
+    synced_at TEXT NOT NULL
+);
+"""
+
+
+def parse_graph_time(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%dT%H:%M:%S%z")
+
+
+class CommentStore:
+    """Local copy of post comments, kept current by delta syncs.
+
+    `last_created_time` per post is the newest comment seen by a sync; the
+    next sync asks Graph only for comments created after it (minus an overlap window, so
+    recent edits are picked up too) and upserts them. Comments deleted on
+    Facebook by someone else stay until a full resync of the post.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        # Tools run on worker threads: one shared connection, serialized by a lock.
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def sync_state(self, post_id: str) -> tuple[str | None, str | None]:
+        """(last_created_time, synced_at) for a post; (None, None) if never synced."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT last_created_time, synced_at FROM comment_sync WHERE post_id = ?", (post_id,)
+            ).fetchone()
+        return (row[0], row[1]) if row else (None, None)
+
+    def upsert(
+        self, page_id: str, post_id: str, comments: Iterable[dict[str, Any]], synced: bool = False
+    ) -> tuple[list[dict[str, Any]], int]:
+        """Store comments of one post. Returns (comments not stored before, number of edited ones).
+        `synced=True` marks a completed Graph sync and advances the post's mark; comments
+        stored without it (e.g. pushed by webhooks) never move the mark, so a later sync
+        cannot skip comments that were missed."""
+        new: list[dict[str, Any]] = []
+        edited = 0
+        newest = None
+        now = graph_time(datetime.now(timezone.utc))
+        with self._lock, self.conn:
+            for comment in comments:
+                created = comment.get("created_time")
+                if not created:
+                    continue
+                newest = max(newest or created, created)
+                author = comment.get("from") or {}
+                row = self.conn.execute(
+                    "SELECT message FROM comments WHERE comment_id = ?", (comment["id"],)
+                ).fetchone()
+                if row is None:
+                    new.append(comment)
+                elif row[0] != comment.get("message"):
+                    edited += 1
+                self.conn.execute(
+                    "INSERT INTO comments (comment_id, page_id, post_id, user_id, user_name, message, created_time, fetched_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT (comment_id) DO UPDATE SET message = excluded.message, "
+                    "user_name = COALESCE(excluded.user_name, user_name), fetched_at = excluded.fetched_at",
+                    (comment["id"], page_id, post_id, author.get("id"), author.get("name"),
+                     comment.get("message"), created, now),
+                )
+            if synced:
+                self.conn.execute(
+                    "INSERT INTO comment_sync (post_id, page_id, last_created_time, synced_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (post_id) DO UPDATE SET synced_at = excluded.synced_at, "
+                    "last_created_time = CASE WHEN last_created_time IS NULL "
+                    "OR excluded.last_created_time > last_created_time "
+                    "THEN excluded.last_created_time ELSE last_created_time END",
+                    (post_id, page_id, newest, now),
+                )
+        return new, edited
+
+    def remove(self, comment_id: str) -> bool:
+        with self._lock, self.conn:
+            cur = self.conn.execute("DELETE FROM comments WHERE comment_id = ?", (comment_id,))
+        return cur.rowcount > 0
+
+    def clear_post(self, post_id: str) -> None:
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM comments WHERE post_id = ?", (post_id,))
+            self.conn.execute("DELETE FROM comment_sync WHERE post_id = ?", (post_id,))
+
+    def comments(self, post_id: str) -> list[dict[str, Any]]:
+        """A post's stored comments, oldest first, in Graph's comment shape."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT comment_id, message, user_id, user_name, created_time FROM comments "
+                "WHERE post_id = ? ORDER BY created_time, comment_id",
+                (post_id,),
+            ).fetchall()
+        out = []
+        for comment_id, message, user_id, user_name, created in rows:
+            comment = {"id": comment_id, "message": message, "created_time": created}
+            if user_id:
+                comment["from"] = {"id": user_id, "name": user_name}
+            out.append(comment)
+        return out
+
+    def count(self, post_id: str) -> int:
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM comments WHERE post_id = ?", (post_id,)).fetchone()[0]
+
+    def top_commenters(self, post_id: str) -> list[dict[str, Any]]:
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT user_id, COUNT(*) AS n FROM comments WHERE post_id = ? AND user_id IS NOT NULL "
+                "GROUP BY user_id ORDER BY n DESC, user_id",
+                (post_id,),
+            ).fetchall()
+        return [{"user_id": user_id, "count": count} for user_id, count in rows]
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,151 @@
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS commenter_events (
+    comment_id TEXT PRIMARY KEY,
+    page_id TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    created_time TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS commenter_events_page_time ON commenter_events (page_id, created_time);
+
+CREATE TABLE IF NOT EXISTS commenter_counts (
+    page_id TEXT NOT NULL,
+    user_id TEXT NOT NULL,
+    user_name TEXT,
+    count INTEGER NOT NULL,
+    last_comment_time TEXT NOT NULL,
+    PRIMARY KEY (page_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS commenter_counts_top ON commenter_counts (page_id, count DESC);
+
+CREATE TABLE IF NOT EXISTS commenter_marks (
+    page_id TEXT PRIMARY KEY,
+    last_created_time TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+# commenter_marks used to be keyed on (page_id, post_id), with '' as the only post_id ever written.
+MIGRATE_MARKS = """
+ALTER TABLE commenter_marks RENAME TO commenter_marks_old;
+CREATE TABLE commenter_marks (
+    page_id TEXT PRIMARY KEY,
+    last_created_time TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+INSERT INTO commenter_marks (page_id, last_created_time, updated_at)
+    SELECT page_id, last_created_time, updated_at FROM commenter_marks_old WHERE post_id = '';
+DROP TABLE commenter_marks_old;
+"""
+
+
+def graph_time(moment: datetime) -> str:
+    """Graph's created_time format ("2025-01-31T09:30:00+0000"); sorts as text."""
+    return moment.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S+0000")
+
+
+class CommenterStats:
+    """Per-page commenter counts kept in SQLite and updated incrementally.
+
+    Fed with the new comments of each comment-store sync (see comment_store.py,
+    which keeps the per-post high-water marks). Every comment is recorded once
+    (by comment id), so re-reading a comment never double-counts it;
+    commenter_marks holds the newest created_time counted per page. Queries
+    never call Graph.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        # Tools run on worker threads: one shared connection, serialized by a lock.
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript(SCHEMA)
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(commenter_marks)")}
+        if "post_id" in columns:
+            self.conn.executescript(MIGRATE_MARKS)
+        self._lock = threading.Lock()
+
+    def add(self, page_id: str, post_id: str, comments: Iterable[dict[str, Any]]) -> int:
+        """Record comments of one post and advance the page mark. Returns how many were new."""
+        added = 0
+        newest = None
+        with self._lock, self.conn:
+            for comment in comments:
+                created = comment.get("created_time")
+                author = comment.get("from") or {}
+                if not created:
+                    continue
+                newest = max(newest or created, created)
+                if not author.get("id"):
+                    continue  # Graph omits the author for users who haven't authorized the app
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO commenter_events (comment_id, page_id, post_id, user_id, created_time) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (comment["id"], page_id, post_id, author["id"], created),
+                )
+                if cur.rowcount == 0:
+                    continue
+                added += 1
+                self.conn.execute(
+                    "INSERT INTO commenter_counts (page_id, user_id, user_name, count, last_comment_time) "
+                    "VALUES (?, ?, ?, 1, ?) "
+                    "ON CONFLICT (page_id, user_id) DO UPDATE SET count = count + 1, "
+                    "user_name = COALESCE(excluded.user_name, user_name), "
+                    "last_comment_time = MAX(last_comment_time, excluded.last_comment_time)",
+                    (page_id, author["id"], author.get("name"), created),
+                )
+            if newest:
+                now = graph_time(datetime.now(timezone.utc))
+                self.conn.execute(
+                    "INSERT INTO commenter_marks (page_id, last_created_time, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT (page_id) DO UPDATE SET "
+                    "last_created_time = MAX(last_created_time, excluded.last_created_time), "
+                    "updated_at = excluded.updated_at",
+                    (page_id, newest, now),
+                )
+        return added
+
+    def top(self, page_id: str, limit: int = 10, since: datetime | None = None) -> list[dict[str, Any]]:
+        """Top commenters of a page, overall or for comments created since `since`."""
+        with self._lock:
+            if since is None:
+                rows = self.conn.execute(
+                    "SELECT user_id, user_name, count, last_comment_time FROM commenter_counts "
+                    "WHERE page_id = ? ORDER BY count DESC, user_id LIMIT ?",
+                    (page_id, limit),
+                ).fetchall()
+            else:
+                rows = self.conn.execute(
+                    "SELECT e.user_id, c.user_name, COUNT(*) AS n, MAX(e.created_time) "
+                    "FROM commenter_events e LEFT JOIN commenter_counts c "
+                    "ON c.page_id = e.page_id AND c.user_id = e.user_id "
+                    "WHERE e.page_id = ? AND e.created_time >= ? "
+                    "GROUP BY e.user_id ORDER BY n DESC, e.user_id LIMIT ?",
+                    (page_id, graph_time(since), limit),
+                ).fetchall()
+        return [
+            {"user_id": user_id, "name": name, "count": count, "last_comment_time": last}
+            for user_id, name, count, last in rows
+        ]
+
+    def summary(self, page_id: str) -> dict[str, Any]:
+        with self._lock:
+            comments, commenters = self.conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT user_id) FROM commenter_events WHERE page_id = ?", (page_id,)
+            ).fetchone()
+            row = self.conn.execute(
+                "SELECT last_created_time, updated_at FROM commenter_marks WHERE page_id = ?", (page_id,)
+            ).fetchone()
+        return {
+            "comments": comments,
+            "commenters": commenters,
+            "last_comment_time": row[0] if row else None,
+            "updated_at": row[1] if row else None,
+        }
+
+    def close(self) -> None:
+        self.conn.close()
@@ -8,3 +8,62 @@ GRAPH_API_VERSION = "v22.0"
 PAGE_ACCESS_TOKEN = os.getenv("FACEBOOK_ACCESS_TOKEN")
 PAGE_ID = os.getenv("FACEBOOK_PAGE_ID")
 GRAPH_API_BASE_URL = f"https://graph.facebook.com/{GRAPH_API_VERSION}"
+
+# Multi-page: token store written by Refresh_Token (all pages from /me/accounts).
+# FACEBOOK_PAGE_ID / FACEBOOK_ACCESS_TOKEN stay the default page and fallback token.
+FACEBOOK_TOKEN_STORE = os.getenv("FACEBOOK_TOKEN_STORE")
+
+# HTTP transport (pooled keep-alive session shared by all Graph calls)
+HTTP_POOL_SIZE = int(os.getenv("FACEBOOK_HTTP_POOL_SIZE", "10"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("FACEBOOK_HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_READ_TIMEOUT = float(os.getenv("FACEBOOK_HTTP_READ_TIMEOUT", "30"))
+HTTP_MAX_RETRIES = int(os.getenv("FACEBOOK_HTTP_MAX_RETRIES", "2"))
+TOOL_CONCURRENCY = int(os.getenv("FACEBOOK_TOOL_CONCURRENCY", str(HTTP_POOL_SIZE)))  # tool calls running Graph I/O at once
+
+# Adaptive throttling from X-App-Usage / X-Page-Usage / X-Business-Use-Case-Usage
+THROTTLE_RATE = float(os.getenv("FACEBOOK_THROTTLE_RATE", "10"))  # calls/second per page once usage passes SLOW_AT
+THROTTLE_BURST = float(os.getenv("FACEBOOK_THROTTLE_BURST", "20"))
+THROTTLE_SLOW_AT = float(os.getenv("FACEBOOK_THROTTLE_SLOW_AT", "75"))  # usage % where slowing down starts
+THROTTLE_PAUSE_AT = float(os.getenv("FACEBOOK_THROTTLE_PAUSE_AT", "95"))  # usage % where calls pause
+THROTTLE_MAX_WAIT = float(os.getenv("FACEBOOK_THROTTLE_MAX_WAIT", "30"))  # longer waits fail fast instead
+THROTTLE_DEFAULT_PAUSE = float(os.getenv("FACEBOOK_THROTTLE_DEFAULT_PAUSE", "60"))  # when Graph gives no estimate
+
+# Graph batch requests (https://developers.facebook.com/docs/graph-api/batch-requests)
+BATCH_MAX_OPERATIONS = 50  # hard Graph limit per batch call
+BATCH_MAX_WORKERS = int(os.getenv("FACEBOOK_BATCH_MAX_WORKERS", "4"))
+
+# Cursor pagination
+GRAPH_PAGE_SIZE = int(os.getenv("FACEBOOK_GRAPH_PAGE_SIZE", "100"))  # items per Graph page (max 100)
+
+# Comment moderation: per-page / per-language keyword lists (JSON, see moderation.py)
+MODERATION_KEYWORDS_FILE = os.getenv("FACEBOOK_MODERATION_KEYWORDS")
+MODERATION_MAX_POSTS = int(os.getenv("FACEBOOK_MODERATION_MAX_POSTS", "25"))  # recent posts scanned per page
+
+# Local state (comment store, commenter stats) kept between calls
+STATE_DB = os.getenv("FACEBOOK_STATE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), "facebook_state.db"))
+COMMENT_SYNC_OVERLAP = int(os.getenv("FACEBOOK_COMMENT_SYNC_OVERLAP", "900"))  # seconds re-read per sync, to catch edits
+
+# Page webhooks (feed changes); the receiver only starts when FACEBOOK_WEBHOOK_PORT is set
+FACEBOOK_APP_SECRET = os.getenv("FACEBOOK_APP_SECRET")  # verifies X-Hub-Signature-256
+WEBHOOK_VERIFY_TOKEN = os.getenv("FACEBOOK_WEBHOOK_VERIFY_TOKEN")  # subscription handshake
+WEBHOOK_HOST = os.getenv("FACEBOOK_WEBHOOK_HOST", "127.0.0.1")
+WEBHOOK_PORT = int(os.getenv("FACEBOOK_WEBHOOK_PORT", "0")) or None
+WEBHOOK_QUEUE_SIZE = int(os.getenv("FACEBOOK_WEBHOOK_QUEUE_SIZE", "10000"))
+WEBHOOK_RESYNC_SECONDS = float(os.getenv("FACEBOOK_WEBHOOK_RESYNC_SECONDS", "3600"))  # Graph re-sync even with webhooks
+
+# Read-through cache for Graph GET tools (seconds; 0 disables caching for that tool)
+CACHE_MAX_ENTRIES = int(os.getenv("FACEBOOK_CACHE_MAX_ENTRIES", "2048"))
+CACHE_MAX_BYTES = int(os.getenv("FACEBOOK_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+
+def _cache_ttl(name: str, default: float) -> float:
+    return float(os.getenv(f"FACEBOOK_CACHE_TTL_{name.upper()}", default))
+
+
+CACHE_TTLS = {
+    "post_insights": _cache_ttl("post_insights", 300),
+    "page_fan_count": _cache_ttl("page_fan_count", 600),
+    "post_share_count": _cache_ttl("post_share_count", 120),
+    "post_likes": _cache_ttl("post_likes", 60),
+    "post_comment_count": _cache_ttl("post_comment_count", 60),
+}
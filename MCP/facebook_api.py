@@ -1,79 +1,352 @@
+import json as jsonlib
 import requests
-from typing import Any
-from config import GRAPH_API_BASE_URL, PAGE_ID, PAGE_ACCESS_TOKEN
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from typing import Any, Iterator
+from urllib.parse import urlencode
+from urllib3.util.retry import Retry
+from config import (
+    BATCH_MAX_OPERATIONS,
+    BATCH_MAX_WORKERS,
+    GRAPH_API_BASE_URL,
+    GRAPH_PAGE_SIZE,
+    HTTP_CONNECT_TIMEOUT,
+    HTTP_MAX_RETRIES,
+    HTTP_POOL_SIZE,
+    HTTP_READ_TIMEOUT,
+)
+from throttle import Throttle
+from token_registry import TokenRegistry
+
+
+POST_FIELDS = "id,message,created_time"
+COMMENT_FIELDS = "id,message,from,created_time"
+# Posts plus the created_time of their newest comment, to skip posts with nothing new.
+POST_LATEST_COMMENT_FIELDS = "id,created_time,comments.order(reverse_chronological).limit(1){created_time}"
+
+
+class GraphAPIError(RuntimeError):
+    """Graph returned an error while paging through an edge."""
+
+
+def build_session(pool_size: int = HTTP_POOL_SIZE, max_retries: int = HTTP_MAX_RETRIES) -> requests.Session:
+    """Keep-alive session with a bounded connection pool.
+
+    Failed connects are retried for every method. Resets after the request was
+    sent are only retried for GET/DELETE, so a POST is never published twice.
+    """
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=0,
+        allowed_methods=frozenset({"GET", "DELETE"}),
+        backoff_factor=0.2,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
 
 class FacebookAPI:
+    def __init__(
+        self,
+        base_url: str = GRAPH_API_BASE_URL,
+        session: requests.Session | None = None,
+        timeout: tuple[float, float] = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT),
+        tokens: TokenRegistry | None = None,
+        throttle: Throttle | None = None,
+    ):
+        self.base_url = base_url
+        # One pool for every page: all calls go to the same host, only the token differs.
+        self.session = session or build_session()
+        self.timeout = timeout
+        self.tokens = tokens or TokenRegistry()
+        self.throttle = throttle or Throttle()
+
+    def page(self, page_id: str | None = None) -> str:
+        """Page to act as when the endpoint is the page itself (feed, photos, posts)."""
+        return self.tokens.page_for(page_id)
+
     # Generic Graph API request method
-    def _request(self, method: str, endpoint: str, params: dict[str, Any], json: dict[str, Any] = None) -> dict[str, Any]:
-        url = f"{GRAPH_API_BASE_URL}/{endpoint}"
-        params["access_token"] = PAGE_ACCESS_TOKEN
-        response = requests.request(method, url, params=params, json=json)
-        return response.json()
+    def _request(
+        self,
+        method: str,
+        endpoint: str,
+        params: dict[str, Any],
+        json: dict[str, Any] = None,
+        data: dict[str, Any] = None,
+        page_id: str | None = None,
+    ) -> dict[str, Any]:
+        url = f"{self.base_url}/{endpoint}"
+        page = self.tokens.page_for(page_id, endpoint.split("/", 1)[0] or None)
+        params["access_token"] = self.tokens.token_for(page)
+        self.throttle.acquire(page)
+        response = self.session.request(method, url, params=params, json=json, data=data, timeout=self.timeout)
+        body = response.json()
+        self.throttle.update(page, response.headers, body)
+        return body
+
+    def iter_pages(
+        self,
+        endpoint: str,
+        params: dict[str, Any],
+        page_size: int = GRAPH_PAGE_SIZE,
+        after: str | None = None,
+        page_id: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Lazily yield raw pages of an edge, following paging.cursors.after."""
+        cursor = after
+        while True:
+            page_params = dict(params, limit=page_size)
+            if cursor:
+                page_params["after"] = cursor
+            page = self._request("GET", endpoint, page_params, page_id=page_id)
+            if "error" in page:
+                raise GraphAPIError(str(page["error"]))
+            yield page
+            paging = page.get("paging", {})
+            cursor = paging.get("cursors", {}).get("after")
+            if not cursor or "next" not in paging:
+                return
+
+    def iter_items(
+        self,
+        endpoint: str,
+        params: dict[str, Any],
+        page_size: int = GRAPH_PAGE_SIZE,
+        limit: int | None = None,
+        page_id: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Yield items across pages; stops fetching once `limit` items were yielded."""
+        if limit is not None and limit <= 0:
+            return
+        count = 0
+        for page in self.iter_pages(endpoint, params, min(page_size, limit or page_size), page_id=page_id):
+            for item in page.get("data", []):
+                yield item
+                count += 1
+                if limit is not None and count >= limit:
+                    return
+
+    def get_page_of(
+        self,
+        endpoint: str,
+        params: dict[str, Any],
+        page_size: int = GRAPH_PAGE_SIZE,
+        after: str | None = None,
+        page_id: str | None = None,
+    ) -> dict[str, Any]:
+        """One page plus the cursor to resume from (None when exhausted)."""
+        page = next(self.iter_pages(endpoint, params, page_size, after, page_id))
+        paging = page.get("paging", {})
+        next_cursor = paging.get("cursors", {}).get("after") if "next" in paging else None
+        return {"data": page.get("data", []), "next_cursor": next_cursor}
+
+    def batch(self, operations: list[dict[str, Any]], page_id: str | None = None) -> list[Any]:
+        """Run up to BATCH_MAX_OPERATIONS operations in one Graph batch call.
+        Returns the decoded body of each operation, in order.
+        """
+        if len(operations) > BATCH_MAX_OPERATIONS:
+            raise ValueError(f"A Graph batch accepts at most {BATCH_MAX_OPERATIONS} operations")
+        raw = self._request(
+            "POST",
+            "",
+            {},
+            data={"batch": jsonlib.dumps(operations), "include_headers": "false"},
+            page_id=page_id,
+        )
+        if not isinstance(raw, list):
+            # Whole batch rejected (bad token, malformed request): same error for every item.
+            return [raw] * len(operations)
+        results = []
+        for item in raw:
+            if item is None:
+                results.append({"error": {"message": "Batch operation did not complete"}})
+                continue
+            try:
+                results.append(jsonlib.loads(item.get("body") or "null"))
+            except ValueError:
+                results.append({"error": {"message": item.get("body"), "code": item.get("code")}})
+        return results
 
-    def post_message(self, message: str) -> dict[str, Any]:
-        return self._request("POST", f"{PAGE_ID}/feed", {"message": message})
+    def batch_chunked(self, operations: list[dict[str, Any]], page_id: str | None = None) -> list[Any]:
+        """Split operations into batches and run them concurrently, preserving order."""
+        chunks = [operations[i : i + BATCH_MAX_OPERATIONS] for i in range(0, len(operations), BATCH_MAX_OPERATIONS)]
+        if len(chunks) <= 1:
+            return self.batch(chunks[0], page_id) if chunks else []
+        with ThreadPoolExecutor(max_workers=min(BATCH_MAX_WORKERS, len(chunks))) as pool:
+            return [result for chunk in pool.map(lambda c: self.batch(c, page_id), chunks) for result in chunk]
 
-    def reply_to_comment(self, comment_id: str, message: str) -> dict[str, Any]:
-        return self._request("POST", f"{comment_id}/comments", {"message": message})
+    def _bulk_comment_operation(
+        self, comment_ids: list[str], method: str, body: dict[str, Any] = None, page_id: str | None = None
+    ) -> list[dict[str, Any]]:
+        operations = []
+        for cid in comment_ids:
+            op = {"method": method, "relative_url": cid}
+            if body:
+                op["body"] = urlencode(body)
+            operations.append(op)
+        results = self.batch_chunked(operations, page_id)
+        return [{"comment_id": cid, "result": res} for cid, res in zip(comment_ids, results)]
 
-    def get_posts(self) -> dict[str, Any]:
-        return self._request("GET", f"{PAGE_ID}/posts", {"fields": "id,message,created_time"})
+    def post_message(self, message: str, page_id: str | None = None) -> dict[str, Any]:
+        page = self.page(page_id)
+        return self._request("POST", f"{page}/feed", {"message": message}, page_id=page)
 
-    def get_comments(self, post_id: str) -> dict[str, Any]:
-        return self._request("GET", f"{post_id}/comments", {"fields": "id,message,from,created_time"})
+    def reply_to_comment(self, comment_id: str, message: str, page_id: str | None = None) -> dict[str, Any]:
+        return self._request("POST", f"{comment_id}/comments", {"message": message}, page_id=page_id)
 
-    def delete_post(self, post_id: str) -> dict[str, Any]:
-        return self._request("DELETE", f"{post_id}", {})
+    def get_posts(self, page_id: str | None = None) -> dict[str, Any]:
+        page = self.page(page_id)
+        return self._request("GET", f"{page}/posts", {"fields": POST_FIELDS}, page_id=page)
 
-    def delete_comment(self, comment_id: str) -> dict[str, Any]:
-        return self._request("DELETE", f"{comment_id}", {})
+    def get_comments(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
+        return self._request("GET", f"{post_id}/comments", {"fields": COMMENT_FIELDS}, page_id=page_id)
 
-    def hide_comment(self, comment_id: str) -> dict[str, Any]:
+    def iter_posts(
+        self,
+        page_size: int = GRAPH_PAGE_SIZE,
+        limit: int | None = None,
+        page_id: str | None = None,
+        fields: str = POST_FIELDS,
+    ) -> Iterator[dict[str, Any]]:
+        page = self.page(page_id)
+        return self.iter_items(f"{page}/posts", {"fields": fields}, page_size, limit, page)
+
+    def iter_comments(
+        self,
+        post_id: str,
+        page_size: int = GRAPH_PAGE_SIZE,
+        limit: int | None = None,
+        page_id: str | None = None,
+        since: int | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        """Comments of a post; `since` (unix time) keeps only comments created after it."""
+        params = {"fields": COMMENT_FIELDS}
+        if since is not None:
+            params["since"] = since
+        return self.iter_items(f"{post_id}/comments", params, page_size, limit, page_id)
+
+    def get_posts_page(
+        self, page_size: int = GRAPH_PAGE_SIZE, after: str | None = None, page_id: str | None = None
+    ) -> dict[str, Any]:
+        page = self.page(page_id)
+        return self.get_page_of(f"{page}/posts", {"fields": POST_FIELDS}, page_size, after, page)
+
+    def get_comments_page(
+        self, post_id: str, page_size: int = GRAPH_PAGE_SIZE, after: str | None = None, page_id: str | None = None
+    ) -> dict[str, Any]:
+        return self.get_page_of(f"{post_id}/comments", {"fields": COMMENT_FIELDS}, page_size, after, page_id)
+
+    def get_comment_count(self, post_id: str, page_id: str | None = None) -> int:
+        """Total comment count from the edge summary, without fetching comments."""
+        data = self._request("GET", f"{post_id}/comments", {"summary": "total_count", "limit": 0}, page_id=page_id)
+        return data.get("summary", {}).get("total_count", 0)
+
+    def delete_post(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
+        return self._request("DELETE", f"{post_id}", {}, page_id=page_id)
+
+    def delete_comment(self, comment_id: str, page_id: str | None = None) -> dict[str, Any]:
+        return self._request("DELETE", f"{comment_id}", {}, page_id=page_id)
+
+    def hide_comment(self, comment_id: str, page_id: str | None = None) -> dict[str, Any]:
         """Hide a comment from the Page."""
-        return self._request("POST", f"{comment_id}", {"is_hidden": True})
+        return self._request("POST", f"{comment_id}", {"is_hidden": True}, page_id=page_id)
 
-    def unhide_comment(self, comment_id: str) -> dict[str, Any]:
+    def unhide_comment(self, comment_id: str, page_id: str | None = None) -> dict[str, Any]:
         """Unhide a previously hidden comment."""
-        return self._request("POST", f"{comment_id}", {"is_hidden": False})
+        return self._request("POST", f"{comment_id}", {"is_hidden": False}, page_id=page_id)
 
-    def get_insights(self, post_id: str, metric: str, period: str = "lifetime") -> dict[str, Any]:
-        return self._request("GET", f"{post_id}/insights", {"metric": metric, "period": period})
+    def delete_comments(self, comment_ids: list[str], page_id: str | None = None) -> list[dict[str, Any]]:
+        """Delete many comments using batch requests."""
+        return self._bulk_comment_operation(comment_ids, "DELETE", page_id=page_id)
 
-    def get_bulk_insights(self, post_id: str, metrics: list[str], period: str = "lifetime") -> dict[str, Any]:
+    def hide_comments(self, comment_ids: list[str], page_id: str | None = None) -> list[dict[str, Any]]:
+        """Hide many comments using batch requests."""
+        return self._bulk_comment_operation(comment_ids, "POST", {"is_hidden": "true"}, page_id=page_id)
+
+    def get_insights(
+        self, post_id: str, metric: str, period: str = "lifetime", page_id: str | None = None
+    ) -> dict[str, Any]:
+        return self._request("GET", f"{post_id}/insights", {"metric": metric, "period": period}, page_id=page_id)
+
+    def get_bulk_insights(
+        self, post_id: str, metrics: list[str], period: str = "lifetime", page_id: str | None = None
+    ) -> dict[str, Any]:
         metric_str = ",".join(metrics)
-        return self.get_insights(post_id, metric_str, period)
+        return self.get_insights(post_id, metric_str, period, page_id)
+
+    def get_posts_insights(
+        self, post_ids: list[str], metrics: list[str], period: str = "lifetime", page_id: str | None = None
+    ) -> dict[str, Any]:
+        """Insights for many posts using multi-id reads (`insights?ids=a,b,...`).
+
+        Posts are grouped by the page whose token reads them and sent in chunks of
+        BATCH_MAX_OPERATIONS ids, run concurrently. Returns each post's insights
+        response ({"data": [...]}, or {"error": ...} when its chunk failed).
+        """
+        by_page: dict[str, list[str]] = {}
+        for post_id in dict.fromkeys(post_ids):
+            by_page.setdefault(self.tokens.page_for(page_id, post_id), []).append(post_id)
+        chunks = [
+            (page, ids[i : i + BATCH_MAX_OPERATIONS])
+            for page, ids in by_page.items()
+            for i in range(0, len(ids), BATCH_MAX_OPERATIONS)
+        ]
+
+        def fetch(chunk: tuple[str, list[str]]) -> dict[str, Any]:
+            page, ids = chunk
+            params = {"ids": ",".join(ids), "metric": ",".join(metrics), "period": period}
+            raw = self._request("GET", "insights", params, page_id=page)
+            if "error" in raw:
+                return {post_id: raw for post_id in ids}
+            return {post_id: raw.get(post_id, {"data": []}) for post_id in ids}
+
+        if len(chunks) <= 1:
+            return fetch(chunks[0]) if chunks else {}
+        results: dict[str, Any] = {}
+        with ThreadPoolExecutor(max_workers=min(BATCH_MAX_WORKERS, len(chunks))) as pool:
+            for chunk_result in pool.map(fetch, chunks):
+                results.update(chunk_result)
+        return results
 
-    def post_image_to_facebook(self, image_url: str, caption: str) -> dict[str, Any]:
+    def post_image_to_facebook(self, image_url: str, caption: str, page_id: str | None = None) -> dict[str, Any]:
         params = {
             "url": image_url,
             "caption": caption
         }
-        return self._request("POST", f"{PAGE_ID}/photos", params)
+        page = self.page(page_id)
+        return self._request("POST", f"{page}/photos", params, page_id=page)
     
-    def send_dm_to_user(self, user_id: str, message: str) -> dict[str, Any]:
+    def send_dm_to_user(self, user_id: str, message: str, page_id: str | None = None) -> dict[str, Any]:
         payload = {
             "recipient": {"id": user_id},
             "message": {"text": message},
             "messaging_type": "RESPONSE"
         }
-        return self._request("POST", "me/messages", {}, json=payload)
+        return self._request("POST", "me/messages", {}, json=payload, page_id=page_id)
     
-    def update_post(self, post_id: str, new_message: str) -> dict[str, Any]:
-        return self._request("POST", f"{post_id}", {"message": new_message})
+    def update_post(self, post_id: str, new_message: str, page_id: str | None = None) -> dict[str, Any]:
+        return self._request("POST", f"{post_id}", {"message": new_message}, page_id=page_id)
 
-    def schedule_post(self, message: str, publish_time: int) -> dict[str, Any]:
+    def schedule_post(self, message: str, publish_time: int, page_id: str | None = None) -> dict[str, Any]:
         params = {
             "message": message,
             "published": False,
             "scheduled_publish_time": publish_time,
         }
-        return self._request("POST", f"{PAGE_ID}/feed", params)
+        page = self.page(page_id)
+        return self._request("POST", f"{page}/feed", params, page_id=page)
 
-    def get_page_fan_count(self) -> int:
-        data = self._request("GET", f"{PAGE_ID}", {"fields": "fan_count"})
+    def get_page_fan_count(self, page_id: str | None = None) -> int:
+        page = self.page(page_id)
+        data = self._request("GET", f"{page}", {"fields": "fan_count"}, page_id=page)
         return data.get("fan_count", 0)
 
-    def get_post_share_count(self, post_id: str) -> int:
-        data = self._request("GET", f"{post_id}", {"fields": "shares"})
+    def get_post_share_count(self, post_id: str, page_id: str | None = None) -> int:
+        data = self._request("GET", f"{post_id}", {"fields": "shares"}, page_id=page_id)
         return data.get("shares", {}).get("count", 0)
@@ -1,150 +1,424 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import Any
-from facebook_api import FacebookAPI
+from cache import TTLCache
+from comment_store import CommentStore, parse_graph_time
+from commenter_stats import CommenterStats
+from config import (
+    BATCH_MAX_WORKERS,
+    CACHE_MAX_BYTES,
+    CACHE_MAX_ENTRIES,
+    CACHE_TTLS,
+    COMMENT_SYNC_OVERLAP,
+    MODERATION_MAX_POSTS,
+    STATE_DB,
+    WEBHOOK_RESYNC_SECONDS,
+)
+from facebook_api import POST_LATEST_COMMENT_FIELDS, FacebookAPI
+from moderation import ModerationRules, flag_comments
+
+POST_INSIGHT_METRICS = [
+    "post_impressions", "post_impressions_unique", "post_impressions_paid",
+    "post_impressions_organic", "post_engaged_users", "post_clicks",
+    "post_reactions_like_total", "post_reactions_love_total", "post_reactions_wow_total",
+    "post_reactions_haha_total", "post_reactions_sorry_total", "post_reactions_anger_total",
+]
+
+REACTION_METRICS = [
+    "post_reactions_like_total",
+    "post_reactions_love_total",
+    "post_reactions_wow_total",
+    "post_reactions_haha_total",
+    "post_reactions_sorry_total",
+    "post_reactions_anger_total",
+]
+
+
+def metric_values(raw: dict[str, Any]) -> dict[str, Any]:
+    """{metric: value} from an insights response (lifetime metrics have one value)."""
+    if "error" in raw:
+        return {"error": raw["error"]}
+    return {item.get("name"): (item.get("values") or [{}])[0].get("value") for item in raw.get("data", [])}
 
 
 class Manager:
     def __init__(self):
         self.api = FacebookAPI()
-
-    def post_to_facebook(self, message: str) -> dict[str, Any]:
-        return self.api.post_message(message)
-
-    def reply_to_comment(self, post_id: str, comment_id: str, message: str) -> dict[str, Any]:
-        return self.api.reply_to_comment(comment_id, message)
-
-    def get_page_posts(self) -> dict[str, Any]:
-        return self.api.get_posts()
-
-    def get_post_comments(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_comments(post_id)
-
-    def delete_post(self, post_id: str) -> dict[str, Any]:
-        return self.api.delete_post(post_id)
-
-    def delete_comment(self, comment_id: str) -> dict[str, Any]:
-        return self.api.delete_comment(comment_id)
-
-    def hide_comment(self, comment_id: str) -> dict[str, Any]:
-        return self.api.hide_comment(comment_id)
-
-    def unhide_comment(self, comment_id: str) -> dict[str, Any]:
-        return self.api.unhide_comment(comment_id)
-
-    def delete_comment_from_post(self, post_id: str, comment_id: str) -> dict[str, Any]:
-        return self.api.delete_comment(comment_id)
-
-    def filter_negative_comments(self, comments: dict[str, Any]) -> list[dict[str, Any]]:
-        keywords = ["bad", "terrible", "awful", "hate", "dislike", "problem", "issue"]
-        return [c for c in comments.get("data", []) if any(k in c.get("message", "").lower() for k in keywords)]
-
-    def get_number_of_comments(self, post_id: str) -> int:
-        return len(self.api.get_comments(post_id).get("data", []))
-
-    def get_number_of_likes(self, post_id: str) -> int:
-        return self.api._request("GET", post_id, {"fields": "likes.summary(true)"}).get("likes", {}).get("summary", {}).get("total_count", 0)
-
-    def get_post_insights(self, post_id: str) -> dict[str, Any]:
-        metrics = [
-            "post_impressions", "post_impressions_unique", "post_impressions_paid",
-            "post_impressions_organic", "post_engaged_users", "post_clicks",
-            "post_reactions_like_total", "post_reactions_love_total", "post_reactions_wow_total",
-            "post_reactions_haha_total", "post_reactions_sorry_total", "post_reactions_anger_total",
-        ]
-        return self.api.get_bulk_insights(post_id, metrics)
+        self.cache = TTLCache(max_entries=CACHE_MAX_ENTRIES, max_bytes=CACHE_MAX_BYTES)
+        self.moderation = ModerationRules()
+        self.state_db = STATE_DB
+        self._stats: CommenterStats | None = None
+        self._comment_store: CommentStore | None = None
+        self._state_lock = threading.Lock()
+        self.webhook = None  # WebhookReceiver, when FACEBOOK_WEBHOOK_PORT is set
+
+    def _state(self, attr: str, factory) -> Any:
+        """Local state stores share STATE_DB and are opened on first use."""
+        with self._state_lock:
+            if getattr(self, attr) is None:
+                setattr(self, attr, factory(self.state_db))
+            return getattr(self, attr)
+
+    @property
+    def stats(self) -> CommenterStats:
+        return self._state("_stats", CommenterStats)
+
+    @property
+    def comment_store(self) -> CommentStore:
+        return self._state("_comment_store", CommentStore)
+
+    def _sync_post(self, page: str, post_id: str, full: bool = False) -> dict[str, Any]:
+        """Delta-sync one post's comments into the comment store (and the commenter stats)."""
+        store = self.comment_store
+        if full:
+            store.clear_post(post_id)
+        mark, synced_at = store.sync_state(post_id)
+        if not full and synced_at and self.webhook is not None and self.webhook.running:
+            # Webhook events keep synced posts current; Graph is only re-read every
+            # WEBHOOK_RESYNC_SECONDS to catch events missed while the server was down.
+            age = datetime.now(timezone.utc) - parse_graph_time(synced_at)
+            if age.total_seconds() < WEBHOOK_RESYNC_SECONDS:
+                return {
+                    "post_id": post_id,
+                    "fetched_comments": 0,
+                    "new_comments": 0,
+                    "edited_comments": 0,
+                    "stored_comments": store.count(post_id),
+                }
+        since = int(parse_graph_time(mark).timestamp()) - COMMENT_SYNC_OVERLAP if mark else None
+        fetched = list(self.api.iter_comments(post_id, page_id=page, since=since))
+        new, edited = store.upsert(page, post_id, fetched, synced=True)
+        self.stats.add(page, post_id, new)
+        return {
+            "post_id": post_id,
+            "fetched_comments": len(fetched),
+            "new_comments": len(new),
+            "edited_comments": edited,
+            "stored_comments": store.count(post_id),
+        }
+
+    def apply_feed_events(self, events: list[dict[str, Any]]) -> None:
+        """Apply webhook comment events to the comment store and commenter stats."""
+        changed = False
+        for event in events:
+            if event.get("item") != "comment" or not event.get("comment_id") or not event.get("post_id"):
+                continue
+            changed = True
+            if event.get("verb") == "remove":
+                self.comment_store.remove(event["comment_id"])
+            elif event.get("verb") in ("add", "edited") and event.get("created_time"):
+                comment = {
+                    "id": event["comment_id"],
+                    "message": event.get("message"),
+                    "from": event.get("from"),
+                    "created_time": event["created_time"],
+                }
+                new, _ = self.comment_store.upsert(event["page_id"], event["post_id"], [comment])
+                self.stats.add(event["page_id"], event["post_id"], new)
+        if changed:
+            self.cache.invalidate("comments")
+
+    def poll_events(self, max_events: int = 100, page_id: str | None = None) -> dict[str, Any]:
+        if self.webhook is None:
+            return {"events": [], "webhook": "disabled (set FACEBOOK_WEBHOOK_PORT and FACEBOOK_APP_SECRET)"}
+        events = self.webhook.queue.poll(max_events, page_id)
+        return {"events": events, "webhook": self.webhook.status()}
+
+    def _forget_comments(self, comment_ids: list[str], results: list[Any]) -> None:
+        for comment_id, result in zip(comment_ids, results):
+            if isinstance(result, dict) and result.get("success"):
+                self.comment_store.remove(comment_id)
+
+    def _page(self, page_id: str | None, object_id: str | None = None) -> str:
+        """Resolve the page a call acts as (explicit, from a post id prefix, or the default)."""
+        return self.api.tokens.page_for(page_id, object_id)
+
+    def _cached(self, tool: str, page: str, key: tuple, loader, tags: tuple[str, ...] = ()) -> Any:
+        # The page is part of the key: the same object read with another page's token
+        # may see different fields (e.g. insights).
+        return self.cache.get_or_load((tool, page, *key), CACHE_TTLS[tool], loader, tags)
+
+    def _single_metric(self, post_id: str, metric: str, page_id: str | None = None) -> dict[str, Any]:
+        """Serve one insights metric out of the cached bulk insights fetch."""
+        bulk = self.get_post_insights(post_id, page_id)
+        if "error" in bulk:
+            return bulk
+        items = [item for item in bulk.get("data", []) if item.get("name") == metric]
+        if not items:
+            return self.api.get_insights(post_id, metric, page_id=self._page(page_id, post_id))
+        return {"data": items}
+
+    def list_pages(self) -> dict[str, Any]:
+        return {"default_page_id": self.api.tokens.default_page_id, "page_ids": self.api.tokens.page_ids()}
+
+    def post_to_facebook(self, message: str, page_id: str | None = None) -> dict[str, Any]:
+        return self.api.post_message(message, page_id)
+
+    def reply_to_comment(self, post_id: str, comment_id: str, message: str, page_id: str | None = None) -> dict[str, Any]:
+        return self.api.reply_to_comment(comment_id, message, self._page(page_id, post_id))
+
+    def get_page_posts(self, page_id: str | None = None) -> dict[str, Any]:
+        return self.api.get_posts(page_id)
+
+    def get_post_comments(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
+        self._sync_post(self._page(page_id, post_id), post_id)
+        return {"data": self.comment_store.comments(post_id)}
+
+    def sync_post_comments(self, post_id: str, page_id: str | None = None, full: bool = False) -> dict[str, Any]:
+        return self._sync_post(self._page(page_id, post_id), post_id, full)
+
+    def get_page_posts_paginated(self, page_size: int, after: str | None = None, page_id: str | None = None) -> dict[str, Any]:
+        return self.api.get_posts_page(page_size, after, page_id)
+
+    def get_post_comments_paginated(
+        self, post_id: str, page_size: int, after: str | None = None, page_id: str | None = None
+    ) -> dict[str, Any]:
+        return self.api.get_comments_page(post_id, page_size, after, self._page(page_id, post_id))
+
+    def delete_post(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
+        result = self.api.delete_post(post_id, self._page(page_id, post_id))
+        self.cache.invalidate(f"post:{post_id}")
+        return result
+
+    def delete_comment(self, comment_id: str, page_id: str | None = None) -> dict[str, Any]:
+        result = self.api.delete_comment(comment_id, page_id)
+        self.cache.invalidate("comments")
+        self._forget_comments([comment_id], [result])
+        return result
+
+    def hide_comment(self, comment_id: str, page_id: str | None = None) -> dict[str, Any]:
+        result = self.api.hide_comment(comment_id, page_id)
+        self.cache.invalidate("comments")
+        return result
+
+    def unhide_comment(self, comment_id: str, page_id: str | None = None) -> dict[str, Any]:
+        result = self.api.unhide_comment(comment_id, page_id)
+        self.cache.invalidate("comments")
+        return result
+
+    def delete_comment_from_post(self, post_id: str, comment_id: str, page_id: str | None = None) -> dict[str, Any]:
+        result = self.api.delete_comment(comment_id, self._page(page_id, post_id))
+        self.cache.invalidate("comments")
+        self._forget_comments([comment_id], [result])
+        return result
+
+    def filter_negative_comments(
+        self, comments: dict[str, Any], page_id: str | None = None, languages: list[str] | None = None
+    ) -> list[dict[str, Any]]:
+        matcher = self.moderation.matcher_for(page_id or self.api.tokens.default_page_id, languages)
+        return list(flag_comments(comments.get("data", []), matcher))
+
+    def scan_page_comments(
+        self, page_id: str | None = None, max_posts: int = MODERATION_MAX_POSTS, languages: list[str] | None = None
+    ) -> dict[str, Any]:
+        """Run the comments of a page's recent posts through the keyword matcher.
+        Each post is delta-synced into the comment store first, so repeated scans only
+        download new comments. comment_ids can go straight to bulk_hide_comments."""
+        page = self._page(page_id)
+        matcher = self.moderation.matcher_for(page, languages)
+        post_ids = [post["id"] for post in self.api.iter_posts(limit=max_posts, page_id=page)]
+
+        def scan(post_id: str) -> tuple[int, list[dict[str, Any]]]:
+            self._sync_post(page, post_id)
+            comments = self.comment_store.comments(post_id)
+            return len(comments), [{**c, "post_id": post_id} for c in flag_comments(comments, matcher)]
+
+        with ThreadPoolExecutor(max_workers=max(1, min(BATCH_MAX_WORKERS, len(post_ids)))) as pool:
+            results = list(pool.map(scan, post_ids))
+        flagged = [comment for _, post_flagged in results for comment in post_flagged]
+        return {
+            "page_id": page,
+            "posts_scanned": len(post_ids),
+            "comments_scanned": sum(scanned for scanned, _ in results),
+            "keywords": len(matcher),
+            "flagged": flagged,
+            "comment_ids": [comment["id"] for comment in flagged],
+        }
+
+    def get_number_of_comments(self, post_id: str, page_id: str | None = None) -> int:
+        page = self._page(page_id, post_id)
+        return self._cached(
+            "post_comment_count",
+            page,
+            (post_id,),
+            lambda: self.api.get_comment_count(post_id, page),
+            (f"post:{post_id}", "comments"),
+        )
+
+    def get_number_of_likes(self, post_id: str, page_id: str | None = None) -> int:
+        page = self._page(page_id, post_id)
+        return self._cached(
+            "post_likes",
+            page,
+            (post_id,),
+            lambda: self.api._request("GET", post_id, {"fields": "likes.summary(true)"}, page_id=page).get("likes", {}).get("summary", {}).get("total_count", 0),
+            (f"post:{post_id}",),
+        )
+
+    def get_post_insights(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
+        page = self._page(page_id, post_id)
+        return self._cached(
+            "post_insights",
+            page,
+            (post_id,),
+            lambda: self.api.get_bulk_insights(post_id, POST_INSIGHT_METRICS, page_id=page),
+            (f"post:{post_id}",),
+        )
     
-    def get_post_impressions(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_impressions")
-
-    def get_post_impressions_unique(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_impressions_unique")
-
-    def get_post_impressions_paid(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_impressions_paid")
-
-    def get_post_impressions_organic(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_impressions_organic")
-
-    def get_post_engaged_users(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_engaged_users")
-
-    def get_post_clicks(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_clicks")
-
-    def get_post_reactions_like_total(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_reactions_like_total")
-
-    def get_post_reactions_love_total(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_reactions_love_total")
-
-    def get_post_reactions_wow_total(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_reactions_wow_total")
-
-    def get_post_reactions_haha_total(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_reactions_haha_total")
-
-    def get_post_reactions_sorry_total(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_reactions_sorry_total")
-
-    def get_post_reactions_anger_total(self, post_id: str) -> dict[str, Any]:
-        return self.api.get_insights(post_id, "post_reactions_anger_total")
-
-    def get_post_top_commenters(self, post_id: str) -> list[dict[str, Any]]:
-        comments = self.get_post_comments(post_id).get("data", [])
-        counter = {}
-        for comment in comments:
-            user_id = comment.get("from", {}).get("id")
-            if user_id:
-                counter[user_id] = counter.get(user_id, 0) + 1
-        return sorted([{"user_id": k, "count": v} for k, v in counter.items()], key=lambda x: x["count"], reverse=True)
-
-    def post_image_to_facebook(self, image_url: str, caption: str) -> dict[str, Any]:
-        return self.api.post_image_to_facebook(image_url, caption)
-
-    def send_dm_to_user(self, user_id: str, message: str) -> dict[str, Any]:
-        return self.api.send_dm_to_user(user_id, message)
+    def get_posts_insights(
+        self, post_ids: list[str], metrics: list[str] | None = None, page_id: str | None = None
+    ) -> dict[str, dict[str, Any]]:
+        """Insights for many posts as {post_id: {metric: value}}.
+        With the default metrics, cached posts are served from the per-post insights cache
+        and fetched posts are stored in it."""
+        metrics = metrics or POST_INSIGHT_METRICS
+        use_cache = set(metrics) == set(POST_INSIGHT_METRICS)
+        post_ids = list(dict.fromkeys(post_ids))
+        raw: dict[str, Any] = {}
+        if use_cache:
+            for post_id in post_ids:
+                hit, value = self.cache.get(("post_insights", self._page(page_id, post_id), post_id))
+                if hit:
+                    raw[post_id] = value
+        missing = [post_id for post_id in post_ids if post_id not in raw]
+        for post_id, value in self.api.get_posts_insights(missing, metrics, page_id=page_id).items():
+            raw[post_id] = value
+            if use_cache and "error" not in value:
+                key = ("post_insights", self._page(page_id, post_id), post_id)
+                self.cache.set(key, value, CACHE_TTLS["post_insights"], (f"post:{post_id}",))
+        return {post_id: metric_values(raw[post_id]) for post_id in post_ids}
+
+    def get_post_impressions(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
+        return self._single_metric(post_id, "post_impressions", page_id)
+
+    def get_post_impressions_unique(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
+        return self._single_metric(post_id, "post_impressions_unique", page_id)
+
+    def get_post_impressions_paid(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
+        return self._single_metric(post_id, "post_impressions_paid", page_id)
+
+    def get_post_impressions_organic(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
+        return self._single_metric(post_id, "post_impressions_organic", page_id)
+
+    def get_post_engaged_users(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
+        return self._single_metric(post_id, "post_engaged_users", page_id)
+
+    def get_post_clicks(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
+        return self._single_metric(post_id, "post_clicks", page_id)
+
+    def get_post_reactions_like_total(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
+        return self._single_metric(post_id, "post_reactions_like_total", page_id)
+
+    def get_post_reactions_love_total(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
+        return self._single_metric(post_id, "post_reactions_love_total", page_id)
+
+    def get_post_reactions_wow_total(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
+        return self._single_metric(post_id, "post_reactions_wow_total", page_id)
+
+    def get_post_reactions_haha_total(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
+        return self._single_metric(post_id, "post_reactions_haha_total", page_id)
+
+    def get_post_reactions_sorry_total(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
+        return self._single_metric(post_id, "post_reactions_sorry_total", page_id)
+
+    def get_post_reactions_anger_total(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
+        return self._single_metric(post_id, "post_reactions_anger_total", page_id)
+
+    def get_post_top_commenters(self, post_id: str, page_id: str | None = None) -> list[dict[str, Any]]:
+        self._sync_post(self._page(page_id, post_id), post_id)
+        return self.comment_store.top_commenters(post_id)
+
+    def sync_commenter_stats(self, page_id: str | None = None, max_posts: int = MODERATION_MAX_POSTS) -> dict[str, Any]:
+        """Bring the page's commenter counts up to date.
+        One posts call tells which posts have comments newer than their last sync; only
+        those posts are delta-synced."""
+        page = self._page(page_id)
+        posts = list(self.api.iter_posts(limit=max_posts, page_id=page, fields=POST_LATEST_COMMENT_FIELDS))
+        stale = []
+        for post in posts:
+            latest = (post.get("comments", {}).get("data") or [{}])[0].get("created_time")
+            if latest and latest > (self.comment_store.sync_state(post["id"])[0] or ""):
+                stale.append(post["id"])
+
+        with ThreadPoolExecutor(max_workers=max(1, min(BATCH_MAX_WORKERS, len(stale)))) as pool:
+            added = sum(result["new_comments"] for result in pool.map(lambda p: self._sync_post(page, p), stale))
+        return {
+            "page_id": page,
+            "posts_checked": len(posts),
+            "posts_synced": len(stale),
+            "new_comments": added,
+            **self.stats.summary(page),
+        }
+
+    def get_page_top_commenters(
+        self, page_id: str | None = None, limit: int = 10, days: float | None = None
+    ) -> dict[str, Any]:
+        """Top commenters from the local stats (no Graph call); `days` limits to recent comments."""
+        page = self._page(page_id)
+        since = datetime.now(timezone.utc) - timedelta(days=days) if days else None
+        return {
+            "page_id": page,
+            "days": days,
+            "top_commenters": self.stats.top(page, limit, since),
+            **self.stats.summary(page),
+        }
+
+    def post_image_to_facebook(self, image_url: str, caption: str, page_id: str | None = None) -> dict[str, Any]:
+        return self.api.post_image_to_facebook(image_url, caption, page_id)
+
+    def send_dm_to_user(self, user_id: str, message: str, page_id: str | None = None) -> dict[str, Any]:
+        return self.api.send_dm_to_user(user_id, message, page_id)
     
-    def update_post(self, post_id: str, new_message: str) -> dict[str, Any]:
-        return self.api.update_post(post_id, new_message)
-
-    def schedule_post(self, message: str, publish_time: int) -> dict[str, Any]:
-        return self.api.schedule_post(message, publish_time)
-
-    def get_page_fan_count(self) -> int:
-        return self.api.get_page_fan_count()
-
-    def get_post_share_count(self, post_id: str) -> int:
-        return self.api.get_post_share_count(post_id)
-
-    def get_post_reactions_breakdown(self, post_id: str) -> dict[str, Any]:
+    def update_post(self, post_id: str, new_message: str, page_id: str | None = None) -> dict[str, Any]:
+        result = self.api.update_post(post_id, new_message, self._page(page_id, post_id))
+        self.cache.invalidate(f"post:{post_id}")
+        return result
+
+    def schedule_post(self, message: str, publish_time: int, page_id: str | None = None) -> dict[str, Any]:
+        return self.api.schedule_post(message, publish_time, page_id)
+
+    def get_page_fan_count(self, page_id: str | None = None) -> int:
+        page = self._page(page_id)
+        return self._cached("page_fan_count", page, (), lambda: self.api.get_page_fan_count(page), (f"page:{page}",))
+
+    def get_post_share_count(self, post_id: str, page_id: str | None = None) -> int:
+        page = self._page(page_id, post_id)
+        return self._cached(
+            "post_share_count",
+            page,
+            (post_id,),
+            lambda: self.api.get_post_share_count(post_id, page),
+            (f"post:{post_id}",),
+        )
+
+    def get_rate_limit_status(self) -> dict[str, Any]:
+        return self.api.throttle.status()
+
+    def get_cache_stats(self) -> dict[str, Any]:
+        return {**self.cache.stats(), "ttls": CACHE_TTLS}
+
+    def get_post_reactions_breakdown(self, post_id: str, page_id: str | None = None) -> dict[str, Any]:
         """Return counts for all reaction types on a post."""
-        metrics = [
-            "post_reactions_like_total",
-            "post_reactions_love_total",
-            "post_reactions_wow_total",
-            "post_reactions_haha_total",
-            "post_reactions_sorry_total",
-            "post_reactions_anger_total",
-        ]
-        raw = self.api.get_bulk_insights(post_id, metrics)
+        raw = self.get_post_insights(post_id, page_id)
         results: dict[str, Any] = {}
         for item in raw.get("data", []):
             name = item.get("name")
+            if name not in REACTION_METRICS:
+                continue
             value = item.get("values", [{}])[0].get("value")
             results[name] = value
         return results
 
-    def bulk_delete_comments(self, comment_ids: list[str]) -> list[dict[str, Any]]:
-        """Delete multiple comments and return their results."""
-        results = []
-        for cid in comment_ids:
-            res = self.api.delete_comment(cid)
-            results.append({"comment_id": cid, "result": res})
-        return results
-
-    def bulk_hide_comments(self, comment_ids: list[str]) -> list[dict[str, Any]]:
-        """Hide multiple comments and return their results."""
-        results = []
-        for cid in comment_ids:
-            res = self.api.hide_comment(cid)
-            results.append({"comment_id": cid, "result": res})
-        return results
+    def bulk_delete_comments(self, comment_ids: list[str], page_id: str | None = None) -> list[dict[str, Any]]:
+        """Delete multiple comments (Graph batch requests) and return their results."""
+        result = self.api.delete_comments(comment_ids, page_id)
+        self.cache.invalidate("comments")
+        self._forget_comments([r["comment_id"] for r in result], [r["result"] for r in result])
+        return result
+
+    def bulk_hide_comments(self, comment_ids: list[str], page_id: str | None = None) -> list[dict[str, Any]]:
+        """Hide multiple comments (Graph batch requests) and return their results."""
+        result = self.api.hide_comments(comment_ids, page_id)
+        self.cache.invalidate("comments")
+        return result
@@ -0,0 +1,148 @@
+import json
+import os
+import re
+import threading
+import unicodedata
+from typing import Any, Iterable, Iterator
+
+from config import MODERATION_KEYWORDS_FILE
+
+# Built-in lists, used when FACEBOOK_MODERATION_KEYWORDS has no "default" entry
+# for a language. A trailing "*" matches any word ending ("groaznic*" also
+# matches "groaznică", "groaznice"); spaces match any run of whitespace.
+DEFAULT_KEYWORDS: dict[str, list[str]] = {
+    "en": [
+        "bad", "terrible", "awful", "hate*", "dislike*", "problem*", "issue*",
+        "worst", "scam*", "rip off", "refund*", "disappoint*", "useless", "rude",
+    ],
+    "ro": [
+        "prost*", "proast*", "groaznic*", "oribil*", "nasol*", "jalnic*", "penibil*",
+        "dezamagi*", "nemultumi*", "problem*", "teapa", "tepar*", "escroc*", "hoti*",
+        "rusine", "bataie de joc", "nu recomand", "nu mai cumpar", "banii inapoi",
+        "cel mai rau", "slab*", "urat*", "mizerie", "nesimti*",
+    ],
+}
+
+_COMBINING = re.compile(r"[\u0300-\u036f]+")
+_END = ""
+_STEM = "*"
+
+
+def fold(text: str) -> str:
+    """Lowercase and strip diacritics, so "Țeapă", "ţeapă" and "teapa" compare equal."""
+    if text.isascii():
+        return text.lower()
+    return _COMBINING.sub("", unicodedata.normalize("NFKD", text)).casefold()
+
+
+def _normalize_term(term: str) -> str:
+    return " ".join(fold(term).split())
+
+
+def _trie_pattern(node: dict) -> str:
+    """Regex for a character trie: alternatives branch per character, so matching
+    cost depends on text length and not on the number of terms."""
+    if _STEM in node:
+        return r"\w*"
+    alts = [
+        (r"\s+" if ch == " " else re.escape(ch)) + _trie_pattern(child)
+        for ch, child in sorted(node.items())
+        if ch != _END
+    ]
+    if not alts:
+        return ""
+    body = alts[0] if len(alts) == 1 else "(?:" + "|".join(alts) + ")"
+    return f"(?:{body})?" if _END in node else body
+
+
+class KeywordMatcher:
+    """All terms of a list compiled into one whole-word regex over folded text."""
+
+    def __init__(self, terms: Iterable[str]):
+        self.terms = sorted({t for t in (_normalize_term(term) for term in terms) if t.rstrip(_STEM)})
+        root: dict = {}
+        for term in self.terms:
+            node = root
+            for ch in term.rstrip(_STEM):
+                node = node.setdefault(ch, {})
+            node[_STEM if term.endswith(_STEM) else _END] = True
+        self._regex = re.compile(rf"\b{_trie_pattern(root)}\b") if self.terms else None
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def search(self, text: str) -> bool:
+        return bool(self._regex and text and self._regex.search(fold(text)))
+
+    def findall(self, text: str) -> list[str]:
+        """Distinct matched words (folded), in order of appearance."""
+        if not self._regex or not text:
+            return []
+        return list(dict.fromkeys(" ".join(m.split()) for m in self._regex.findall(fold(text))))
+
+
+class ModerationRules:
+    """Keyword lists per page and language.
+
+    FACEBOOK_MODERATION_KEYWORDS points at a JSON file such as
+
+        {
+          "default": {"ro": ["prost*", "teapa"], "en": ["scam*"]},
+          "1234567890": {"languages": ["ro"], "ro": ["livrare intarziata"]}
+        }
+
+    A "default" language list replaces the built-in one; a page's lists are
+    added to the defaults, and its optional "languages" limits which languages
+    apply to that page. The file is re-read when it changes; compiled matchers
+    are cached until then.
+    """
+
+    def __init__(self, path: str | None = MODERATION_KEYWORDS_FILE, defaults: dict[str, list[str]] = DEFAULT_KEYWORDS):
+        self.path = path
+        self.defaults = defaults
+        self._config: dict[str, Any] = {}
+        self._mtime_ns: int | None = None
+        self._matchers: dict[tuple, KeywordMatcher] = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        if not self.path:
+            return
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime_ns == self._mtime_ns:
+            return
+        with self._lock:
+            if mtime_ns == self._mtime_ns:
+                return
+            with open(self.path, "r", encoding="utf-8") as f:
+                self._config = json.load(f)
+            self._matchers = {}
+            self._mtime_ns = mtime_ns
+
+    def terms_for(self, page_id: str | None = None, languages: list[str] | None = None) -> dict[str, list[str]]:
+        """Effective terms by language for a page."""
+        self._refresh()
+        defaults = {**self.defaults, **self._config.get("default", {})}
+        page = self._config.get(str(page_id), {}) if page_id else {}
+        langs = languages or page.get("languages") or sorted(set(defaults) | (set(page) - {"languages"}))
+        return {lang: list(defaults.get(lang, [])) + list(page.get(lang, [])) for lang in langs}
+
+    def matcher_for(self, page_id: str | None = None, languages: list[str] | None = None) -> KeywordMatcher:
+        self._refresh()
+        key = (str(page_id) if page_id else None, tuple(sorted(languages)) if languages else None)
+        matcher = self._matchers.get(key)
+        if matcher is None:
+            terms = [t for lang_terms in self.terms_for(page_id, languages).values() for t in lang_terms]
+            matcher = self._matchers[key] = KeywordMatcher(terms)
+        return matcher
+
+
+def flag_comments(comments: Iterable[dict[str, Any]], matcher: KeywordMatcher) -> Iterator[dict[str, Any]]:
+    """Yield the comments whose message matches, with a "matched" list added."""
+    for comment in comments:
+        matched = matcher.findall(comment.get("message") or "")
+        if matched:
+            yield {**comment, "matched": matched}
@@ -1,276 +1,407 @@
+import functools
+import anyio
 from mcp.server.fastmcp import FastMCP
+from config import MODERATION_MAX_POSTS, TOOL_CONCURRENCY, WEBHOOK_PORT
 from manager import Manager
 from typing import Any
+from webhook import WebhookReceiver
 
 mcp = FastMCP("FacebookMCP")
 manager = Manager()
+if WEBHOOK_PORT:
+    # Feed events update the comment store as they arrive and are queued for poll_events.
+    manager.webhook = WebhookReceiver(on_events=manager.apply_feed_events).start()
+
+# Graph tools are async so FastMCP can serve many calls at once. The Graph client
+# itself is the blocking, pooled FacebookAPI, so each call runs on a worker thread
+# (at most TOOL_CONCURRENCY in flight; they share the connection pool, cache and throttle).
+# No tool stays sync: even the status tools wait on locks held by Graph calls
+# (list_pages may also re-read the token store), so they must not block the loop.
+_limiter = anyio.CapacityLimiter(TOOL_CONCURRENCY)
+
+
+async def _run(fn, *args, **kwargs):
+    return await anyio.to_thread.run_sync(functools.partial(fn, *args, **kwargs), limiter=_limiter)
+
+
+# Every Page tool takes an optional page_id. Without it the page is taken from a
+# "{page_id}_{post_id}" post id when possible, else FACEBOOK_PAGE_ID is used.
 
 @mcp.tool()
-def post_to_facebook(message: str) -> dict[str, Any]:
+async def post_to_facebook(message: str, page_id: str | None = None) -> dict[str, Any]:
     """Create a new Facebook Page post with a text message.
-    Input: message (str)
+    Input: message (str), page_id (str, optional)
     Output: dict with post ID and creation status
     """
-    return manager.post_to_facebook(message)
+    return await _run(manager.post_to_facebook, message, page_id=page_id)
 
 @mcp.tool()
-def reply_to_comment(post_id: str, comment_id: str, message: str) -> dict[str, Any]:
+async def reply_to_comment(post_id: str, comment_id: str, message: str, page_id: str | None = None) -> dict[str, Any]:
     """Reply to a specific comment on a Facebook post.
-    Input: post_id (str), comment_id (str), message (str)
+    Input: post_id (str), comment_id (str), message (str), page_id (str, optional)
     Output: dict with reply creation status
     """
-    return manager.reply_to_comment(post_id, comment_id, message)
+    return await _run(manager.reply_to_comment, post_id, comment_id, message, page_id=page_id)
 
 @mcp.tool()
-def get_page_posts() -> dict[str, Any]:
+async def get_page_posts(page_id: str | None = None) -> dict[str, Any]:
     """Fetch the most recent posts on the Page.
-    Input: None
+    Input: page_id (str, optional)
     Output: dict with list of post objects and metadata
     """
-    return manager.get_page_posts()
+    return await _run(manager.get_page_posts, page_id=page_id)
+
+@mcp.tool()
+async def get_post_comments(post_id: str, page_id: str | None = None) -> dict[str, Any]:
+    """Retrieve all comments for a given post, from the local comment store after a delta sync.
+    Input: post_id (str), page_id (str, optional)
+    Output: dict with data: every stored comment (id, message, from, created_time), oldest first.
+    This used to be Graph's raw first page of comments. There is no paging key now (the list is
+    complete), and a Graph error fails the tool call instead of being returned as an "error" dict.
+    get_post_comments_paginated still returns Graph's own pages.
+    """
+    return await _run(manager.get_post_comments, post_id, page_id=page_id)
+
+@mcp.tool()
+async def sync_post_comments(post_id: str, page_id: str | None = None, full: bool = False) -> dict[str, Any]:
+    """Sync a post's comments into the local comment store, downloading only comments newer than the last sync.
+    Input: post_id (str), page_id (str, optional), full (bool: drop the stored copy and download everything again)
+    Output: dict with fetched_comments, new_comments, edited_comments and stored_comments
+    """
+    return await _run(manager.sync_post_comments, post_id, page_id=page_id, full=full)
 
 @mcp.tool()
-def get_post_comments(post_id: str) -> dict[str, Any]:
-    """Retrieve all comments for a given post.
-    Input: post_id (str)
-    Output: dict with comment objects
+async def get_page_posts_paginated(page_size: int = 25, after: str | None = None, page_id: str | None = None) -> dict[str, Any]:
+    """Fetch one page of the Page's posts.
+    Input: page_size (int, max 100), after (cursor from a previous call, optional), page_id (str, optional)
+    Output: dict with data (list of posts) and next_cursor (None when done)
     """
-    return manager.get_post_comments(post_id)
+    return await _run(manager.get_page_posts_paginated, page_size, after, page_id=page_id)
 
 @mcp.tool()
-def delete_post(post_id: str) -> dict[str, Any]:
+async def get_post_comments_paginated(post_id: str, page_size: int = 100, after: str | None = None, page_id: str | None = None) -> dict[str, Any]:
+    """Fetch one page of comments for a post.
+    Input: post_id (str), page_size (int, max 100), after (cursor, optional), page_id (str, optional)
+    Output: dict with data (list of comments) and next_cursor (None when done)
+    """
+    return await _run(manager.get_post_comments_paginated, post_id, page_size, after, page_id=page_id)
+
+@mcp.tool()
+async def delete_post(post_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Delete a specific post from the Facebook Page.
-    Input: post_id (str)
+    Input: post_id (str), page_id (str, optional)
     Output: dict with deletion result
     """
-    return manager.delete_post(post_id)
+    return await _run(manager.delete_post, post_id, page_id=page_id)
 
 @mcp.tool()
-def delete_comment(comment_id: str) -> dict[str, Any]:
+async def delete_comment(comment_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Delete a specific comment from the Page.
-    Input: comment_id (str)
+    Input: comment_id (str), page_id (str, optional)
     Output: dict with deletion result
     """
-    return manager.delete_comment(comment_id)
+    return await _run(manager.delete_comment, comment_id, page_id=page_id)
 
 
 @mcp.tool()
-def hide_comment(comment_id: str) -> dict[str, Any]:
+async def hide_comment(comment_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Hide a comment from public view."""
-    return manager.hide_comment(comment_id)
+    return await _run(manager.hide_comment, comment_id, page_id=page_id)
 
 
 @mcp.tool()
-def unhide_comment(comment_id: str) -> dict[str, Any]:
+async def unhide_comment(comment_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Unhide a previously hidden comment."""
-    return manager.unhide_comment(comment_id)
+    return await _run(manager.unhide_comment, comment_id, page_id=page_id)
 
 @mcp.tool()
-def delete_comment_from_post(post_id: str, comment_id: str) -> dict[str, Any]:
+async def delete_comment_from_post(post_id: str, comment_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Alias to delete a comment on a post.
-    Input: post_id (str), comment_id (str)
+    Input: post_id (str), comment_id (str), page_id (str, optional)
     Output: dict with deletion result
     """
-    return manager.delete_comment_from_post(post_id, comment_id)
+    return await _run(manager.delete_comment_from_post, post_id, comment_id, page_id=page_id)
+
+@mcp.tool()
+async def filter_negative_comments(
+    comments: dict[str, Any], page_id: str | None = None, languages: list[str] | None = None
+) -> list[dict[str, Any]]:
+    """Flag comments matching the page's negative keyword lists (diacritics and case ignored).
+    Input: comments (dict with "data"), page_id (str, optional), languages (list of codes such as ["ro", "en"], optional)
+    Output: list of flagged comments, each with the matched words
+    """
+    return await _run(manager.filter_negative_comments, comments, page_id=page_id, languages=languages)
 
 @mcp.tool()
-def filter_negative_comments(comments: dict[str, Any]) -> list[dict[str, Any]]:
-    """Filter comments for basic negative sentiment.
-    Input: comments (dict)
-    Output: list of flagged negative comments
+async def scan_page_comments(
+    page_id: str | None = None, max_posts: int = MODERATION_MAX_POSTS, languages: list[str] | None = None
+) -> dict[str, Any]:
+    """Scan the comments of a page's most recent posts for negative keywords, page by page.
+    Input: page_id (str, optional), max_posts (int, default FACEBOOK_MODERATION_MAX_POSTS), languages (list of codes, optional)
+    Output: dict with posts_scanned, comments_scanned, flagged comments and comment_ids for bulk_hide_comments
     """
-    return manager.filter_negative_comments(comments)
+    return await _run(manager.scan_page_comments, page_id=page_id, max_posts=max_posts, languages=languages)
 
 @mcp.tool()
-def get_number_of_comments(post_id: str) -> int:
-    """Count the number of comments on a given post.
-    Input: post_id (str)
+async def get_number_of_comments(post_id: str, page_id: str | None = None) -> int:
+    """Count the number of comments on a given post (total_count of Graph's comments summary).
+    Input: post_id (str), page_id (str, optional)
     Output: integer count of comments
     """
-    return manager.get_number_of_comments(post_id)
+    return await _run(manager.get_number_of_comments, post_id, page_id=page_id)
 
 @mcp.tool()
-def get_number_of_likes(post_id: str) -> int:
+async def get_number_of_likes(post_id: str, page_id: str | None = None) -> int:
     """Return the number of likes on a post.
-    Input: post_id (str)
+    Input: post_id (str), page_id (str, optional)
     Output: integer count of likes
     """
-    return manager.get_number_of_likes(post_id)
+    return await _run(manager.get_number_of_likes, post_id, page_id=page_id)
 
 @mcp.tool()
-def get_post_insights(post_id: str) -> dict[str, Any]:
+async def get_post_insights(post_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Fetch all insights metrics (impressions, reactions, clicks, etc).
-    Input: post_id (str)
+    Input: post_id (str), page_id (str, optional)
     Output: dict with multiple metrics and their values
     """
-    return manager.get_post_insights(post_id)
+    return await _run(manager.get_post_insights, post_id, page_id=page_id)
 
 @mcp.tool()
-def get_post_impressions(post_id: str) -> dict[str, Any]:
+async def get_posts_insights(
+    post_ids: list[str], metrics: list[str] | None = None, page_id: str | None = None
+) -> dict[str, dict[str, Any]]:
+    """Fetch insights for many posts at once (multi-id Graph reads of 50 posts, run concurrently).
+    Input: post_ids (list of str), metrics (list of metric names, optional: all post metrics), page_id (str, optional)
+    Output: dict keyed by post_id of {metric: value}, e.g. {"123_456": {"post_impressions": 1200, ...}}
+    """
+    return await _run(manager.get_posts_insights, post_ids, metrics, page_id=page_id)
+
+@mcp.tool()
+async def get_post_impressions(post_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Fetch total impressions of a post.
-    Input: post_id (str)
+    Input: post_id (str), page_id (str, optional)
     Output: dict with total impression count
     """
-    return manager.get_post_impressions(post_id)
+    return await _run(manager.get_post_impressions, post_id, page_id=page_id)
 
 @mcp.tool()
-def get_post_impressions_unique(post_id: str) -> dict[str, Any]:
+async def get_post_impressions_unique(post_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Fetch unique impressions of a post.
-    Input: post_id (str)
+    Input: post_id (str), page_id (str, optional)
     Output: dict with unique impression count
     """
-    return manager.get_post_impressions_unique(post_id)
+    return await _run(manager.get_post_impressions_unique, post_id, page_id=page_id)
 
 @mcp.tool()
-def get_post_impressions_paid(post_id: str) -> dict[str, Any]:
+async def get_post_impressions_paid(post_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Fetch paid impressions of a post.
-    Input: post_id (str)
+    Input: post_id (str), page_id (str, optional)
     Output: dict with paid impression count
     """
-    return manager.get_post_impressions_paid(post_id)
+    return await _run(manager.get_post_impressions_paid, post_id, page_id=page_id)
 
 @mcp.tool()
-def get_post_impressions_organic(post_id: str) -> dict[str, Any]:
+async def get_post_impressions_organic(post_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Fetch organic impressions of a post.
-    Input: post_id (str)
+    Input: post_id (str), page_id (str, optional)
     Output: dict with organic impression count
     """
-    return manager.get_post_impressions_organic(post_id)
+    return await _run(manager.get_post_impressions_organic, post_id, page_id=page_id)
 
 @mcp.tool()
-def get_post_engaged_users(post_id: str) -> dict[str, Any]:
+async def get_post_engaged_users(post_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Fetch number of engaged users.
-    Input: post_id (str)
+    Input: post_id (str), page_id (str, optional)
     Output: dict with engagement count
     """
-    return manager.get_post_engaged_users(post_id)
+    return await _run(manager.get_post_engaged_users, post_id, page_id=page_id)
 
 @mcp.tool()
-def get_post_clicks(post_id: str) -> dict[str, Any]:
+async def get_post_clicks(post_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Fetch number of post clicks.
-    Input: post_id (str)
+    Input: post_id (str), page_id (str, optional)
     Output: dict with click count
     """
-    return manager.get_post_clicks(post_id)
+    return await _run(manager.get_post_clicks, post_id, page_id=page_id)
 
 @mcp.tool()
-def get_post_reactions_like_total(post_id: str) -> dict[str, Any]:
+async def get_post_reactions_like_total(post_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Fetch number of 'Like' reactions.
-    Input: post_id (str)
+    Input: post_id (str), page_id (str, optional)
     Output: dict with like count
     """
-    return manager.get_post_reactions_like_total(post_id)
+    return await _run(manager.get_post_reactions_like_total, post_id, page_id=page_id)
 
 @mcp.tool()
-def get_post_reactions_love_total(post_id: str) -> dict[str, Any]:
+async def get_post_reactions_love_total(post_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Fetch number of 'Love' reactions.
-    Input: post_id (str)
+    Input: post_id (str), page_id (str, optional)
     Output: dict with love count
     """
-    return manager.get_post_reactions_love_total(post_id)
+    return await _run(manager.get_post_reactions_love_total, post_id, page_id=page_id)
 
 @mcp.tool()
-def get_post_reactions_wow_total(post_id: str) -> dict[str, Any]:
+async def get_post_reactions_wow_total(post_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Fetch number of 'Wow' reactions.
-    Input: post_id (str)
+    Input: post_id (str), page_id (str, optional)
     Output: dict with wow count
     """
-    return manager.get_post_reactions_wow_total(post_id)
+    return await _run(manager.get_post_reactions_wow_total, post_id, page_id=page_id)
 
 @mcp.tool()
-def get_post_reactions_haha_total(post_id: str) -> dict[str, Any]:
+async def get_post_reactions_haha_total(post_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Fetch number of 'Haha' reactions.
-    Input: post_id (str)
+    Input: post_id (str), page_id (str, optional)
     Output: dict with haha count
     """
-    return manager.get_post_reactions_haha_total(post_id)
+    return await _run(manager.get_post_reactions_haha_total, post_id, page_id=page_id)
 
 @mcp.tool()
-def get_post_reactions_sorry_total(post_id: str) -> dict[str, Any]:
+async def get_post_reactions_sorry_total(post_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Fetch number of 'Sorry' reactions.
-    Input: post_id (str)
+    Input: post_id (str), page_id (str, optional)
     Output: dict with sorry count
     """
-    return manager.get_post_reactions_sorry_total(post_id)
+    return await _run(manager.get_post_reactions_sorry_total, post_id, page_id=page_id)
 
 @mcp.tool()
-def get_post_reactions_anger_total(post_id: str) -> dict[str, Any]:
+async def get_post_reactions_anger_total(post_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Fetch number of 'Anger' reactions.
-    Input: post_id (str)
+    Input: post_id (str), page_id (str, optional)
     Output: dict with anger count
     """
-    return manager.get_post_reactions_anger_total(post_id)
+    return await _run(manager.get_post_reactions_anger_total, post_id, page_id=page_id)
 
 @mcp.tool()
-def get_post_top_commenters(post_id: str) -> list[dict[str, Any]]:
-    """Get the top commenters on a post.
-    Input: post_id (str)
+async def get_post_top_commenters(post_id: str, page_id: str | None = None) -> list[dict[str, Any]]:
+    """Get the top commenters on a post (local comment store, delta-synced first).
+    Input: post_id (str), page_id (str, optional)
     Output: list of user IDs with comment counts
     """
-    return manager.get_post_top_commenters(post_id)
+    return await _run(manager.get_post_top_commenters, post_id, page_id=page_id)
+
+@mcp.tool()
+async def sync_commenter_stats(page_id: str | None = None, max_posts: int = MODERATION_MAX_POSTS) -> dict[str, Any]:
+    """Update the page's stored commenter counts with comments posted since the last sync.
+    Only posts with new comments are read, newest comments first, stopping at the last one already counted.
+    Input: page_id (str, optional), max_posts (int, recent posts to check)
+    Output: dict with posts_checked, posts_synced, new_comments and stored totals
+    """
+    return await _run(manager.sync_commenter_stats, page_id=page_id, max_posts=max_posts)
 
 @mcp.tool()
-def post_image_to_facebook(image_url: str, caption: str) -> dict[str, Any]:
+async def get_page_top_commenters(page_id: str | None = None, limit: int = 10, days: float | None = None) -> dict[str, Any]:
+    """Top commenters across the whole page, answered from the stored counts (run sync_commenter_stats to refresh).
+    Input: page_id (str, optional), limit (int, default 10), days (float, optional: only comments from the last N days)
+    Output: dict with top_commenters [{user_id, name, count, last_comment_time}] and the store's last_comment_time
+    """
+    return await _run(manager.get_page_top_commenters, page_id=page_id, limit=limit, days=days)
+
+@mcp.tool()
+async def post_image_to_facebook(image_url: str, caption: str, page_id: str | None = None) -> dict[str, Any]:
     """Post an image with a caption to the Facebook page.
-    Input: image_url (str), caption (str)
+    Input: image_url (str), caption (str), page_id (str, optional)
     Output: dict of post result
     """
-    return manager.post_image_to_facebook(image_url, caption)
+    return await _run(manager.post_image_to_facebook, image_url, caption, page_id=page_id)
 
 @mcp.tool()
-def send_dm_to_user(user_id: str, message: str) -> dict[str, Any]:
+async def send_dm_to_user(user_id: str, message: str, page_id: str | None = None) -> dict[str, Any]:
     """Send a direct message to a user.
-    Input: user_id (str), message (str)
+    Input: user_id (str), message (str), page_id (str, optional)
     Output: dict of result from Messenger API
     """
-    return manager.send_dm_to_user(user_id, message)
+    return await _run(manager.send_dm_to_user, user_id, message, page_id=page_id)
 
 @mcp.tool()
-def update_post(post_id: str, new_message: str) -> dict[str, Any]:
+async def update_post(post_id: str, new_message: str, page_id: str | None = None) -> dict[str, Any]:
     """Updates an existing post's message.
-    Input: post_id (str), new_message (str)
+    Input: post_id (str), new_message (str), page_id (str, optional)
     Output: dict of update result
     """
-    return manager.update_post(post_id, new_message)
+    return await _run(manager.update_post, post_id, new_message, page_id=page_id)
 @mcp.tool()
-def schedule_post(message: str, publish_time: int) -> dict[str, Any]:
+async def schedule_post(message: str, publish_time: int, page_id: str | None = None) -> dict[str, Any]:
     """Schedule a new post for future publishing.
-    Input: message (str), publish_time (Unix timestamp)
+    Input: message (str), publish_time (Unix timestamp), page_id (str, optional)
     Output: dict with scheduled post info
     """
-    return manager.schedule_post(message, publish_time)
+    return await _run(manager.schedule_post, message, publish_time, page_id=page_id)
 
 @mcp.tool()
-def get_page_fan_count() -> int:
+async def get_page_fan_count(page_id: str | None = None) -> int:
     """Get the Page's total fan/like count.
-    Input: None
+    Input: page_id (str, optional)
     Output: integer fan count
     """
-    return manager.get_page_fan_count()
+    return await _run(manager.get_page_fan_count, page_id=page_id)
 
 @mcp.tool()
-def get_post_share_count(post_id: str) -> int:
+async def get_post_share_count(post_id: str, page_id: str | None = None) -> int:
     """Get the number of shares for a post.
-    Input: post_id (str)
+    Input: post_id (str), page_id (str, optional)
     Output: integer share count
     """
-    return manager.get_post_share_count(post_id)
+    return await _run(manager.get_post_share_count, post_id, page_id=page_id)
 
 
 @mcp.tool()
-def get_post_reactions_breakdown(post_id: str) -> dict[str, Any]:
+async def get_post_reactions_breakdown(post_id: str, page_id: str | None = None) -> dict[str, Any]:
     """Get counts for all reaction types on a post."""
-    return manager.get_post_reactions_breakdown(post_id)
+    return await _run(manager.get_post_reactions_breakdown, post_id, page_id=page_id)
+
+
+@mcp.tool()
+async def bulk_delete_comments(comment_ids: list[str], page_id: str | None = None) -> list[dict[str, Any]]:
+    """Delete multiple comments by ID.
+    Sent as Graph batch requests of up to 50 comments, run concurrently.
+    Output: list of {comment_id, result}
+    """
+    return await _run(manager.bulk_delete_comments, comment_ids, page_id=page_id)
+
+
+@mcp.tool()
+async def bulk_hide_comments(comment_ids: list[str], page_id: str | None = None) -> list[dict[str, Any]]:
+    """Hide multiple comments by ID.
+    Sent as Graph batch requests of up to 50 comments, run concurrently.
+    Output: list of {comment_id, result}
+    """
+    return await _run(manager.bulk_hide_comments, comment_ids, page_id=page_id)
 
 
 @mcp.tool()
-def bulk_delete_comments(comment_ids: list[str]) -> list[dict[str, Any]]:
-    """Delete multiple comments by ID."""
-    return manager.bulk_delete_comments(comment_ids)
+async def get_cache_stats() -> dict[str, Any]:
+    """Report the Graph read cache: hits, misses, evictions, size and per-tool TTLs.
+    Input: None
+    Output: dict of cache statistics
+    """
+    return await _run(manager.get_cache_stats)
+
+
+@mcp.tool()
+async def get_rate_limit_status() -> dict[str, Any]:
+    """Report Graph usage from the last X-App-Usage / X-Page-Usage / X-Business-Use-Case-Usage headers,
+    the current per-page call rate and any pause in effect.
+    Input: None
+    Output: dict with app and per-page usage, rates and pauses
+    """
+    return await _run(manager.get_rate_limit_status)
 
 
 @mcp.tool()
-def bulk_hide_comments(comment_ids: list[str]) -> list[dict[str, Any]]:
-    """Hide multiple comments by ID."""
-    return manager.bulk_hide_comments(comment_ids)
+async def list_pages() -> dict[str, Any]:
+    """List the Pages this server holds access tokens for.
+    Input: None
+    Output: dict with default_page_id and page_ids
+    """
+    return await _run(manager.list_pages)
 
+
+@mcp.tool()
+async def poll_events(max_events: int = 100, page_id: str | None = None) -> dict[str, Any]:
+    """Take queued Page webhook events (new, edited, removed or hidden comments and posts).
+    Comment events are already applied to the local comment store when they arrive.
+    Input: max_events (int, default 100), page_id (str, optional: only that page's events)
+    Output: dict with events [{page_id, item, verb, post_id, comment_id, message, from, created_time}] and webhook status
+    """
+    return await _run(manager.poll_events, max_events, page_id)
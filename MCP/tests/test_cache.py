@@ -0,0 +1,91 @@
+import sys
+from pathlib import Path
+
+# The MCP server modules are imported flat, the same way server.py does.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from cache import TTLCache  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entries_expire_after_their_ttl():
+    clock = FakeClock()
+    cache = TTLCache(clock=clock)
+    cache.set("a", 1, ttl=10)
+    cache.set("b", 2, ttl=30)
+    cache.set("skipped", 3, ttl=0)
+
+    clock.now += 9.9
+    assert cache.get("a") == (True, 1)
+    clock.now += 0.1
+    assert cache.get("a") == (False, None)
+    assert cache.get("b") == (True, 2)
+    assert cache.get("skipped") == (False, None)
+    assert cache.stats()["expired"] == 1 and cache.stats()["entries"] == 1
+
+
+def test_byte_budget_evicts_least_recently_used():
+    cache = TTLCache(max_entries=100, max_bytes=30, clock=FakeClock())
+    for key in ("a", "b", "c"):
+        cache.set(key, "x" * 8, ttl=60)  # 10 bytes of JSON each
+    assert cache.stats()["bytes"] == 30
+
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("d", "x" * 8, ttl=60)
+    assert [k for k in "abcd" if cache.get(k)[0]] == ["a", "c", "d"]
+
+    cache.set("big", "x" * 18, ttl=60)  # needs two slots
+    assert [k for k in ("a", "c", "d", "big") if cache.get(k)[0]] == ["d", "big"]
+    cache.set("huge", "x" * 40, ttl=60)  # larger than the whole budget: not cached
+    assert cache.get("huge") == (False, None)
+    assert cache.stats()["evictions"] == 3 and cache.stats()["bytes"] == 30
+
+
+def test_entry_count_limit_evicts_oldest():
+    cache = TTLCache(max_entries=2, clock=FakeClock())
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    cache.set("a", 10, ttl=60)  # overwriting refreshes recency
+    cache.set("c", 3, ttl=60)
+    assert cache.get("b") == (False, None)
+    assert cache.get("a") == (True, 10) and cache.get("c") == (True, 3)
+
+
+def test_invalidate_drops_every_entry_with_the_tag():
+    cache = TTLCache(clock=FakeClock())
+    cache.set(("post_likes", "1_1"), 4, ttl=60, tags=("post:1_1",))
+    cache.set(("post_comment_count", "1_1"), 2, ttl=60, tags=("post:1_1", "comments"))
+    cache.set(("post_comment_count", "1_2"), 7, ttl=60, tags=("post:1_2", "comments"))
+
+    assert cache.invalidate("post:1_1") == 2
+    assert cache.get(("post_comment_count", "1_2")) == (True, 7)
+    assert cache.invalidate("comments") == 1
+    assert cache.invalidate("comments") == 0
+    assert cache.stats()["invalidations"] == 3 and cache.stats()["bytes"] == 0
+
+
+def test_get_or_load_counts_hits_and_skips_errors():
+    cache = TTLCache(clock=FakeClock())
+    calls = []
+
+    def loader(value):
+        calls.append(value)
+        return value
+
+    assert cache.get_or_load("k", 60, lambda: loader(5)) == 5
+    assert cache.get_or_load("k", 60, lambda: loader(6)) == 5
+    error = {"error": {"code": 1}}
+    assert cache.get_or_load("e", 60, lambda: loader(error)) == error
+    assert cache.get_or_load("e", 60, lambda: loader(error)) == error
+    assert calls == [5, error, error]
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 3, 1)
+    assert stats["hit_ratio"] == 0.25
@@ -0,0 +1,117 @@
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# The MCP server modules are imported flat, the same way server.py does.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from comment_store import CommentStore, parse_graph_time  # noqa: E402
+from commenter_stats import CommenterStats  # noqa: E402
+from config import COMMENT_SYNC_OVERLAP  # noqa: E402
+from facebook_api import FacebookAPI  # noqa: E402
+from manager import Manager  # noqa: E402
+from stub_graph import StubGraphServer  # noqa: E402
+from token_registry import TokenRegistry  # noqa: E402
+
+
+def _comment(comment_id, created, message="hi", user="u1"):
+    return {"id": comment_id, "message": message, "from": {"id": user, "name": user.upper()}, "created_time": created}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = CommentStore(str(tmp_path / "state.db"))
+    yield store
+    store.close()
+
+
+def test_synced_upsert_advances_mark_to_newest_comment(store):
+    assert store.sync_state("1_1") == (None, None)
+    new, edited = store.upsert("1", "1_1", [
+        _comment("c2", "2026-10-01T10:00:00+0000"),
+        _comment("c1", "2026-10-01T09:00:00+0000"),
+    ], synced=True)
+    assert [c["id"] for c in new] == ["c2", "c1"] and edited == 0
+    mark, synced_at = store.sync_state("1_1")
+    assert mark == "2026-10-01T10:00:00+0000" and synced_at
+
+    # An overlapping re-read of older comments never moves the mark back.
+    new, _ = store.upsert("1", "1_1", [_comment("c1", "2026-10-01T09:00:00+0000")], synced=True)
+    assert new == []
+    assert store.sync_state("1_1")[0] == "2026-10-01T10:00:00+0000"
+    assert [c["id"] for c in store.comments("1_1")] == ["c1", "c2"]
+
+
+def test_edited_comments_are_counted_and_updated(store):
+    store.upsert("1", "1_1", [_comment("c1", "2026-10-01T09:00:00+0000", "first")], synced=True)
+    new, edited = store.upsert("1", "1_1", [
+        _comment("c1", "2026-10-01T09:00:00+0000", "first (edited)"),
+        _comment("c2", "2026-10-01T09:30:00+0000", "second"),
+    ], synced=True)
+    assert [c["id"] for c in new] == ["c2"] and edited == 1
+    assert [c["message"] for c in store.comments("1_1")] == ["first (edited)", "second"]
+    assert store.count("1_1") == 2
+
+
+def test_unsynced_rows_do_not_move_the_mark(store):
+    store.upsert("1", "1_1", [_comment("c1", "2026-10-01T09:00:00+0000")])
+    assert store.sync_state("1_1") == (None, None)
+
+    store.upsert("1", "1_1", [_comment("c2", "2026-10-01T10:00:00+0000")], synced=True)
+    store.upsert("1", "1_1", [_comment("c3", "2026-10-01T12:00:00+0000", user="u2")])
+    assert store.sync_state("1_1")[0] == "2026-10-01T10:00:00+0000"
+    assert store.top_commenters("1_1") == [{"user_id": "u1", "count": 2}, {"user_id": "u2", "count": 1}]
+
+    store.clear_post("1_1")
+    assert store.sync_state("1_1") == (None, None) and store.count("1_1") == 0
+
+
+def test_manager_sync_asks_graph_only_for_comments_after_the_mark(tmp_path):
+    requests = []
+    comments = [_comment("1_1_c1", "2026-10-01T09:00:00+0000"), _comment("1_1_c2", "2026-10-01T10:00:00+0000")]
+
+    def graph(method, path, query):
+        requests.append((path, query))
+        if path.endswith("/comments") and "summary" in query:
+            return {"data": [], "summary": {"total_count": 7}}
+        return {"data": comments}
+
+    with StubGraphServer(graph) as server:
+        manager = Manager()
+        manager.state_db = str(tmp_path / "state.db")
+        manager.api = FacebookAPI(base_url=server.base_url, tokens=TokenRegistry(None, "1", "token"))
+
+        first = manager.sync_post_comments("1_1")
+        assert first["new_comments"] == 2 and "since" not in requests[-1][1]
+
+        comments.append(_comment("1_1_c3", "2026-10-01T11:00:00+0000", user="u2"))
+        second = manager.sync_post_comments("1_1")
+        mark = parse_graph_time("2026-10-01T10:00:00+0000").timestamp()
+        assert requests[-1][1]["since"] == [str(int(mark) - COMMENT_SYNC_OVERLAP)]
+        assert second["new_comments"] == 1 and second["stored_comments"] == 3
+
+        # The comment count tool reads the edge summary, not the local store.
+        assert manager.get_number_of_comments("1_1") == 7
+        assert requests[-1][1]["summary"] == ["total_count"] and requests[-1][1]["limit"] == ["0"]
+
+
+def test_commenter_marks_from_the_post_keyed_layout_are_migrated(tmp_path):
+    db_path = str(tmp_path / "state.db")
+    conn = sqlite3.connect(db_path)
+    conn.executescript(
+        "CREATE TABLE commenter_marks (page_id TEXT NOT NULL, post_id TEXT NOT NULL, "
+        "last_created_time TEXT NOT NULL, updated_at TEXT NOT NULL, PRIMARY KEY (page_id, post_id));"
+        "INSERT INTO commenter_marks VALUES ('1', '', '2026-10-01T09:00:00+0000', '2026-10-01T09:05:00+0000');"
+    )
+    conn.close()
+
+    stats = CommenterStats(db_path)
+    assert stats.summary("1")["last_comment_time"] == "2026-10-01T09:00:00+0000"
+    stats.add("1", "1_1", [_comment("c1", "2026-10-01T10:00:00+0000")])
+    assert stats.summary("1")["last_comment_time"] == "2026-10-01T10:00:00+0000"
+    columns = [row[1] for row in stats.conn.execute("PRAGMA table_info(commenter_marks)")]
+    assert columns == ["page_id", "last_created_time", "updated_at"]
+    stats.close()
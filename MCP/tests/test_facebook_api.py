@@ -0,0 +1,195 @@
+import json
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# The MCP server modules are imported flat, the same way server.py does.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Multi-page token stores are read with Refresh_Token's token_store module.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "Refresh_Token"))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "benchmarks"))
+
+from config import BATCH_MAX_OPERATIONS  # noqa: E402
+from facebook_api import FacebookAPI, GraphAPIError  # noqa: E402
+from stub_graph import StubGraphServer  # noqa: E402
+from token_registry import TokenRegistry  # noqa: E402
+
+
+class Graph:
+    """Stub responder: routes each request to `handler` and records it."""
+
+    def __init__(self):
+        self.requests = []
+        self.handler = None
+
+    def __call__(self, method, path, query):
+        self.requests.append((method, path, query))
+        return self.handler(method, path, query)
+
+
+@pytest.fixture
+def graph():
+    return Graph()
+
+
+@pytest.fixture
+def api(graph):
+    with StubGraphServer(graph) as server:
+        yield FacebookAPI(base_url=server.base_url, tokens=TokenRegistry(None, "1", "token"))
+
+
+def _batch_ops(query):
+    return json.loads(query["batch"][0])
+
+
+def test_bulk_delete_chunks_at_the_batch_limit(api, graph):
+    graph.handler = lambda method, path, query: [
+        {"code": 200, "body": json.dumps({"success": True})} for _ in _batch_ops(query)
+    ]
+    ids = [f"1_1_c{i}" for i in range(BATCH_MAX_OPERATIONS + 1)]
+
+    results = api.delete_comments(ids[:BATCH_MAX_OPERATIONS])
+    assert len(graph.requests) == 1
+    assert len(results) == BATCH_MAX_OPERATIONS
+
+    graph.requests.clear()
+    results = api.delete_comments(ids)
+    sizes = sorted(len(_batch_ops(query)) for _, _, query in graph.requests)
+    assert sizes == [1, BATCH_MAX_OPERATIONS]
+    assert [r["comment_id"] for r in results] == ids
+    assert all(r["result"] == {"success": True} for r in results)
+    assert {m for m, _, _ in graph.requests} == {"POST"}
+
+    with pytest.raises(ValueError):
+        api.batch([{"method": "GET", "relative_url": "me"}] * (BATCH_MAX_OPERATIONS + 1))
+
+
+def test_batch_reports_errors_per_item(api, graph):
+    def handler(method, path, query):
+        ops = _batch_ops(query)
+        assert [op["body"] for op in ops] == ["is_hidden=true"] * 4
+        return [
+            {"code": 200, "body": json.dumps({"success": True})},
+            {"code": 400, "body": json.dumps({"error": {"message": "Unsupported post request", "code": 100}})},
+            None,
+            {"code": 502, "body": "Bad Gateway"},
+        ]
+
+    graph.handler = handler
+    results = api.hide_comments(["c1", "c2", "c3", "c4"])
+    assert [r["comment_id"] for r in results] == ["c1", "c2", "c3", "c4"]
+    assert results[0]["result"] == {"success": True}
+    assert results[1]["result"]["error"]["code"] == 100
+    assert results[2]["result"] == {"error": {"message": "Batch operation did not complete"}}
+    assert results[3]["result"] == {"error": {"message": "Bad Gateway", "code": 502}}
+
+    # A rejected batch (e.g. bad token) gives every item the same error.
+    graph.handler = lambda method, path, query: {"error": {"message": "Invalid OAuth access token", "code": 190}}
+    results = api.delete_comments(["c1", "c2"])
+    assert [r["result"]["error"]["code"] for r in results] == [190, 190]
+
+
+def _paged(items, page_size, after):
+    """One page of `items` in Graph's cursor shape; `next` is left out on the last page."""
+    start = int(after) if after else 0
+    body = {"data": items[start : start + page_size]}
+    end = start + page_size
+    paging = {"cursors": {"before": str(start), "after": str(end)}}
+    if end < len(items):
+        paging["next"] = f"https://graph.facebook.com/v22.0/next?after={end}"
+    body["paging"] = paging
+    return body
+
+
+def test_iter_comments_follows_paging_next(api, graph):
+    comments = [{"id": f"1_1_c{i}", "message": str(i)} for i in range(7)]
+    graph.handler = lambda method, path, query: _paged(comments, int(query["limit"][0]), query.get("after", [None])[0])
+
+    assert [c["id"] for c in api.iter_comments("1_1", page_size=3)] == [c["id"] for c in comments]
+    assert [q.get("after") for _, _, q in graph.requests] == [None, ["3"], ["6"]]
+    assert {path for _, path, _ in graph.requests} == {"/v22.0/1_1/comments"}
+
+    # `limit` stops fetching early and shrinks the page size.
+    graph.requests.clear()
+    assert len(list(api.iter_comments("1_1", page_size=3, limit=2))) == 2
+    assert [q["limit"] for _, _, q in graph.requests] == [["2"]]
+
+
+def test_get_page_of_returns_resume_cursor(api, graph):
+    posts = [{"id": f"1_{i}"} for i in range(4)]
+    graph.handler = lambda method, path, query: _paged(posts, int(query["limit"][0]), query.get("after", [None])[0])
+
+    first = api.get_posts_page(page_size=3)
+    assert [p["id"] for p in first["data"]] == ["1_0", "1_1", "1_2"] and first["next_cursor"] == "3"
+    last = api.get_posts_page(page_size=3, after=first["next_cursor"])
+    assert [p["id"] for p in last["data"]] == ["1_3"] and last["next_cursor"] is None
+
+
+def test_iter_pages_raises_on_graph_error(api, graph):
+    graph.handler = lambda method, path, query: {"error": {"message": "Unsupported get request", "code": 100}}
+    with pytest.raises(GraphAPIError):
+        list(api.iter_comments("1_1"))
+
+
+def _insights(query):
+    ids = query["ids"][0].split(",")
+    metrics = query["metric"][0].split(",")
+    return {
+        post_id: {"data": [{"name": m, "period": "lifetime", "values": [{"value": n}]} for n, m in enumerate(metrics)]}
+        for post_id in ids
+        if not post_id.endswith("_missing")
+    }
+
+
+def test_posts_insights_uses_multi_id_reads_per_page(graph, tmp_path):
+    store = tmp_path / "tokens.json"
+    store.write_text(json.dumps({
+        "version": 2,
+        "pages": {"1": {"access_token": "token-1"}, "2": {"access_token": "token-2"}},
+        "default_page_id": "1",
+    }), encoding="utf-8")
+    graph.handler = lambda method, path, query: _insights(query)
+    post_ids = [f"1_{i}" for i in range(BATCH_MAX_OPERATIONS + 1)] + ["2_1", "2_missing", "1_0"]
+
+    with StubGraphServer(graph) as server:
+        api = FacebookAPI(base_url=server.base_url, tokens=TokenRegistry(str(store)))
+        results = api.get_posts_insights(post_ids, ["post_clicks", "post_impressions"])
+
+    assert list(results) == list(dict.fromkeys(post_ids))
+    assert results["1_7"]["data"][1] == {"name": "post_impressions", "period": "lifetime", "values": [{"value": 1}]}
+    assert results["2_missing"] == {"data": []}
+    calls = sorted((q["access_token"][0], len(q["ids"][0].split(","))) for _, _, q in graph.requests)
+    assert calls == [("token-1", 1), ("token-1", BATCH_MAX_OPERATIONS), ("token-2", 2)]
+    assert {path for _, path, _ in graph.requests} == {"/v22.0/insights"}
+
+
+def test_posts_insights_chunk_error_is_reported_per_post(api, graph):
+    graph.handler = lambda method, path, query: {"error": {"message": "Invalid metric", "code": 100}}
+    results = api.get_posts_insights(["1_1", "1_2"], ["not_a_metric"])
+    assert results == {post_id: {"error": {"message": "Invalid metric", "code": 100}} for post_id in ("1_1", "1_2")}
+    assert api.get_posts_insights([], ["post_clicks"]) == {}
+    assert len(graph.requests) == 1
+
+
+def test_default_throttle_does_not_pace_bulk_reads_and_writes(graph):
+    def handler(method, path, query):
+        if "batch" in query:
+            return [{"code": 200, "body": json.dumps({"success": True})} for _ in _batch_ops(query)]
+        return _insights(query)
+
+    graph.handler = handler
+    # 50 ms per request, like a real Graph round-trip.
+    with StubGraphServer(graph, latency=0.05) as server:
+        api = FacebookAPI(base_url=server.base_url, tokens=TokenRegistry(None, "1", "token"))
+        started = time.perf_counter()
+        hidden = api.hide_comments([f"1_1_c{i}" for i in range(500)])
+        insights = api.get_posts_insights([f"1_{i}" for i in range(200)], ["post_clicks"])
+        elapsed = time.perf_counter() - started
+
+    assert len(hidden) == 500 and len(insights) == 200
+    assert len(graph.requests) == 10 + 4
+    # 14 requests on 4 workers; the old per-operation charge made this take over a minute.
+    assert elapsed < 2
+    assert api.throttle.status()["pages"] == {}
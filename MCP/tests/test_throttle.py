@@ -0,0 +1,104 @@
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# The MCP server modules are imported flat, the same way server.py does.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from throttle import APP, RateLimitedError, Throttle  # noqa: E402
+
+
+class FakeClock:
+    """Monotonic clock that only moves when the throttle sleeps or a test advances it."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def _throttle(clock, **kwargs):
+    options = dict(rate=10, burst=5, slow_at=75, pause_at=95, max_wait=30, default_pause=60)
+    options.update(kwargs)
+    return Throttle(clock=clock, sleep=clock.sleep, **options)
+
+
+def test_default_throttle_does_not_pace_low_usage(clock):
+    throttle = Throttle(clock=clock, sleep=clock.sleep)
+    throttle.update("p1", {"X-App-Usage": json.dumps({"call_count": 40, "total_time": 10, "total_cputime": 5})})
+    assert sum(throttle.acquire("p1") for _ in range(1000)) == 0.0
+    assert clock.slept == []
+    assert throttle.status()["pages"] == {}
+
+
+def test_bucket_refills_at_scaled_rate_above_slow_at(clock):
+    throttle = _throttle(clock)
+    # 85% is halfway between slow_at and pause_at: half the rate, 5 calls/s.
+    throttle.update("p1", {"X-Page-Usage": json.dumps({"call_count": 85})})
+    assert [throttle.acquire("p1") for _ in range(5)] == [0.0] * 5
+    assert throttle.acquire("p1") == pytest.approx(0.2)
+    assert clock.slept == [pytest.approx(0.2)]
+    assert throttle.status()["pages"]["p1"]["rate_per_second"] == 5
+
+    clock.now += 0.6  # three calls' worth of refill
+    assert [throttle.acquire("p1") for _ in range(3)] == pytest.approx([0.0] * 3)
+    assert throttle.acquire("p1") == pytest.approx(0.2)
+    # Pages have separate buckets, and p2's usage is low.
+    assert throttle.acquire("p2", cost=50) == 0.0
+
+    throttle.update("p1", {"X-Page-Usage": json.dumps({"call_count": 30})})
+    assert [throttle.acquire("p1") for _ in range(10)] == [0.0] * 10
+
+
+def test_high_usage_slows_then_pauses_a_page(clock):
+    throttle = _throttle(clock, burst=1)
+    buc = {"p1": [{"type": "pages", "call_count": 85, "total_time": 10, "total_cputime": 5}]}
+    throttle.update("p1", {"X-Business-Use-Case-Usage": json.dumps(buc)})
+    assert throttle.acquire("p1") == 0.0
+    assert throttle.acquire("p1") == pytest.approx(0.2)
+    assert throttle.status()["pages"]["p1"]["usage_percent"] == 85
+
+    buc["p1"][0].update(call_count=99, estimated_time_to_regain_access=0.25)
+    throttle.update("p1", {"X-Business-Use-Case-Usage": json.dumps(buc)})
+    assert throttle.status()["pages"]["p1"]["paused_for_seconds"] == 15
+    assert throttle.acquire("p1") == pytest.approx(15)
+    # Another page is not affected by p1's usage.
+    assert throttle.acquire("p2") == 0.0
+
+
+def test_high_app_usage_pauses_every_page(clock):
+    throttle = _throttle(clock, default_pause=20)
+    throttle.update("p1", {"X-App-Usage": json.dumps({"call_count": 96, "total_time": 1, "total_cputime": 1})})
+    assert throttle.status()["app"] == {"usage_percent": 96, "paused_for_seconds": 20}
+    assert throttle.acquire("p2") == pytest.approx(20)
+
+
+def test_long_pause_raises_rate_limited_error(clock):
+    throttle = _throttle(clock)
+    throttle.update("p1", {}, {"error": {"code": 613, "message": "Calls to this api have exceeded the rate limit."}})
+    with pytest.raises(RateLimitedError) as raised:
+        throttle.acquire("p1")
+    assert raised.value.scope == APP
+    assert raised.value.retry_after == pytest.approx(60)
+    assert clock.slept == []
+
+    throttle.update("p2", {"X-Page-Usage": json.dumps({"call_count": 100, "estimated_time_to_regain_access": 5})})
+    clock.now += 61  # the app pause is over; p2 stays paused for 5 minutes
+    with pytest.raises(RateLimitedError) as raised:
+        throttle.acquire("p2")
+    assert raised.value.scope == "p2"
+    assert raised.value.retry_after == pytest.approx(300 - 61)
+    assert throttle.acquire("p1") == 0.0
@@ -0,0 +1,45 @@
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# The MCP server modules are imported flat, the same way server.py does.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# Multi-page token stores are read with Refresh_Token's token_store module.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "Refresh_Token"))
+
+from token_registry import TokenRegistry, UnknownPageError  # noqa: E402
+
+
+def _write(path, data, mtime_ns):
+    path.write_text(json.dumps(data), encoding="utf-8")
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_reads_legacy_store_and_reloads_after_refresh(tmp_path):
+    path = tmp_path / "facebook_tokens.json"
+    _write(path, {"long_lived_user_token": "user", "page_id": 111, "page_access_token": "legacy"}, 1_000_000_000)
+    registry = TokenRegistry(str(path), default_page_id=None, default_token=None)
+    assert registry.default_page_id == "111"
+    assert registry.token_for("111") == "legacy"
+
+    _write(path, {
+        "version": 2,
+        "user": {"access_token": "user"},
+        "pages": {"111": {"access_token": "new"}, "222": {"access_token": "other"}, "333": {"name": "no token"}},
+        "default_page_id": "111",
+    }, 2_000_000_000)
+    assert registry.page_ids() == ["111", "222"]
+    assert registry.token_for("111") == "new"
+    assert registry.page_for(object_id="222_5") == "222"
+    with pytest.raises(UnknownPageError):
+        registry.token_for("333")
+
+
+def test_environment_page_without_store(tmp_path):
+    registry = TokenRegistry(str(tmp_path / "missing.json"), default_page_id="9", default_token="env")
+    assert registry.page_ids() == ["9"]
+    assert registry.page_for(object_id="7_1") == "9"
+    assert registry.token_for("9") == "env"
@@ -0,0 +1,107 @@
+import json
+import sys
+from pathlib import Path
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+import pytest
+
+# The MCP server modules are imported flat, the same way server.py does.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from manager import Manager  # noqa: E402
+from webhook import SIGNATURE_HEADER, EventQueue, WebhookReceiver, feed_events, sign  # noqa: E402
+
+SECRET = "app-secret"
+
+
+def _payload(verb="add", comment_id="123_1_c1", message="Ce țeapă", created_time=1791000000):
+    return {
+        "object": "page",
+        "entry": [{
+            "id": "123",
+            "time": created_time,
+            "changes": [{
+                "field": "feed",
+                "value": {
+                    "item": "comment",
+                    "verb": verb,
+                    "post_id": "123_1",
+                    "comment_id": comment_id,
+                    "message": message,
+                    "from": {"id": "u1", "name": "Ana"},
+                    "created_time": created_time,
+                },
+            }],
+        }],
+    }
+
+
+def _post(url, payload, secret=SECRET):
+    body = json.dumps(payload).encode("utf-8")
+    headers = {"Content-Type": "application/json", SIGNATURE_HEADER: sign(secret, body)}
+    with urlopen(Request(url, data=body, headers=headers, method="POST"), timeout=5) as response:
+        return response.status
+
+
+@pytest.fixture
+def manager(tmp_path):
+    manager = Manager()
+    manager.state_db = str(tmp_path / "state.db")
+    return manager
+
+
+def test_feed_events_flattens_comment_changes():
+    events = feed_events(_payload())
+    assert events == [{
+        "page_id": "123",
+        "item": "comment",
+        "verb": "add",
+        "time": 1791000000,
+        "post_id": "123_1",
+        "comment_id": "123_1_c1",
+        "message": "Ce țeapă",
+        "from": {"id": "u1", "name": "Ana"},
+        "created_time": "2026-10-03T04:00:00+0000",
+    }]
+    assert feed_events({"object": "user", "entry": []}) == []
+
+
+def test_event_queue_is_bounded_and_filters_by_page():
+    queue = EventQueue(max_size=3)
+    queue.push([{"page_id": "1", "n": 1}, {"page_id": "2", "n": 2}])
+    queue.push([{"page_id": "1", "n": 3}, {"page_id": "2", "n": 4}])
+    assert queue.dropped == 1 and len(queue) == 3
+    assert [e["n"] for e in queue.poll(page_id="2")] == [2, 4]
+    assert [e["n"] for e in queue.poll()] == [3]
+
+
+def test_receiver_verifies_signatures_and_updates_comment_store(manager):
+    with WebhookReceiver(SECRET, "verify-me", on_events=manager.apply_feed_events, port=0) as receiver:
+        manager.webhook = receiver
+        challenge = urlopen(f"{receiver.url}/?hub.mode=subscribe&hub.verify_token=verify-me&hub.challenge=42").read()
+        assert challenge == b"42"
+
+        with pytest.raises(HTTPError) as bad:
+            _post(receiver.url, _payload(), secret="wrong")
+        assert bad.value.code == 403
+        assert receiver.rejected == 1 and len(receiver.queue) == 0
+
+        assert _post(receiver.url, _payload()) == 200
+        assert _post(receiver.url, _payload(verb="edited", message="Ce țeapă!!")) == 200
+        assert _post(receiver.url, _payload(comment_id="123_1_c2", message="super")) == 200
+
+        store = manager.comment_store
+        assert [c["message"] for c in store.comments("123_1")] == ["Ce țeapă!!", "super"]
+        assert manager.stats.top("123")[0] == {
+            "user_id": "u1", "name": "Ana", "count": 2, "last_comment_time": "2026-10-03T04:00:00+0000",
+        }
+        # Events never advance the sync mark: the next Graph sync still starts from scratch.
+        assert store.sync_state("123_1") == (None, None)
+
+        assert _post(receiver.url, _payload(verb="remove", comment_id="123_1_c2")) == 200
+        assert [c["id"] for c in store.comments("123_1")] == ["123_1_c1"]
+
+        polled = manager.poll_events(max_events=10, page_id="123")
+        assert [e["verb"] for e in polled["events"]] == ["add", "edited", "add", "remove"]
+        assert polled["webhook"]["received"] == 4 and polled["webhook"]["queued"] == 0
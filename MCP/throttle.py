@@ -0,0 +1,204 @@
+import json
+import threading
+import time
+from typing import Any, Callable, Mapping
+
+from config import (
+    THROTTLE_BURST,
+    THROTTLE_DEFAULT_PAUSE,
+    THROTTLE_MAX_WAIT,
+    THROTTLE_PAUSE_AT,
+    THROTTLE_RATE,
+    THROTTLE_SLOW_AT,
+)
+
+# Graph error codes meaning "rate limited" (app, user, page, custom and BUC limits).
+RATE_LIMIT_ERROR_CODES = {4, 17, 32, 613, 80001, 80002, 80004, 80005, 80006, 80008}
+
+APP = "app"
+
+
+class RateLimitedError(RuntimeError):
+    """A call would have to wait longer than THROTTLE_MAX_WAIT for the rate limit."""
+
+    def __init__(self, scope: str, retry_after: float):
+        super().__init__(f"Graph rate limit reached for {scope}; retry in {retry_after:.0f}s")
+        self.scope = scope
+        self.retry_after = retry_after
+
+
+def _parse_json_header(value: str | None) -> Any:
+    if not value:
+        return None
+    try:
+        return json.loads(value)
+    except ValueError:
+        return None
+
+
+def _usage_percent(usage: Mapping[str, Any]) -> float:
+    """Highest of call_count / total_time / total_cputime (Graph reports percentages)."""
+    return max(float(usage.get(k) or 0) for k in ("call_count", "total_time", "total_cputime"))
+
+
+class _Bucket:
+    __slots__ = ("tokens", "updated")
+
+    def __init__(self, tokens: float, updated: float):
+        self.tokens = tokens
+        self.updated = updated
+
+
+class Throttle:
+    """Per-page pacing steered by Graph's usage headers.
+
+    Graph itself decides how much a page may call, so nothing is paced while
+    the reported usage is at or below `slow_at` percent. After every response
+    the X-App-Usage, X-Page-Usage and X-Business-Use-Case-Usage headers are
+    read: above `slow_at` a page gets a token bucket of `rate` calls/second
+    (bursts of `burst`) scaled down linearly towards `pause_at`; at `pause_at`
+    percent (or on a rate-limit error) calls are paused until
+    `estimated_time_to_regain_access` has passed. App usage applies to every
+    page. A caller that would wait longer than `max_wait` seconds gets a
+    RateLimitedError instead of blocking the tool call.
+    """
+
+    def __init__(
+        self,
+        rate: float = THROTTLE_RATE,
+        burst: float = THROTTLE_BURST,
+        slow_at: float = THROTTLE_SLOW_AT,
+        pause_at: float = THROTTLE_PAUSE_AT,
+        max_wait: float = THROTTLE_MAX_WAIT,
+        default_pause: float = THROTTLE_DEFAULT_PAUSE,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.slow_at = slow_at
+        self.pause_at = pause_at
+        self.max_wait = max_wait
+        self.default_pause = default_pause
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self._buckets: dict[str, _Bucket] = {}
+        self._usage: dict[str, float] = {}  # scope -> highest usage percent
+        self._details: dict[str, Any] = {}  # scope -> last raw header payload
+        self._paused_until: dict[str, float] = {}  # scope -> clock time
+
+    def _factor(self, page_id: str) -> float | None:
+        """Share of `rate` a page may use, or None while usage is low enough not to pace it."""
+        usage = max(self._usage.get(APP, 0.0), self._usage.get(page_id, 0.0))
+        if usage <= self.slow_at:
+            return None
+        span = max(self.pause_at - self.slow_at, 1e-9)
+        return max(0.05, (self.pause_at - usage) / span)
+
+    def acquire(self, page_id: str, cost: int = 1) -> float:
+        """Reserve `cost` calls for a page, sleeping if needed. Returns seconds waited."""
+        with self._lock:
+            now = self.clock()
+            app_pause = self._paused_until.get(APP, 0.0) - now
+            pause = max(app_pause, self._paused_until.get(page_id, 0.0) - now)
+            factor = self._factor(page_id)
+            if factor is None:
+                # Low usage: no pacing, and a fresh bucket once usage climbs again.
+                self._buckets.pop(page_id, None)
+                wait = max(pause, 0.0)
+            else:
+                rate = self.rate * factor
+                bucket = self._buckets.get(page_id)
+                if bucket is None:
+                    bucket = self._buckets[page_id] = _Bucket(self.burst, now)
+                bucket.tokens = min(self.burst, bucket.tokens + (now - bucket.updated) * rate)
+                bucket.updated = now
+                wait = max(pause, (cost - bucket.tokens) / rate if bucket.tokens < cost else 0.0, 0.0)
+            if wait > self.max_wait:
+                raise RateLimitedError(APP if app_pause > 0 and app_pause >= pause else page_id, wait)
+            if factor is not None:
+                bucket.tokens -= cost  # may go negative: later callers queue behind this reservation
+        if wait > 0:
+            self.sleep(wait)
+        return wait
+
+    def update(
+        self,
+        page_id: str,
+        headers: Mapping[str, str],
+        body: Any = None,
+    ) -> None:
+        """Fold one response's usage headers (and rate-limit errors) into the throttle state."""
+        now = self.clock()
+        headers = {k.lower(): v for k, v in headers.items()}
+        regain: dict[str, float] = {}
+        with self._lock:
+            app = _parse_json_header(headers.get("x-app-usage"))
+            if isinstance(app, dict):
+                self._usage[APP] = _usage_percent(app)
+                self._details[APP] = app
+
+            page = _parse_json_header(headers.get("x-page-usage"))
+            page_usage = None
+            if isinstance(page, dict):
+                page_usage = _usage_percent(page)
+                self._details[f"page:{page_id}"] = page
+                if page.get("estimated_time_to_regain_access"):
+                    regain[page_id] = float(page["estimated_time_to_regain_access"]) * 60
+
+            buc = _parse_json_header(headers.get("x-business-use-case-usage"))
+            if isinstance(buc, dict):
+                for object_id, entries in buc.items():
+                    self._details[f"buc:{object_id}"] = entries
+                    for entry in entries or []:
+                        usage = _usage_percent(entry)
+                        if str(object_id) == str(page_id):
+                            page_usage = max(page_usage or 0.0, usage)
+                        minutes = entry.get("estimated_time_to_regain_access") or 0
+                        if minutes:
+                            scope = page_id if str(object_id) == str(page_id) else APP
+                            regain[scope] = max(regain.get(scope, 0.0), float(minutes) * 60)
+            if page_usage is not None:
+                self._usage[page_id] = page_usage
+
+            if self._usage.get(APP, 0.0) >= self.pause_at:
+                regain.setdefault(APP, self.default_pause)
+            if self._usage.get(page_id, 0.0) >= self.pause_at:
+                regain.setdefault(page_id, self.default_pause)
+            error = body.get("error") if isinstance(body, dict) else None
+            if isinstance(error, dict) and error.get("code") in RATE_LIMIT_ERROR_CODES:
+                scope = APP if error.get("code") in (4, 613) else page_id
+                regain.setdefault(scope, self.default_pause)
+
+            for scope, seconds in regain.items():
+                self._paused_until[scope] = max(self._paused_until.get(scope, 0.0), now + seconds)
+
+    def status(self) -> dict[str, Any]:
+        with self._lock:
+            now = self.clock()
+            pages = {}
+            for page_id in sorted(set(self._buckets) | {k for k in self._usage if k != APP}):
+                bucket = self._buckets.get(page_id)
+                factor = self._factor(page_id)
+                pages[page_id] = {
+                    "usage_percent": self._usage.get(page_id),
+                    "rate_per_second": None if factor is None else round(self.rate * factor, 3),
+                    "tokens": round(bucket.tokens, 2) if bucket else None,
+                    "paused_for_seconds": round(max(0.0, self._paused_until.get(page_id, 0.0) - now), 1),
+                }
+            return {
+                "app": {
+                    "usage_percent": self._usage.get(APP),
+                    "paused_for_seconds": round(max(0.0, self._paused_until.get(APP, 0.0) - now), 1),
+                },
+                "pages": pages,
+                "headers": dict(self._details),
+                "limits": {
+                    "rate_per_second": self.rate,
+                    "burst": self.burst,
+                    "slow_at_percent": self.slow_at,
+                    "pause_at_percent": self.pause_at,
+                    "max_wait_seconds": self.max_wait,
+                },
+            }
@@ -0,0 +1,90 @@
+import threading
+from typing import Any
+
+from config import FACEBOOK_TOKEN_STORE, PAGE_ACCESS_TOKEN, PAGE_ID
+
+
+class UnknownPageError(KeyError):
+    """No access token is known for the requested page."""
+
+
+class TokenRegistry:
+    """Page access tokens by page_id, for serving many Pages from one process.
+
+    Tokens come from the JSON store written by Refresh_Token (FACEBOOK_TOKEN_STORE,
+    all pages from /me/accounts) plus the single FACEBOOK_PAGE_ID /
+    FACEBOOK_ACCESS_TOKEN pair from the environment. The store is re-read only
+    when its mtime changes, so lookups are in-memory between token refreshes.
+    """
+
+    def __init__(
+        self,
+        store_path: str | None = FACEBOOK_TOKEN_STORE,
+        default_page_id: str | None = PAGE_ID,
+        default_token: str | None = PAGE_ACCESS_TOKEN,
+    ):
+        self.store_path = store_path
+        self._store = _open_store(store_path) if store_path else None
+        self._env_pages = {str(default_page_id): default_token} if default_page_id and default_token else {}
+        self._env_default = str(default_page_id) if default_page_id else None
+        self._store_pages: dict[str, str] = {}
+        self._store_default: str | None = None
+        self._lock = threading.Lock()
+        if self._store is not None:
+            self._load_store()
+
+    def _load_store(self) -> None:
+        pages = self._store.data["pages"]
+        self._store_pages = {page_id: page["access_token"] for page_id, page in pages.items() if page.get("access_token")}
+        self._store_default = self._store.default_page_id
+
+    def _refresh(self) -> None:
+        if self._store is None:
+            return
+        with self._lock:
+            if self._store.reload_if_changed():
+                self._load_store()
+
+    @property
+    def default_page_id(self) -> str | None:
+        self._refresh()
+        return self._env_default or self._store_default
+
+    def page_ids(self) -> list[str]:
+        self._refresh()
+        return sorted(set(self._store_pages) | set(self._env_pages))
+
+    def page_for(self, page_id: str | None = None, object_id: str | None = None) -> str:
+        """Page to act as: explicit page_id, else the page prefix of a `{page_id}_{post_id}`
+        object id when that page is known, else the default page."""
+        if page_id:
+            return str(page_id)
+        if object_id and "_" in object_id:
+            prefix = object_id.split("_", 1)[0]
+            self._refresh()
+            if prefix in self._store_pages or prefix in self._env_pages:
+                return prefix
+        default = self.default_page_id
+        if not default:
+            raise UnknownPageError("No page_id given and no default page configured (FACEBOOK_PAGE_ID)")
+        return default
+
+    def token_for(self, page_id: str) -> str:
+        self._refresh()
+        token = self._store_pages.get(str(page_id)) or self._env_pages.get(str(page_id))
+        if not token:
+            raise UnknownPageError(f"No access token for page {page_id}")
+        return token
+
+
+def _open_store(path: str) -> Any:
+    """The store format (and the migration of the old single-page layout) belongs to
+    Refresh_Token's token_store module, which is only needed when a store is configured."""
+    try:
+        from token_store import TokenStore
+    except ImportError as exc:
+        raise ImportError(
+            "FACEBOOK_TOKEN_STORE is set, but Refresh_Token's token_store module cannot be imported; "
+            "add the Refresh_Token directory to PYTHONPATH"
+        ) from exc
+    return TokenStore(path)
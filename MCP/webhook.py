@@ -0,0 +1,216 @@
+import hashlib
+import hmac
+import json
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable
+from urllib.parse import parse_qs, urlparse
+
+from commenter_stats import graph_time
+from config import (
+    FACEBOOK_APP_SECRET,
+    WEBHOOK_HOST,
+    WEBHOOK_PORT,
+    WEBHOOK_QUEUE_SIZE,
+    WEBHOOK_VERIFY_TOKEN,
+)
+
+SIGNATURE_HEADER = "X-Hub-Signature-256"
+
+
+def sign(app_secret: str, body: bytes) -> str:
+    """X-Hub-Signature-256 value for a payload: "sha256=" + HMAC-SHA256(app secret, raw body)."""
+    return "sha256=" + hmac.new(app_secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+
+
+def verify_signature(app_secret: str, body: bytes, header: str | None) -> bool:
+    return bool(header) and hmac.compare_digest(sign(app_secret, body), header.strip())
+
+
+def _graph_time(value: Any) -> str | None:
+    """Webhook times are unix seconds; the comment store uses Graph's created_time text."""
+    if isinstance(value, (int, float)):
+        return graph_time(datetime.fromtimestamp(value, timezone.utc))
+    return value
+
+
+def feed_events(payload: dict[str, Any]) -> list[dict[str, Any]]:
+    """Flatten a Page webhook payload into one event per `feed` change.
+
+    Each event carries page_id, item ("comment", "status", "reaction", ...),
+    verb ("add", "edited", "remove", "hide", "unhide") and, when present,
+    post_id, comment_id, parent_id, message, from and created_time.
+    """
+    if payload.get("object") != "page":
+        return []
+    events = []
+    for entry in payload.get("entry") or []:
+        for change in entry.get("changes") or []:
+            if change.get("field") != "feed":
+                continue
+            value = change.get("value") or {}
+            event = {
+                "page_id": str(entry.get("id")),
+                "item": value.get("item"),
+                "verb": value.get("verb"),
+                "time": entry.get("time"),
+            }
+            for key in ("post_id", "comment_id", "parent_id", "message", "from"):
+                if value.get(key) is not None:
+                    event[key] = value[key]
+            if value.get("created_time") is not None:
+                event["created_time"] = _graph_time(value["created_time"])
+            events.append(event)
+    return events
+
+
+class EventQueue:
+    """Bounded in-memory queue of webhook events; the oldest are dropped when full."""
+
+    def __init__(self, max_size: int = WEBHOOK_QUEUE_SIZE):
+        self._events: deque[dict[str, Any]] = deque(maxlen=max_size)
+        self._lock = threading.Lock()
+        self.received = 0
+        self.dropped = 0
+
+    def push(self, events: list[dict[str, Any]]) -> None:
+        with self._lock:
+            overflow = len(self._events) + len(events) - (self._events.maxlen or 0)
+            self.dropped += max(0, overflow)
+            self.received += len(events)
+            self._events.extend(events)
+
+    def poll(self, max_events: int = 100, page_id: str | None = None) -> list[dict[str, Any]]:
+        """Remove and return up to max_events events (only that page's, if page_id is given)."""
+        with self._lock:
+            if page_id is None:
+                count = min(max_events, len(self._events))
+                return [self._events.popleft() for _ in range(count)]
+            taken, kept = [], deque(maxlen=self._events.maxlen)
+            for event in self._events:
+                if len(taken) < max_events and event.get("page_id") == str(page_id):
+                    taken.append(event)
+                else:
+                    kept.append(event)
+            self._events = kept
+            return taken
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._events)
+
+
+class WebhookReceiver:
+    """HTTP endpoint for Graph Page webhooks, served from a background thread.
+
+    GET answers the subscription handshake (hub.verify_token / hub.challenge).
+    POST checks X-Hub-Signature-256 against the app secret, queues the `feed`
+    change events and hands them to `on_events` (e.g. to update the comment
+    store). Requests with a missing or wrong signature get 403 and are dropped.
+    """
+
+    def __init__(
+        self,
+        app_secret: str | None = FACEBOOK_APP_SECRET,
+        verify_token: str | None = WEBHOOK_VERIFY_TOKEN,
+        queue: EventQueue | None = None,
+        on_events: Callable[[list[dict[str, Any]]], None] | None = None,
+        host: str = WEBHOOK_HOST,
+        port: int = WEBHOOK_PORT or 0,
+    ):
+        if not app_secret:
+            raise ValueError("FACEBOOK_APP_SECRET is required to verify webhook signatures")
+        self.app_secret = app_secret
+        self.verify_token = verify_token
+        self.queue = queue or EventQueue()
+        self.on_events = on_events
+        self.rejected = 0
+        self.errors = 0
+        self.last_event_at: float | None = None
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body: bytes = b"") -> None:
+                self.send_response(status)
+                self.send_header("Content-Type", "text/plain")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                mode = query.get("hub.mode", [""])[0]
+                token = query.get("hub.verify_token", [""])[0]
+                if mode == "subscribe" and receiver.verify_token and hmac.compare_digest(token.encode(), receiver.verify_token.encode()):
+                    self._reply(200, query.get("hub.challenge", [""])[0].encode("utf-8"))
+                else:
+                    self._reply(403)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+                if not verify_signature(receiver.app_secret, body, self.headers.get(SIGNATURE_HEADER)):
+                    receiver.rejected += 1
+                    self._reply(403)
+                    return
+                try:
+                    payload = json.loads(body)
+                except ValueError:
+                    self._reply(400)
+                    return
+                events = feed_events(payload)
+                if events:
+                    receiver.queue.push(events)
+                    receiver.last_event_at = time.time()
+                    if receiver.on_events:
+                        try:
+                            receiver.on_events(events)
+                        except Exception:
+                            # The events stay queued; a failed store update must not make Graph redeliver.
+                            receiver.errors += 1
+                self._reply(200, b"EVENT_RECEIVED")
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "WebhookReceiver":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="facebook-webhook", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "listening": self.running,
+            "url": self.url,
+            "queued": len(self.queue),
+            "received": self.queue.received,
+            "dropped": self.queue.dropped,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "last_event_at": self.last_event_at,
+        }
+
+    def __enter__(self) -> "WebhookReceiver":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
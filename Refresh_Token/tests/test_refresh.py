@@ -0,0 +1,141 @@
+import json
+import sys
+import time
+from importlib.machinery import SourceFileLoader
+from importlib.util import module_from_spec, spec_from_loader
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+# `refresh` imports token_store flat; the stub Graph server lives with the MCP benchmarks.
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT.parent / "MCP" / "benchmarks"))
+
+from stub_graph import StubGraphServer  # noqa: E402
+
+DAY = 86400
+
+
+class FakeGraph:
+    """Token endpoints of the Graph API, with the calls each test made."""
+
+    def __init__(self):
+        self.calls = []
+        self.exchanges = 0
+        self.expires_at = int(time.time()) + 60 * DAY
+        self.base_url = ""
+
+    def __call__(self, method, path, query):
+        endpoint = path.split("/", 2)[-1]
+        self.calls.append(endpoint)
+        if endpoint == "oauth/access_token":
+            self.exchanges += 1
+            return {"access_token": f"long-{self.exchanges}", "token_type": "bearer", "expires_in": 60 * DAY}
+        if endpoint == "debug_token":
+            return {"data": {"is_valid": True, "expires_at": self.expires_at, "scopes": ["pages_show_list"]}}
+        if endpoint == "me/accounts":
+            if "after" in query:
+                return {"data": [{"id": "2", "name": "Beta", "access_token": "page-2"}]}
+            return {
+                "data": [{"id": "1", "name": "Alpha", "access_token": "page-1"}],
+                "paging": {"next": f"{self.base_url}/me/accounts?after=c1&access_token={query['access_token'][0]}"},
+            }
+        return {"error": {"message": f"unexpected {method} {path}"}}
+
+
+@pytest.fixture
+def graph():
+    fake = FakeGraph()
+    with StubGraphServer(fake) as server:
+        fake.base_url = server.base_url
+        yield fake
+
+
+@pytest.fixture
+def refresh(graph, tmp_path, monkeypatch):
+    """A fresh copy of the `refresh` script, configured from the environment like a real run."""
+    monkeypatch.setenv("FB_GRAPH_BASE", graph.base_url)
+    monkeypatch.setenv("FB_APP_ID", "app")
+    monkeypatch.setenv("FB_APP_SECRET", "secret")
+    monkeypatch.setenv("FB_TOKEN_STORE", str(tmp_path / "tokens.json"))
+    monkeypatch.delenv("FB_PAGE_ID", raising=False)
+    monkeypatch.delenv("FB_PAGE_NAME", raising=False)
+    loader = SourceFileLoader("refresh", str(ROOT / "refresh"))
+    module = module_from_spec(spec_from_loader("refresh", loader))
+    loader.exec_module(module)
+    yield module
+    module._session.close()
+
+
+def _store(tmp_path):
+    return json.loads((tmp_path / "tokens.json").read_text(encoding="utf-8"))
+
+
+def test_first_run_bootstraps_user_and_page_tokens(refresh, graph, tmp_path):
+    result = refresh.ensure_tokens(initial_short_user_token="short")
+
+    assert graph.calls == ["oauth/access_token", "debug_token", "me/accounts", "me/accounts"]
+    assert result["user_refreshed"] is True
+    assert result["page_id"] == "1" and result["page_access_token"] == "page-1"
+    assert result["page_ids"] == ["1", "2"]
+    store = _store(tmp_path)
+    assert store["version"] == 2
+    assert store["user"]["access_token"] == "long-1"
+    assert store["user"]["expires_at"] == graph.expires_at
+    assert store["pages"]["2"]["access_token"] == "page-2"
+
+
+def test_first_run_without_short_token_fails(refresh, graph):
+    with pytest.raises(refresh.FBTokenError):
+        refresh.ensure_tokens()
+    assert graph.calls == []
+
+
+def test_steady_state_makes_no_graph_calls(refresh, graph, tmp_path):
+    refresh.ensure_tokens(initial_short_user_token="short")
+    graph.calls.clear()
+
+    result = refresh.ensure_tokens()
+
+    assert graph.calls == []
+    assert result["user_refreshed"] is False
+    assert result["page_access_token"] == "page-1"
+    assert 59 < result["user_days_left"] <= 60
+
+
+def test_refreshes_user_token_near_expiry(refresh, graph, tmp_path):
+    refresh.ensure_tokens(initial_short_user_token="short")
+    store = _store(tmp_path)
+    store["user"]["expires_at"] = int(time.time()) + 2 * DAY
+    (tmp_path / "tokens.json").write_text(json.dumps(store), encoding="utf-8")
+    graph.calls.clear()
+
+    result = refresh.ensure_tokens()
+
+    assert graph.calls == ["oauth/access_token", "debug_token", "me/accounts", "me/accounts"]
+    assert result["user_refreshed"] is True
+    assert _store(tmp_path)["user"]["access_token"] == "long-2"
+    assert result["user_days_left"] > refresh.REFRESH_IF_LESS_THAN_DAYS
+
+
+def test_migrates_legacy_single_page_store(refresh, graph, tmp_path):
+    legacy = {
+        "long_lived_user_token": "legacy-user",
+        "user_token_debug": {"expires_at": int(time.time()) + 30 * DAY, "scopes": ["pages_manage_posts"]},
+        "page_id": 77,
+        "page_name": "Legacy",
+        "page_access_token": "legacy-page",
+    }
+    (tmp_path / "tokens.json").write_text(json.dumps(legacy), encoding="utf-8")
+
+    result = refresh.ensure_tokens()
+
+    assert graph.calls == []
+    assert result["page_id"] == "77" and result["page_access_token"] == "legacy-page"
+    assert result["scopes"] == ["pages_manage_posts"]
+    store = _store(tmp_path)
+    assert store["version"] == 2
+    assert store["user"]["access_token"] == "legacy-user"
+    assert store["pages"] == {"77": {"name": "Legacy", "access_token": "legacy-page", "fetched_at": None}}
+    assert store["default_page_id"] == "77"
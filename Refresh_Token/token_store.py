@@ -0,0 +1,136 @@
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+STORE_VERSION = 2
+
+
+class TokenStore:
+    """
+    Tokenuri Facebook pentru mai multe pagini, salvate într-un singur JSON:
+
+        {
+          "version": 2,
+          "user": {"access_token": ..., "expires_at": 1767225600, "debug": {...}},
+          "pages": {"<page_id>": {"name": ..., "access_token": ..., "fetched_at": ...}},
+          "default_page_id": "<page_id>"
+        }
+
+    expires_at = 0 înseamnă „nu expiră” (așa raportează Graph tokenurile fără
+    expirare); None înseamnă „necunoscut”. Page tokenurile luate din /me/accounts
+    cu un long-lived user token nu expiră, deci nu le verificăm separat.
+
+    Poate fi folosit și ca bibliotecă (ex. de serverul MCP): `page_token(page_id)`
+    citește din memorie și reîncarcă fișierul doar când s-a schimbat pe disc.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.data: Dict[str, Any] = {"version": STORE_VERSION, "user": {}, "pages": {}}
+        self._mtime_ns: Optional[int] = None
+        self.reload_if_changed()
+
+    # --- citire ---------------------------------------------------------------
+
+    def reload_if_changed(self) -> bool:
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except FileNotFoundError:
+            return False
+        if mtime_ns == self._mtime_ns:
+            return False
+        with open(self.path, "r", encoding="utf-8") as f:
+            self.data = _migrate(json.load(f))
+        self._mtime_ns = mtime_ns
+        return True
+
+    @property
+    def user_token(self) -> Optional[str]:
+        return self.data["user"].get("access_token")
+
+    @property
+    def user_expires_at(self) -> Optional[int]:
+        return self.data["user"].get("expires_at")
+
+    @property
+    def default_page_id(self) -> Optional[str]:
+        return self.data.get("default_page_id")
+
+    def page_ids(self) -> List[str]:
+        self.reload_if_changed()
+        return list(self.data["pages"])
+
+    def page(self, page_id: str) -> Optional[Dict[str, Any]]:
+        self.reload_if_changed()
+        return self.data["pages"].get(str(page_id))
+
+    def page_token(self, page_id: Optional[str] = None) -> Optional[str]:
+        """Token pentru page_id (sau pentru pagina implicită)."""
+        page = self.page(page_id if page_id is not None else (self.default_page_id or ""))
+        return page.get("access_token") if page else None
+
+    def user_days_left(self, now: Optional[float] = None) -> Optional[float]:
+        expires_at = self.user_expires_at
+        if expires_at is None:
+            return None
+        if expires_at == 0:
+            return float("inf")
+        return (expires_at - int(now if now is not None else time.time())) / 86400.0
+
+    # --- scriere --------------------------------------------------------------
+
+    def set_user_token(self, token: str, expires_at: Optional[int], debug: Optional[Dict[str, Any]] = None) -> None:
+        user = {"access_token": token, "expires_at": expires_at, "updated_at": int(time.time())}
+        if debug is not None:
+            user["debug"] = debug
+        self.data["user"] = user
+
+    def set_pages(self, accounts: List[Dict[str, Any]]) -> None:
+        """Înlocuiește paginile cu lista din /me/accounts (data=[{id,name,access_token,...}])."""
+        now = int(time.time())
+        self.data["pages"] = {
+            str(p["id"]): {
+                "name": p.get("name", ""),
+                "access_token": p["access_token"],
+                "tasks": p.get("tasks", []),
+                "fetched_at": now,
+            }
+            for p in accounts
+            if p.get("id") and p.get("access_token")
+        }
+
+    def set_default_page(self, page_id: str) -> None:
+        self.data["default_page_id"] = str(page_id)
+
+    def save(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.data, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, self.path)
+        self._mtime_ns = os.stat(self.path).st_mtime_ns
+
+
+def _migrate(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """Convertește store-ul vechi (o singură pagină, chei plate) la versiunea 2."""
+    if raw.get("version") == STORE_VERSION:
+        raw.setdefault("user", {})
+        raw.setdefault("pages", {})
+        return raw
+    data: Dict[str, Any] = {"version": STORE_VERSION, "user": {}, "pages": {}}
+    if raw.get("long_lived_user_token"):
+        debug = raw.get("user_token_debug") or {}
+        data["user"] = {
+            "access_token": raw["long_lived_user_token"],
+            "expires_at": debug.get("expires_at"),
+            "debug": debug,
+        }
+    if raw.get("page_id") and raw.get("page_access_token"):
+        page_id = str(raw["page_id"])
+        data["pages"][page_id] = {
+            "name": raw.get("page_name", ""),
+            "access_token": raw["page_access_token"],
+            "fetched_at": None,
+        }
+        data["default_page_id"] = page_id
+    return data
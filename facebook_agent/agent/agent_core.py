@@ -2,28 +2,49 @@ from __future__ import annotations
 
 import asyncio
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from typing import List, Optional, Tuple
 from zoneinfo import ZoneInfo
 
-from .config_loader import load_agents_config, load_clients, load_global_config
-from .llm import LLMClient
-from .logger_csv import append_log, count_success_for_day
+from .config_loader import ClientRegistry, ClientsDiff, load_agents_config, load_global_config
+from .llm import AsyncLLMClient, LLMClient
+from .log_store import open_log_store
 from .mcp_client import MCPClient
-from .models import AgentPersona, Campaign, ClientConfig, GlobalConfig
-from .scheduler import get_due_slots_for_client
+from .metrics import CycleMetrics
+from .models import AgentPersona, Campaign, ClientConfig, GlobalConfig, Slot
+from .outbox import Outbox
+from .scheduler import SlotQueue, upcoming_fire_times
 
 logger = logging.getLogger(__name__)
 
 
+def _local_timestamp(ts: datetime, tz: ZoneInfo) -> datetime:
+    """Log timestamps in the client's timezone, like the slot days they are logged with."""
+    if ts.tzinfo is None:
+        ts = ts.replace(tzinfo=timezone.utc)
+    return ts.astimezone(tz)
+
+
 class SocialMediaAgent:
-    def __init__(self, base_dir: Path):
+    def __init__(self, base_dir: Path, open_slots_early: bool = True):
         self.base_dir = base_dir
-        self.global_cfg: GlobalConfig = load_global_config(base_dir)
-        self.agents_cfg = load_agents_config(base_dir)
-        self.clients = load_clients(base_dir)
-        self.llm_client = LLMClient(self.global_cfg.llm)
+        # Cron runs open slot windows `tolerance_minutes` early; the daemon wakes at fire times instead.
+        self.open_slots_early = open_slots_early
+        # Collects until the end of the next cycle, so startup cost is reported with it.
+        self.metrics = CycleMetrics()
+        with self.metrics.span("config_load"):
+            self.global_cfg: GlobalConfig = load_global_config(base_dir)
+            self.agents_cfg = load_agents_config(base_dir)
+            self.client_registry = ClientRegistry(base_dir)
+            self.clients = self.client_registry.load()
+        llm_cfg = self.global_cfg.llm
+        self.llm_client = AsyncLLMClient(llm_cfg) if llm_cfg.use_async else LLMClient(llm_cfg)
         self.log_path = Path(self.global_cfg.logging.file)
+        self.log_store = open_log_store(self.global_cfg.logging)
+        self.slot_queue: Optional[SlotQueue] = None
+        outbox_cfg = self.global_cfg.outbox
+        self.outbox: Optional[Outbox] = Outbox(Path(outbox_cfg.file)) if outbox_cfg and outbox_cfg.enabled else None
 
     def _get_persona(self, agent_id: str) -> AgentPersona:
         if agent_id not in self.agents_cfg.agents:
@@ -35,70 +56,265 @@ class SocialMediaAgent:
             raise KeyError(f"Campaign '{campaign_name}' not found for client {client.client_id}")
         return client.campaigns[campaign_name]
 
-    async def run_cycle_once(self, now: datetime) -> None:
-        mcp_cfg = self.global_cfg.facebook_mcp
-        async with MCPClient(mcp_cfg) as mcp:
-            for client in self.clients:
-                persona = self._get_persona(client.agent_id)
-                tz = ZoneInfo(client.tz_name)
-                local_now = now.astimezone(tz)
+    async def _generate_post_text(
+        self, persona: AgentPersona, client: ClientConfig, campaign: Campaign, now: datetime
+    ) -> str:
+        with self.metrics.span("llm"):
+            if self.global_cfg.llm.use_async:
+                return await self.llm_client.generate_post_text(persona, client, campaign, now)
+            # LLMClient is blocking; keep the event loop (and MCP stdio) responsive.
+            return await asyncio.to_thread(self.llm_client.generate_post_text, persona, client, campaign, now)
 
-                due_slots = get_due_slots_for_client(
-                    client,
+    def _collect_due_slots(self, now: datetime) -> List[Tuple[ClientConfig, List[Tuple[Slot, str, datetime]]]]:
+        if self.slot_queue is None:
+            with self.metrics.span("schedule_build"):
+                self.slot_queue = SlotQueue.build(
+                    self.clients,
                     now,
-                    log_path=self.log_path,
                     tolerance_minutes=self.global_cfg.scheduler.tolerance_minutes,
                     platform="facebook",
+                    open_early=self.open_slots_early,
                 )
+        with self.metrics.span("schedule_due"):
+            due = self.slot_queue.due(now)
+        work = []
+        with self.metrics.span("dedupe_lookup"):
+            for client, slots in due:
+                tz = ZoneInfo(client.tz_name)
+                due_slots = [
+                    (slot, "facebook", fire)
+                    for slot, fire in slots
+                    if not self.log_store.has_success_for_slot(
+                        fire.astimezone(tz).date(), client.client_id, slot.id, "facebook"
+                    )
+                ]
+                self.metrics.inc("slots_due", len(slots))
+                self.metrics.inc("slots_already_posted", len(slots) - len(due_slots))
+                if due_slots:
+                    work.append((client, due_slots))
+        return work
+
+    def reload_clients(self, now: datetime) -> ClientsDiff:
+        """
+        Pick up edited, added and removed client files. The new client tuple is
+        swapped in at once and only the affected clients are rescheduled.
+        """
+        with self.metrics.span("config_reload"):
+            diff = self.client_registry.refresh()
+        if not diff:
+            return diff
+        self.clients = self.client_registry.clients
+        if self.slot_queue is not None:
+            for client_id in diff.removed:
+                self.slot_queue.remove_client(client_id)
+            for client in diff.added + diff.updated:
+                self.slot_queue.add_client(client, now)
+        logger.info(
+            "Reloaded clients: %d added, %d updated, %d removed",
+            len(diff.added),
+            len(diff.updated),
+            len(diff.removed),
+        )
+        return diff
+
+    async def pregenerate(self, now: datetime, lookahead_hours: Optional[float] = None) -> int:
+        """
+        Generate and store drafts for slots firing within the lookahead window
+        (outbox.lookahead_hours by default), so slot time only pays the MCP call.
+        Slots that already have a draft or were already posted are skipped; an
+        LLM failure only means that slot falls back to live generation.
+        Returns the number of drafts stored.
+        """
+        if self.outbox is None:
+            return 0
+        hours = self.global_cfg.outbox.lookahead_hours if lookahead_hours is None else lookahead_hours
+        yesterday = now.astimezone(ZoneInfo(self.global_cfg.timezone)).date() - timedelta(days=1)
+        self.outbox.purge_before(yesterday)
+
+        todo = []
+        for client in self.clients:
+            tz = ZoneInfo(client.tz_name)
+            for slot, fire in upcoming_fire_times(client, now, now + timedelta(hours=hours)):
+                local_fire = fire.astimezone(tz)
+                day = local_fire.date()
+                if self.outbox.has(client.client_id, slot.id, day, "facebook"):
+                    continue
+                if self.log_store.has_success_for_slot(day, client.client_id, slot.id, "facebook"):
+                    continue
+                todo.append((client, slot, local_fire))
 
-                for slot, platform in due_slots:
-                    todays_posts = count_success_for_day(self.log_path, local_now.date(), client.client_id, platform)
-                    if todays_posts >= client.guardrails.max_posts_per_day:
-                        logger.info(
-                            "Guardrail reached for client %s: %s posts on %s",
-                            client.client_id,
-                            todays_posts,
-                            local_now.date(),
-                        )
-                        continue
+        limit = asyncio.Semaphore(max(1, self.global_cfg.scheduler.max_in_flight))
 
+        async def draft(client: ClientConfig, slot: Slot, local_fire: datetime) -> bool:
+            async with limit:
+                try:
+                    persona = self._get_persona(client.agent_id)
                     campaign = self._get_campaign(client, slot.campaign)
-                    try:
-                        message = self.llm_client.generate_post_text(persona, client, campaign, local_now)
-                        result = await mcp.post_text(
-                            page_id=client.platforms.facebook.page_id or "",
-                            message=message,
-                        )
-                        status = "success" if result.success else "failed"
-                        append_log(
-                            self.log_path,
-                            timestamp=result.timestamp,
-                            client_id=client.client_id,
-                            slot_id=slot.id,
-                            campaign=slot.campaign,
-                            platform=platform,
-                            page_id=result.page_id,
-                            post_id=result.post_id,
-                            status=status,
-                            error=result.error,
-                        )
-                    except Exception as exc:  # noqa: BLE001
-                        logger.exception("Failed to post for client %s slot %s", client.client_id, slot.id)
-                        append_log(
-                            self.log_path,
-                            timestamp=datetime.utcnow(),
-                            client_id=client.client_id,
-                            slot_id=slot.id,
-                            campaign=slot.campaign,
-                            platform=platform,
-                            page_id=client.platforms.facebook.page_id or "",
-                            post_id=None,
-                            status="failed",
-                            error=str(exc),
-                        )
+                    message = await self._generate_post_text(persona, client, campaign, local_fire)
+                except Exception:  # noqa: BLE001
+                    logger.exception("Pre-generation failed for client %s slot %s", client.client_id, slot.id)
+                    self.metrics.inc("drafts_failed")
+                    return False
+            return self.outbox.put(client.client_id, slot.id, local_fire.date(), "facebook", message)
+
+        with self.metrics.span("pregenerate"):
+            stored = sum(await asyncio.gather(*(draft(*item) for item in todo)))
+        self.metrics.inc("drafts_generated", stored)
+        if todo:
+            logger.info("Pre-generated %d of %d drafts up to %s", stored, len(todo), now + timedelta(hours=hours))
+        return stored
+
+    def next_wakeup(self) -> Optional[datetime]:
+        """When the earliest upcoming slot window opens, once the queue has been built."""
+        return self.slot_queue.next_wakeup() if self.slot_queue else None
+
+    async def run_cycle_once(self, now: datetime, mcp: Optional[MCPClient] = None) -> None:
+        """
+        Run one scheduling pass. Clients are processed concurrently, bounded by
+        scheduler.max_in_flight; slots of a single client stay sequential so the
+        per-day guardrail always sees the client's previous posts.
+
+        When `mcp` is given (daemon mode) that session is reused and reconnected
+        if needed; otherwise a session is opened for this pass only. Either way
+        no MCP process is started when nothing is due.
+        """
+        try:
+            with self.metrics.span("cycle"):
+                await self._run_cycle(now, mcp)
+        finally:
+            self._export_metrics()
+
+    async def _run_cycle(self, now: datetime, mcp: Optional[MCPClient]) -> None:
+        with self.metrics.span("log_maintain"):
+            self.log_store.maintain(now.astimezone(ZoneInfo(self.global_cfg.timezone)).date())
+        work = self._collect_due_slots(now)
+        if not work:
+            logger.debug("No due slots at %s", now.isoformat())
+            return
+
+        if mcp is not None:
+            with self.metrics.span("mcp_connect"):
+                await mcp.ensure_connected()
+            await self._run_work(mcp, work, now)
+            return
+        async with MCPClient(self.global_cfg.facebook_mcp) as session:
+            await self._run_work(session, work, now)
+
+    def reset_metrics(self) -> None:
+        """Drop what was recorded outside a cycle (client reloads, drafting) so the next cycle reports only itself."""
+        self.metrics = CycleMetrics()
+
+    async def aclose(self) -> None:
+        """Release the LLM client, the log store and the outbox (daemon shutdown)."""
+        if isinstance(self.llm_client, AsyncLLMClient):
+            await self.llm_client.aclose()
+        self.log_store.close()
+        if self.outbox is not None:
+            self.outbox.close()
+
+    def _export_metrics(self) -> None:
+        metrics, self.metrics = self.metrics, CycleMetrics()
+        if not self.global_cfg.logging.metrics:
+            return
+        try:
+            metrics.write(self.log_path)
+        except OSError:
+            logger.exception("Could not write cycle metrics next to %s", self.log_path)
+
+    async def _run_work(
+        self, mcp: MCPClient, work: List[Tuple[ClientConfig, List[Tuple[Slot, str, datetime]]]], now: datetime
+    ) -> None:
+        limit = asyncio.Semaphore(max(1, self.global_cfg.scheduler.max_in_flight))
+
+        async def run_client(client: ClientConfig, due_slots: List[Tuple[Slot, str, datetime]]) -> None:
+            async with limit:
+                await self._run_client(mcp, client, due_slots, now)
+
+        results = await asyncio.gather(*(run_client(c, d) for c, d in work), return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def _run_client(
+        self, mcp: MCPClient, client: ClientConfig, due_slots: List[Tuple[Slot, str, datetime]], now: datetime
+    ) -> None:
+        persona = self._get_persona(client.agent_id)
+        tz = ZoneInfo(client.tz_name)
+
+        for slot, platform, fire in due_slots:
+            local_fire = fire.astimezone(tz)
+            day = local_fire.date()
+            with self.metrics.span("guardrail_lookup"):
+                todays_posts = self.log_store.count_success_for_day(day, client.client_id, platform)
+            if todays_posts >= client.guardrails.max_posts_per_day:
+                self.metrics.inc("posts_skipped_guardrail")
+                logger.info(
+                    "Guardrail reached for client %s: %s posts on %s",
+                    client.client_id,
+                    todays_posts,
+                    day,
+                )
+                continue
+
+            campaign = self._get_campaign(client, slot.campaign)
+            self.metrics.inc("posts_attempted")
+            draft = None
+            if self.outbox is not None:
+                draft = self.outbox.peek(client.client_id, slot.id, day, platform)
+                self.metrics.inc("drafts_used" if draft is not None else "drafts_missing")
+            try:
+                if draft is not None:
+                    message = draft
+                else:
+                    message = await self._generate_post_text(persona, client, campaign, local_fire)
+                with self.metrics.span("mcp_post"):
+                    result = await mcp.post_text(
+                        page_id=client.platforms.facebook.page_id or "",
+                        message=message,
+                    )
+                status = "success" if result.success else "failed"
+                self.metrics.inc("posts_succeeded" if result.success else "posts_failed")
+                if result.success and draft is not None:
+                    # Failed posts keep their draft for the retry on the next tick.
+                    self.outbox.remove(client.client_id, slot.id, day, platform)
+                self._append_log(
+                    timestamp=_local_timestamp(result.timestamp, tz),
+                    client_id=client.client_id,
+                    slot_id=slot.id,
+                    campaign=slot.campaign,
+                    platform=platform,
+                    page_id=result.page_id,
+                    post_id=result.post_id,
+                    status=status,
+                    error=result.error,
+                    slot_day=day,
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("Failed to post for client %s slot %s", client.client_id, slot.id)
+                self.metrics.inc("posts_failed")
+                self._append_log(
+                    timestamp=datetime.now(tz),
+                    client_id=client.client_id,
+                    slot_id=slot.id,
+                    campaign=slot.campaign,
+                    platform=platform,
+                    page_id=client.platforms.facebook.page_id or "",
+                    post_id=None,
+                    status="failed",
+                    error=str(exc),
+                    slot_day=day,
+                )
+
+    def _append_log(self, **row) -> None:
+        with self.metrics.span("log_append"):
+            self.log_store.append(**row)
 
 
 async def run_once(base_dir: Path, now: datetime) -> None:
     agent = SocialMediaAgent(base_dir=base_dir)
     await agent.run_cycle_once(now)
 
+
+async def run_pregenerate(base_dir: Path, now: datetime, lookahead_hours: Optional[float] = None) -> int:
+    agent = SocialMediaAgent(base_dir=base_dir)
+    return await agent.pregenerate(now, lookahead_hours=lookahead_hours)
@@ -1,12 +1,16 @@
 from __future__ import annotations
 
+import hashlib
 import json
+import logging
 from pathlib import Path
-from typing import Dict, Tuple
+from typing import Dict, List, NamedTuple, Optional, Tuple
 from zoneinfo import ZoneInfo
 
 from .models import AgentsConfig, ClientConfig, ClientsRoot, GlobalConfig
 
+logger = logging.getLogger(__name__)
+
 
 def load_json(path: Path) -> Dict:
     with path.open("r", encoding="utf-8") as f:
@@ -27,23 +31,120 @@ def load_agents_config(base_dir: Path) -> AgentsConfig:
     return AgentsConfig.model_validate(load_json(cfg_path))
 
 
-def load_clients(base_dir: Path) -> Tuple[ClientConfig, ...]:
+def _clients_dir(base_dir: Path) -> Path:
     clients_dir = base_dir / "config" / "clients"
     if not clients_dir.exists():
         raise FileNotFoundError(f"Missing clients directory at {clients_dir}")
+    return clients_dir
+
+
+def _validate_client(data: Dict, path: Path) -> ClientConfig:
+    cfg = ClientConfig.model_validate(data)
+    # Validate timezone
+    try:
+        ZoneInfo(cfg.tz_name)
+    except Exception as exc:
+        raise ValueError(f"Invalid timezone '{cfg.tz_name}' in {path}") from exc
+    # Validate page id presence
+    if not cfg.platforms.facebook.page_id:
+        raise ValueError(f"Missing facebook.page_id for client '{cfg.client_id}' in {path}")
+    return cfg
+
 
+def load_clients(base_dir: Path) -> Tuple[ClientConfig, ...]:
+    clients_dir = _clients_dir(base_dir)
     clients: list[ClientConfig] = []
     for path in sorted(clients_dir.glob("*.json")):
-        cfg = ClientConfig.model_validate(load_json(path))
-        # Validate timezone
-        try:
-            ZoneInfo(cfg.tz_name)
-        except Exception as exc:
-            raise ValueError(f"Invalid timezone '{cfg.tz_name}' in {path}") from exc
-        # Validate page id presence
-        if not cfg.platforms.facebook.page_id:
-            raise ValueError(f"Missing facebook.page_id for client '{cfg.client_id}' in {path}")
-        clients.append(cfg)
+        clients.append(_validate_client(load_json(path), path))
     return tuple(clients)
 
 
+class _ClientFile(NamedTuple):
+    mtime_ns: int
+    size: int
+    digest: str
+    client: Optional[ClientConfig]  # last good version, None if never valid
+
+
+class ClientsDiff(NamedTuple):
+    added: Tuple[ClientConfig, ...] = ()
+    updated: Tuple[ClientConfig, ...] = ()
+    removed: Tuple[str, ...] = ()
+    failed: Tuple[Tuple[Path, str], ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.updated or self.removed)
+
+
+class ClientRegistry:
+    """
+    Tracks config/clients/*.json by mtime, size and content hash so a refresh
+    only re-validates files that actually changed. A file that fails validation
+    keeps its last good version active.
+    """
+
+    def __init__(self, base_dir: Path):
+        self.clients_dir = _clients_dir(base_dir)
+        self._files: Dict[Path, _ClientFile] = {}
+
+    @property
+    def clients(self) -> Tuple[ClientConfig, ...]:
+        return tuple(f.client for _, f in sorted(self._files.items()) if f.client is not None)
+
+    def load(self) -> Tuple[ClientConfig, ...]:
+        """Initial load; any invalid file is an error, as with load_clients."""
+        self._files.clear()
+        for path in sorted(self.clients_dir.glob("*.json")):
+            raw = path.read_bytes()
+            stat = path.stat()
+            client = _validate_client(json.loads(raw), path)
+            self._files[path] = _ClientFile(stat.st_mtime_ns, stat.st_size, hashlib.sha256(raw).hexdigest(), client)
+        return self.clients
+
+    def refresh(self) -> ClientsDiff:
+        added: List[ClientConfig] = []
+        updated: List[ClientConfig] = []
+        removed: List[str] = []
+        failed: List[Tuple[Path, str]] = []
+
+        seen = set()
+        for path in sorted(self.clients_dir.glob("*.json")):
+            seen.add(path)
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            known = self._files.get(path)
+            if known and (known.mtime_ns, known.size) == (stat.st_mtime_ns, stat.st_size):
+                continue
+            raw = path.read_bytes()
+            digest = hashlib.sha256(raw).hexdigest()
+            if known and known.digest == digest:
+                self._files[path] = known._replace(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                continue
+            try:
+                client = _validate_client(json.loads(raw), path)
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Ignoring invalid client config %s (keeping last good version): %s", path, exc)
+                failed.append((path, str(exc)))
+                previous = known.client if known else None
+                # Remember the bad digest so the file is not re-validated until it changes again.
+                self._files[path] = _ClientFile(stat.st_mtime_ns, stat.st_size, digest, previous)
+                continue
+
+            previous = known.client if known else None
+            self._files[path] = _ClientFile(stat.st_mtime_ns, stat.st_size, digest, client)
+            if previous is None:
+                added.append(client)
+            elif previous.client_id != client.client_id:
+                removed.append(previous.client_id)
+                added.append(client)
+            else:
+                updated.append(client)
+
+        for path in [p for p in self._files if p not in seen]:
+            gone = self._files.pop(path)
+            if gone.client is not None:
+                removed.append(gone.client.client_id)
+
+        return ClientsDiff(tuple(added), tuple(updated), tuple(removed), tuple(failed))
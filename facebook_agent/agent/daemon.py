@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import signal
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+from .agent_core import SocialMediaAgent
+from .mcp_client import MCPClient
+
+logger = logging.getLogger(__name__)
+
+
+def seconds_until_next_tick(now: datetime, tick_minutes: int) -> float:
+    """Seconds until the next wall-clock multiple of `tick_minutes` (e.g. :00/:30)."""
+    period = max(1, tick_minutes) * 60
+    ts = now.timestamp()
+    return period - (ts % period)
+
+
+def seconds_until_next_wake(now: datetime, tick_minutes: int, next_due: Optional[datetime]) -> float:
+    """Next tick boundary, or earlier if a slot is due before it."""
+    delay = seconds_until_next_tick(now, tick_minutes)
+    if next_due is not None:
+        delay = min(delay, max(0.0, (next_due - now).total_seconds()))
+    return delay
+
+
+async def _wait(stop: asyncio.Event, seconds: float) -> None:
+    try:
+        await asyncio.wait_for(stop.wait(), timeout=seconds)
+    except asyncio.TimeoutError:
+        pass
+
+
+async def run_daemon(
+    base_dir: Path, stop: Optional[asyncio.Event] = None, max_ticks: Optional[int] = None
+) -> None:
+    """
+    Long-running mode: config is loaded once and a single MCP session is kept
+    warm across ticks. Client files are re-checked every tick and only changed
+    ones are re-validated. Between ticks it sleeps until the next tick boundary
+    or until the next slot's fire time, whichever is first; slots are never
+    posted ahead of their time, and a late tick still catches up on slots fired
+    up to `tolerance_minutes` ago. With the outbox
+    enabled, each tick also drafts texts for slots inside the lookahead window. The session is
+    only started when a slot is first due and is restarted by the agent if the
+    process died between ticks.
+    """
+    stop = stop or asyncio.Event()
+    agent = SocialMediaAgent(base_dir=base_dir, open_slots_early=False)
+    tick_minutes = agent.global_cfg.scheduler.tick_minutes
+    mcp = MCPClient(agent.global_cfg.facebook_mcp)
+    ticks = 0
+    try:
+        while not stop.is_set():
+            now = datetime.now(timezone.utc)
+            try:
+                agent.reload_clients(now)
+                agent.reset_metrics()
+                await agent.run_cycle_once(now, mcp=mcp)
+                await agent.pregenerate(now)
+            except Exception:  # noqa: BLE001
+                logger.exception("Cycle at %s failed", now.isoformat())
+            finally:
+                agent.reset_metrics()
+            ticks += 1
+            if max_ticks is not None and ticks >= max_ticks:
+                break
+            await _wait(
+                stop, seconds_until_next_wake(datetime.now(timezone.utc), tick_minutes, agent.next_wakeup())
+            )
+    finally:
+        try:
+            await mcp.close()
+        finally:
+            await agent.aclose()
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    base_dir = Path(__file__).resolve().parent.parent
+
+    async def _run() -> None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        await run_daemon(base_dir, stop=stop)
+
+    asyncio.run(_run())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,50 +1,101 @@
 from __future__ import annotations
 
+import asyncio
 import os
 from datetime import datetime
+from typing import List
 
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
 
 from .models import AgentPersona, Campaign, ClientConfig, LLMConfig
 
 
+def build_messages(persona: AgentPersona, client: ClientConfig, campaign: Campaign, now: datetime) -> List[dict]:
+    prompt = (
+        "You are a concise social media copywriter.\n"
+        f"Brand: {client.display_name}\n"
+        f"Niche: {client.business.niche}\n"
+        f"City: {client.business.city}\n"
+        f"Language: {persona.language}\n"
+        f"Tone: {persona.tone}\n"
+        f"Style notes: {persona.style_notes}\n"
+        f"Content mix: {persona.content_mix or 'short updates'}\n"
+        f"Campaign: {campaign.objective}. Notes: {campaign.notes or 'n/a'}\n"
+        f"Date/time: {now.isoformat()}\n"
+        f"Max characters: {persona.max_chars}\n"
+        "Write ONE post message only. No hashtags unless critical. No emojis unless implied by tone.\n"
+    )
+    return [
+        {"role": "system", "content": "You write short, on-brand Facebook posts."},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def _finalize_text(completion, persona: AgentPersona) -> str:
+    text = completion.choices[0].message.content.strip()
+    if len(text) > persona.max_chars:
+        text = text[: persona.max_chars - 1].rstrip() + "…"
+    return text
+
+
+def _require_api_key() -> str:
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        raise RuntimeError("OPENAI_API_KEY is required")
+    return api_key
+
+
 class LLMClient:
     def __init__(self, cfg: LLMConfig):
         self.cfg = cfg
-        api_key = os.getenv("OPENAI_API_KEY")
-        if not api_key:
-            raise RuntimeError("OPENAI_API_KEY is required")
-        self.client = OpenAI(api_key=api_key)
+        self.client = OpenAI(
+            api_key=_require_api_key(),
+            base_url=cfg.base_url,
+            timeout=cfg.timeout_seconds,
+            max_retries=cfg.max_retries,
+        )
 
     def generate_post_text(
         self, persona: AgentPersona, client: ClientConfig, campaign: Campaign, now: datetime
     ) -> str:
-        prompt = (
-            "You are a concise social media copywriter.\n"
-            f"Brand: {client.display_name}\n"
-            f"Niche: {client.business.niche}\n"
-            f"City: {client.business.city}\n"
-            f"Language: {persona.language}\n"
-            f"Tone: {persona.tone}\n"
-            f"Style notes: {persona.style_notes}\n"
-            f"Content mix: {persona.content_mix or 'short updates'}\n"
-            f"Campaign: {campaign.objective}. Notes: {campaign.notes or 'n/a'}\n"
-            f"Date/time: {now.isoformat()}\n"
-            f"Max characters: {persona.max_chars}\n"
-            "Write ONE post message only. No hashtags unless critical. No emojis unless implied by tone.\n"
-        )
-
         completion = self.client.chat.completions.create(
             model=self.cfg.model,
             max_tokens=self.cfg.max_tokens,
             temperature=self.cfg.temperature,
-            messages=[
-                {"role": "system", "content": "You write short, on-brand Facebook posts."},
-                {"role": "user", "content": prompt},
-            ],
+            messages=build_messages(persona, client, campaign, now),
         )
-        text = completion.choices[0].message.content.strip()
-        if len(text) > persona.max_chars:
-            text = text[: persona.max_chars - 1].rstrip() + "…"
-        return text
+        return _finalize_text(completion, persona)
+
+
+class AsyncLLMClient:
+    """
+    Non-blocking variant built on AsyncOpenAI. At most
+    `cfg.max_concurrent_requests` completions are in flight at once; each
+    request is bounded by `cfg.timeout_seconds`.
+    """
+
+    def __init__(self, cfg: LLMConfig):
+        self.cfg = cfg
+        self.client = AsyncOpenAI(
+            api_key=_require_api_key(),
+            base_url=cfg.base_url,
+            timeout=cfg.timeout_seconds,
+            max_retries=cfg.max_retries,
+        )
+        self._limit = asyncio.Semaphore(max(1, cfg.max_concurrent_requests))
+
+    async def generate_post_text(
+        self, persona: AgentPersona, client: ClientConfig, campaign: Campaign, now: datetime
+    ) -> str:
+        async with self._limit:
+            completion = await self.client.chat.completions.create(
+                model=self.cfg.model,
+                max_tokens=self.cfg.max_tokens,
+                temperature=self.cfg.temperature,
+                messages=build_messages(persona, client, campaign, now),
+                timeout=self.cfg.timeout_seconds,
+            )
+        return _finalize_text(completion, persona)
 
+    async def aclose(self) -> None:
+        await self.client.close()
@@ -0,0 +1,542 @@
+from __future__ import annotations
+
+import abc
+import argparse
+import csv
+import gzip
+import logging
+import os
+import shutil
+import sqlite3
+from collections import Counter
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .logger_csv import LOG_HEADER, append_log, ensure_log_file, read_log_rows, row_slot_day
+from .models import LoggingConfig
+
+logger = logging.getLogger(__name__)
+
+
+def _open_text(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", newline="", encoding="utf-8")
+    return path.open("r", newline="", encoding="utf-8")
+
+
+def iter_csv_rows(log_path: Path) -> Iterator[dict]:
+    """Rows of a CSV log, transparently reading gzip-compressed partitions."""
+    if not log_path.exists():
+        return
+    with _open_text(log_path) as f:
+        yield from read_log_rows(f)
+
+
+class LogStore(abc.ABC):
+    """
+    Backend for the posts log. The scheduler (dedupe) and the guardrail check
+    only ever ask day-scoped questions, so backends are free to index by day.
+    A row's day is `slot_day`, the local day of the slot it was posted for;
+    it defaults to the timestamp's date and differs only when a late slot
+    posts after midnight.
+    """
+
+    @abc.abstractmethod
+    def append(
+        self,
+        timestamp: datetime,
+        client_id: str,
+        slot_id: str,
+        campaign: str,
+        platform: str,
+        page_id: Optional[str],
+        post_id: Optional[str],
+        status: str,
+        error: Optional[str] = None,
+        slot_day: Optional[date] = None,
+    ) -> None:
+        ...
+
+    @abc.abstractmethod
+    def has_success_for_slot(self, day: date, client_id: str, slot_id: str, platform: str) -> bool:
+        ...
+
+    @abc.abstractmethod
+    def count_success_for_day(self, day: date, client_id: str, platform: str) -> int:
+        ...
+
+    def maintain(self, today: date) -> None:
+        """Housekeeping hook (rotation, compaction); no-op by default."""
+        return None
+
+    def close(self) -> None:
+        return None
+
+
+class CsvLogStore(LogStore):
+    """
+    CSV backend. The file is scanned once and kept as an in-memory index of
+    successful posts; the index is rebuilt only when the file is changed by
+    someone else (size/mtime differ from what we last wrote).
+    """
+
+    def __init__(self, log_path: Path):
+        self.log_path = log_path
+        self._slot_index: Optional[Counter] = None
+        self._day_index: Optional[Counter] = None
+        self._stat: Optional[Tuple[int, int]] = None
+
+    def _current_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.log_path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def _ensure_index(self) -> None:
+        stat = self._current_stat()
+        if self._slot_index is not None and stat == self._stat:
+            return
+        slot_index: Counter = Counter()
+        day_index: Counter = Counter()
+        for row in iter_csv_rows(self.log_path):
+            if row.get("status") != "success":
+                continue
+            day = row_slot_day(row)
+            if day is None:
+                continue
+            client_id, platform = row.get("client_id"), row.get("platform")
+            slot_index[(day, client_id, platform, row.get("slot_id"))] += 1
+            day_index[(day, client_id, platform)] += 1
+        self._slot_index, self._day_index, self._stat = slot_index, day_index, stat
+
+    def append(
+        self,
+        timestamp: datetime,
+        client_id: str,
+        slot_id: str,
+        campaign: str,
+        platform: str,
+        page_id: Optional[str],
+        post_id: Optional[str],
+        status: str,
+        error: Optional[str] = None,
+        slot_day: Optional[date] = None,
+    ) -> None:
+        fresh = self._slot_index is not None and self._current_stat() == self._stat
+        append_log(
+            self.log_path,
+            timestamp=timestamp,
+            client_id=client_id,
+            slot_id=slot_id,
+            campaign=campaign,
+            platform=platform,
+            page_id=page_id,
+            post_id=post_id,
+            status=status,
+            error=error,
+            slot_day=slot_day,
+        )
+        if not fresh:
+            # Someone else touched the file (or no index yet); rebuild lazily.
+            self._slot_index = None
+            return
+        if status == "success":
+            day = slot_day or timestamp.date()
+            self._slot_index[(day, client_id, platform, slot_id)] += 1
+            self._day_index[(day, client_id, platform)] += 1
+        self._stat = self._current_stat()
+
+    def has_success_for_slot(self, day: date, client_id: str, slot_id: str, platform: str) -> bool:
+        self._ensure_index()
+        return self._slot_index[(day, client_id, platform, slot_id)] > 0
+
+    def count_success_for_day(self, day: date, client_id: str, platform: str) -> int:
+        self._ensure_index()
+        return self._day_index[(day, client_id, platform)]
+
+
+def compact_rows(rows: List[dict]) -> List[dict]:
+    """
+    Collapse repeated failures of the same client/slot/platform into one summary
+    row, placed where the last failure was. Successes are kept untouched.
+    """
+    failures: Dict[Tuple[str, str, str], List[dict]] = {}
+    for row in rows:
+        if row.get("status") == "failed":
+            failures.setdefault((row.get("client_id"), row.get("slot_id"), row.get("platform")), []).append(row)
+
+    compacted = []
+    for row in rows:
+        if row.get("status") != "failed":
+            compacted.append(row)
+            continue
+        group = failures[(row.get("client_id"), row.get("slot_id"), row.get("platform"))]
+        if len(group) == 1:
+            compacted.append(row)
+        elif row is group[-1]:
+            summary = dict(row)
+            summary["error"] = (
+                f"{len(group)} failed attempts between {group[0].get('timestamp_iso')} and "
+                f"{row.get('timestamp_iso')}; last error: {row.get('error') or 'n/a'}"
+            )
+            compacted.append(summary)
+    return compacted
+
+
+def _write_rows(path: Path, rows: List[dict]) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=LOG_HEADER, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp, path)
+
+
+class PartitionedCsvLogStore(LogStore):
+    """
+    CSV log split into one file per day next to `log_path`
+    (posts_log.csv -> posts_log-2026-01-02.csv). Day-scoped lookups open only
+    that day's partition. maintain() compacts and gzips partitions older than
+    `compress_after_days` and deletes those older than `retention_days`.
+    """
+
+    MAX_OPEN_PARTITIONS = 8
+
+    def __init__(
+        self,
+        log_path: Path,
+        retention_days: Optional[int] = None,
+        compress_after_days: int = 2,
+        compact: bool = True,
+    ):
+        self.log_path = log_path
+        self.retention_days = retention_days
+        self.compress_after_days = compress_after_days
+        self.compact = compact
+        self._stores: Dict[Path, CsvLogStore] = {}
+        self._maintained_on: Optional[date] = None
+
+    def partition_path(self, day: date) -> Path:
+        return self.log_path.with_name(f"{self.log_path.stem}-{day.isoformat()}{self.log_path.suffix}")
+
+    def _store(self, path: Path) -> CsvLogStore:
+        store = self._stores.get(path)
+        if store is None:
+            if len(self._stores) >= self.MAX_OPEN_PARTITIONS:
+                self._stores.clear()
+            store = self._stores[path] = CsvLogStore(path)
+        return store
+
+    def _day_stores(self, day: date) -> List[CsvLogStore]:
+        plain = self.partition_path(day)
+        compressed = plain.with_name(plain.name + ".gz")
+        # A late write for an already compressed day lands in a new plain file.
+        return [self._store(p) for p in (plain, compressed) if p.exists()]
+
+    def append(
+        self,
+        timestamp: datetime,
+        client_id: str,
+        slot_id: str,
+        campaign: str,
+        platform: str,
+        page_id: Optional[str],
+        post_id: Optional[str],
+        status: str,
+        error: Optional[str] = None,
+        slot_day: Optional[date] = None,
+    ) -> None:
+        self._store(self.partition_path(slot_day or timestamp.date())).append(
+            timestamp=timestamp,
+            client_id=client_id,
+            slot_id=slot_id,
+            campaign=campaign,
+            platform=platform,
+            page_id=page_id,
+            post_id=post_id,
+            status=status,
+            error=error,
+            slot_day=slot_day,
+        )
+
+    def has_success_for_slot(self, day: date, client_id: str, slot_id: str, platform: str) -> bool:
+        return any(s.has_success_for_slot(day, client_id, slot_id, platform) for s in self._day_stores(day))
+
+    def count_success_for_day(self, day: date, client_id: str, platform: str) -> int:
+        return sum(s.count_success_for_day(day, client_id, platform) for s in self._day_stores(day))
+
+    def partitions(self) -> List[Tuple[date, Path]]:
+        prefix = f"{self.log_path.stem}-"
+        found = []
+        for path in self.log_path.parent.glob(f"{prefix}*"):
+            name = path.name[:-3] if path.name.endswith(".gz") else path.name
+            if not name.endswith(self.log_path.suffix):
+                continue
+            try:
+                day = date.fromisoformat(name[len(prefix) : len(name) - len(self.log_path.suffix)])
+            except ValueError:
+                continue
+            found.append((day, path))
+        return sorted(found)
+
+    def maintain(self, today: date) -> None:
+        if self._maintained_on == today:
+            return
+        self._maintained_on = today
+        if self.log_path.exists():
+            self._split_single_file_log()
+        for day, path in self.partitions():
+            age = (today - day).days
+            if self.retention_days is not None and age > self.retention_days:
+                logger.info("Removing expired log partition %s", path)
+                path.unlink()
+            elif age >= self.compress_after_days and path.suffix != ".gz":
+                self._compress(path)
+        self._stores.clear()
+
+    def _split_single_file_log(self) -> None:
+        """
+        A single-file log at `log_path` is left over from before partitioning was
+        switched on: copy its rows into partitions once, then set it aside so
+        later runs do not scan it again.
+        """
+        copied = split_into_partitions(self.log_path, self)
+        migrated = self.log_path.with_name(self.log_path.name + ".migrated")
+        os.replace(self.log_path, migrated)
+        logger.info("Split %d rows of %s into daily partitions; kept the original as %s", copied, self.log_path, migrated)
+
+    def _compress(self, path: Path) -> None:
+        rows = list(iter_csv_rows(path))
+        if self.compact:
+            rows = compact_rows(rows)
+        target = path.with_name(path.name + ".gz")
+        if target.exists():
+            # Late rows for an already compressed day: add them as a headerless gzip member.
+            with gzip.open(target, "at", newline="", encoding="utf-8") as f:
+                csv.DictWriter(f, fieldnames=LOG_HEADER, extrasaction="ignore").writerows(rows)
+        else:
+            _write_rows(path, rows)
+            tmp = target.with_name(target.name + ".tmp")
+            with path.open("rb") as src, gzip.open(tmp, "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.replace(tmp, target)
+        path.unlink()
+
+
+def _row_key(row: dict) -> Tuple[str, ...]:
+    return tuple(row.get(field) or "" for field in LOG_HEADER)
+
+
+def split_into_partitions(csv_path: Path, store: PartitionedCsvLogStore) -> int:
+    """
+    Copy a single-file CSV log into day partitions. Rows a partition already
+    holds are skipped, so running it again is harmless. Returns rows copied.
+    """
+    by_day: Dict[date, List[dict]] = {}
+    for row in iter_csv_rows(csv_path):
+        day = row_slot_day(row)
+        if day is not None:
+            by_day.setdefault(day, []).append(row)
+    copied = 0
+    for day, rows in by_day.items():
+        target = store.partition_path(day)
+        existing = Counter(
+            _row_key(row) for path in (target, target.with_name(target.name + ".gz")) for row in iter_csv_rows(path)
+        )
+        new_rows = []
+        for row in rows:
+            key = _row_key(row)
+            if existing[key]:
+                existing[key] -= 1
+            else:
+                new_rows.append(row)
+        if not new_rows:
+            continue
+        ensure_log_file(target)
+        with target.open("a", newline="", encoding="utf-8") as f:
+            csv.DictWriter(f, fieldnames=LOG_HEADER, extrasaction="ignore").writerows(new_rows)
+        copied += len(new_rows)
+    return copied
+
+
+# `slot_day` is stored in the indexed `day` column.
+_SQLITE_COLUMNS = [column for column in LOG_HEADER if column != "slot_day"]
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts_log (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp_iso TEXT NOT NULL,
+    day TEXT NOT NULL,
+    client_id TEXT NOT NULL,
+    slot_id TEXT NOT NULL,
+    campaign TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    page_id TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_posts_log_lookup
+    ON posts_log (day, client_id, platform, slot_id, status);
+"""
+
+
+class SqliteLogStore(LogStore):
+    """SQLite backend indexed on (day, client_id, platform, slot_id, status)."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        try:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(db_path))
+            self.conn.executescript(SQLITE_SCHEMA)
+        except Exception as exc:  # pragma: no cover - defensive
+            raise RuntimeError(f"Cannot open log database at {db_path}: {exc}") from exc
+
+    def append(
+        self,
+        timestamp: datetime,
+        client_id: str,
+        slot_id: str,
+        campaign: str,
+        platform: str,
+        page_id: Optional[str],
+        post_id: Optional[str],
+        status: str,
+        error: Optional[str] = None,
+        slot_day: Optional[date] = None,
+    ) -> None:
+        with self.conn:
+            self._insert(
+                [
+                    timestamp.isoformat(),
+                    client_id,
+                    slot_id,
+                    campaign,
+                    platform,
+                    page_id or "",
+                    post_id or "",
+                    status,
+                    error or "",
+                ],
+                slot_day or timestamp.date(),
+            )
+
+    def _insert(self, values: list, day: date) -> None:
+        self.conn.execute(
+            "INSERT INTO posts_log (timestamp_iso, day, client_id, slot_id, campaign, platform, "
+            "page_id, post_id, status, error) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [values[0], day.isoformat(), *values[1:]],
+        )
+
+    def has_success_for_slot(self, day: date, client_id: str, slot_id: str, platform: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM posts_log WHERE day = ? AND client_id = ? AND platform = ? AND slot_id = ? "
+            "AND status = 'success' LIMIT 1",
+            (day.isoformat(), client_id, platform, slot_id),
+        ).fetchone()
+        return row is not None
+
+    def count_success_for_day(self, day: date, client_id: str, platform: str) -> int:
+        row = self.conn.execute(
+            "SELECT COUNT(*) FROM posts_log WHERE day = ? AND client_id = ? AND platform = ? AND status = 'success'",
+            (day.isoformat(), client_id, platform),
+        ).fetchone()
+        return int(row[0])
+
+    def import_csv(self, csv_path: Path) -> int:
+        """
+        Import rows from a CSV log. Rows without a parseable day are skipped.
+        Refuses to import into a log that already has rows, so running the
+        migration twice cannot duplicate them.
+        """
+        if self.conn.execute("SELECT 1 FROM posts_log LIMIT 1").fetchone() is not None:
+            raise ValueError(f"{self.db_path} already has rows; import only into an empty log")
+        imported = 0
+        with self.conn:
+            for row in iter_csv_rows(csv_path):
+                day = row_slot_day(row)
+                if day is None:
+                    continue
+                self._insert([row.get(col) or "" for col in _SQLITE_COLUMNS], day)
+                imported += 1
+        return imported
+
+    def export_csv(self, csv_path: Path) -> int:
+        """Write all rows to a CSV file in the original log format, replacing the file."""
+        csv_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = csv_path.with_name(csv_path.name + ".tmp")
+        exported = 0
+        with tmp.open("w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(LOG_HEADER)
+            for row in self.conn.execute(f"SELECT {', '.join(_SQLITE_COLUMNS)}, day FROM posts_log ORDER BY id"):
+                writer.writerow(row)
+                exported += 1
+        os.replace(tmp, csv_path)
+        return exported
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def open_log_store(cfg: LoggingConfig) -> LogStore:
+    if cfg.type == "csv" and cfg.partition == "daily":
+        return PartitionedCsvLogStore(
+            Path(cfg.file),
+            retention_days=cfg.retention_days,
+            compress_after_days=cfg.compress_after_days,
+            compact=cfg.compact,
+        )
+    if cfg.type == "csv":
+        return CsvLogStore(Path(cfg.file))
+    if cfg.type == "sqlite":
+        return SqliteLogStore(Path(cfg.file))
+    raise ValueError(f"Unsupported logging.type '{cfg.type}' (expected 'csv' or 'sqlite')")
+
+
+def migrate_csv_to_sqlite(csv_path: Path, db_path: Path) -> int:
+    store = SqliteLogStore(db_path)
+    try:
+        return store.import_csv(csv_path)
+    finally:
+        store.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Posts log maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="Import a CSV log into a SQLite log")
+    migrate.add_argument("csv_path", type=Path)
+    migrate.add_argument("db_path", type=Path)
+    export = sub.add_parser("export", help="Export a SQLite log to CSV")
+    export.add_argument("db_path", type=Path)
+    export.add_argument("csv_path", type=Path)
+    partition = sub.add_parser("partition", help="Split a single-file CSV log into daily partitions")
+    partition.add_argument("csv_path", type=Path)
+    args = parser.parse_args()
+
+    if args.command == "partition":
+        count = split_into_partitions(args.csv_path, PartitionedCsvLogStore(args.csv_path))
+        print(f"Copied {count} rows into daily partitions next to {args.csv_path}")
+        return
+
+    if args.command == "migrate":
+        try:
+            count = migrate_csv_to_sqlite(args.csv_path, args.db_path)
+        except ValueError as exc:
+            parser.error(str(exc))
+        print(f"Imported {count} rows into {args.db_path}")
+    else:
+        store = SqliteLogStore(args.db_path)
+        try:
+            count = store.export_csv(args.csv_path)
+        finally:
+            store.close()
+        print(f"Exported {count} rows to {args.csv_path}")
+
+
+if __name__ == "__main__":
+    main()
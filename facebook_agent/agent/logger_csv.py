@@ -3,7 +3,7 @@ from __future__ import annotations
 import csv
 from datetime import date, datetime
 from pathlib import Path
-from typing import Optional
+from typing import Iterable, Iterator, Optional
 
 LOG_HEADER = [
     "timestamp_iso",
@@ -15,9 +15,35 @@ LOG_HEADER = [
     "post_id",
     "status",
     "error",
+    "slot_day",
 ]
 
 
+def read_log_rows(lines: Iterable[str]) -> Iterator[dict]:
+    """
+    DictReader over a posts log. Files created before the `slot_day` column
+    existed keep their old header, so a value appended after it is moved from
+    the reader's overflow key back to `slot_day`.
+    """
+    for row in csv.DictReader(lines):
+        extra = row.pop(None, None)
+        if extra and not row.get("slot_day"):
+            row["slot_day"] = extra[0]
+        yield row
+
+
+def row_slot_day(row: dict) -> Optional[date]:
+    """The day a row counts against: its slot's day, or the timestamp's date for older rows."""
+    try:
+        if row.get("slot_day"):
+            return date.fromisoformat(row["slot_day"])
+        if row.get("timestamp_iso"):
+            return datetime.fromisoformat(row["timestamp_iso"]).date()
+    except ValueError:
+        pass
+    return None
+
+
 def ensure_log_file(log_path: Path) -> None:
     try:
         log_path.parent.mkdir(parents=True, exist_ok=True)
@@ -40,6 +66,7 @@ def append_log(
     post_id: Optional[str],
     status: str,
     error: Optional[str] = None,
+    slot_day: Optional[date] = None,
 ) -> None:
     ensure_log_file(log_path)
     with log_path.open("a", newline="", encoding="utf-8") as f:
@@ -55,6 +82,7 @@ def append_log(
                 post_id or "",
                 status,
                 error or "",
+                (slot_day or timestamp.date()).isoformat(),
             ]
         )
 
@@ -65,16 +93,8 @@ def has_success_for_slot(
     if not log_path.exists():
         return False
     with log_path.open("r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            ts = row.get("timestamp_iso", "")
-            if not ts:
-                continue
-            try:
-                ts_dt = datetime.fromisoformat(ts)
-            except Exception:
-                continue
-            if ts_dt.date() != day:
+        for row in read_log_rows(f):
+            if row_slot_day(row) != day:
                 continue
             if (
                 row.get("client_id") == client_id
@@ -93,16 +113,8 @@ def count_success_for_day(
         return 0
     count = 0
     with log_path.open("r", newline="", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            ts = row.get("timestamp_iso", "")
-            if not ts:
-                continue
-            try:
-                ts_dt = datetime.fromisoformat(ts)
-            except Exception:
-                continue
-            if ts_dt.date() != day:
+        for row in read_log_rows(f):
+            if row_slot_day(row) != day:
                 continue
             if (
                 row.get("client_id") == client_id
@@ -1,28 +1,89 @@
 from __future__ import annotations
 
 import asyncio
+import itertools
+import json
+import logging
 import os
+import time
 import uuid
-from typing import List, Optional
-
-import json
+from collections import deque
 from json import JSONDecodeError
-from typing import List, Optional
+from typing import Any, Callable, Deque, Dict, List, Optional
 
 from .models import FacebookMCPConfig, PostResult
 
+logger = logging.getLogger(__name__)
+
 # Safe bounds for reading MCP stdout/stderr
-MAX_STDOUT_LINES = 200
-MAX_STDOUT_BYTES = 64_000
+MAX_STDOUT_BYTES = 1_000_000  # per line; larger lines are dropped
 MAX_STDERR_LINES = 3
 
+MCP_PROTOCOL_VERSION = "2024-11-05"
+CLIENT_INFO = {"name": "facebook-agent", "version": "1.0"}
+
+
+class MCPError(RuntimeError):
+    """JSON-RPC error returned by the MCP server."""
+
+
+class CircuitOpenError(ConnectionError):
+    """The MCP connection is considered dead; calls fail without waiting."""
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive transport failures (timeouts, lost
+    connection). While open, calls fail at once; after `reset_seconds` one
+    caller probes the connection and either closes the circuit or re-opens it
+    for another `reset_seconds`.
+    """
+
+    def __init__(self, threshold: int, reset_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.threshold = max(1, threshold)
+        self.reset_seconds = reset_seconds
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def probe_due(self) -> bool:
+        return self.opened_at is not None and self.clock() - self.opened_at >= self.reset_seconds
+
+    def retry_in(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.reset_seconds - (self.clock() - self.opened_at))
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.opened_at is not None or self.failures >= self.threshold:
+            if self.opened_at is None:
+                logger.warning("MCP circuit opened after %d consecutive failures", self.failures)
+            self.opened_at = self.clock()
+
+
 class MCPClient:
     """
-    Minimal MCP STDIO client wrapper.
+    MCP STDIO client session.
+
+    Provides a simulation mode (default). When MCP_FAKE_MODE=0 it spawns the
+    remote MCP server (Synology) and speaks MCP over STDIO: the `initialize`
+    handshake, then `tools/call` for every tool invocation. A background reader
+    routes responses to waiting callers by request id, so many calls can share
+    one pipe concurrently. Tool name expected: post_to_facebook(message, page_id).
 
-    NOTE: This Phase-1 implementation provides a simulation mode (default). When
-    MCP_FAKE_MODE=0 it will invoke the remote MCP server (Synology) over STDIO
-    using JSON-RPC (FastMCP). Tool name expected: post_to_facebook(message).
+    Consecutive timeouts or disconnects open a circuit breaker: further calls
+    fail immediately instead of each waiting for the call timeout, until a
+    `ping` probe succeeds. Only calls marked idempotent are retried, so a post
+    whose outcome is unknown is never sent twice.
     """
 
     def __init__(self, cfg: FacebookMCPConfig, fake_mode: Optional[bool] = None):
@@ -30,110 +91,302 @@ class MCPClient:
         self.proc: Optional[asyncio.subprocess.Process] = None
         self.fake_mode = fake_mode if fake_mode is not None else bool(os.getenv("MCP_FAKE_MODE", "1") != "0")
         self.greeting: Optional[str] = None
-        self._stdout_bytes = 0
+        self.server_capabilities: Dict[str, Any] = {}
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._write_lock = asyncio.Lock()
+        self._reader_task: Optional[asyncio.Task] = None
+        self._stderr_task: Optional[asyncio.Task] = None
+        self._stderr_tail: Deque[str] = deque(maxlen=MAX_STDERR_LINES)
+        self._last_stdout: Optional[str] = None
+        self.breaker = CircuitBreaker(cfg.breaker_threshold, cfg.breaker_reset_seconds)
+        self._probe_lock = asyncio.Lock()
 
     async def __aenter__(self):
-        if not self.fake_mode:
-            self.proc = await asyncio.create_subprocess_exec(
-                self.cfg.command, *self.cfg.args, stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
-            )
-            # Try to read an optional greeting/handshake line (non-fatal on timeout)
-            if self.proc and self.proc.stdout:
-                try:
-                    line = await asyncio.wait_for(self.proc.stdout.readline(), timeout=5)
-                    if line:
-                        self.greeting = line.decode("utf-8", "ignore").strip()
-                except asyncio.TimeoutError:
-                    self.greeting = None
+        await self.connect()
         return self
 
     async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    @property
+    def is_alive(self) -> bool:
+        if self.fake_mode:
+            return True
+        return (
+            self.proc is not None
+            and self.proc.returncode is None
+            and self._reader_task is not None
+            and not self._reader_task.done()
+        )
+
+    async def connect(self) -> None:
+        if self.fake_mode:
+            return
+        self.proc = await asyncio.create_subprocess_exec(
+            self.cfg.command,
+            *self.cfg.args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            limit=MAX_STDOUT_BYTES,
+        )
+        self._reader_task = asyncio.create_task(self._read_stdout())
+        self._stderr_task = asyncio.create_task(self._read_stderr())
+        try:
+            init = await self._request(
+                "initialize",
+                {"protocolVersion": MCP_PROTOCOL_VERSION, "capabilities": {}, "clientInfo": CLIENT_INFO},
+                timeout=self.cfg.init_timeout_seconds,
+            )
+            await self._notify("notifications/initialized")
+        except BaseException:
+            await self.close()
+            raise
+        self.server_capabilities = init.get("capabilities", {})
+        info = init.get("serverInfo", {})
+        self.greeting = f"{info.get('name', '?')} {info.get('version', '')}".strip()
+
+    async def ensure_connected(self) -> None:
+        """Start the session on first use and restart it if the process died."""
+        if self.is_alive:
+            return
+        if self.proc is not None:
+            logger.warning("MCP process exited with code %s; reconnecting", self.proc.returncode)
+            await self.close()
+        await self.connect()
+
+    async def close(self) -> None:
         if self.proc:
-            self.proc.terminate()
-            try:
-                await asyncio.wait_for(self.proc.wait(), timeout=5)
-            except asyncio.TimeoutError:
-                self.proc.kill()
+            if self.proc.returncode is None:
+                self.proc.terminate()
+                try:
+                    await asyncio.wait_for(self.proc.wait(), timeout=5)
+                except asyncio.TimeoutError:
+                    self.proc.kill()
+        for task in (self._reader_task, self._stderr_task):
+            if task and not task.done():
+                task.cancel()
+        self._fail_pending(ConnectionError("MCP session closed"))
+        self._reader_task = self._stderr_task = None
         self.proc = None
 
     async def list_tools(self) -> List[str]:
         # In fake mode, we don't have tool discovery; return placeholder
-        return ["post_to_facebook"]
+        if self.fake_mode:
+            return ["post_to_facebook"]
+        result = await self._guarded("tools/list", {}, self.cfg.call_timeout_seconds, idempotent=True)
+        return [tool["name"] for tool in result.get("tools", [])]
+
+    async def call_tool(
+        self, name: str, arguments: Dict[str, Any], timeout: Optional[float] = None, idempotent: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Invoke a tool via `tools/call` and return the raw MCP result. Set
+        `idempotent` for read-only tools so timeouts and disconnects are retried.
+        """
+        return await self._guarded(
+            "tools/call",
+            {"name": name, "arguments": arguments},
+            timeout if timeout is not None else self.cfg.call_timeout_seconds,
+            idempotent=idempotent,
+        )
+
+    async def _guarded(self, method: str, params: Dict[str, Any], timeout: float, idempotent: bool) -> Dict[str, Any]:
+        attempts = 1 + (max(0, self.cfg.retry_attempts) if idempotent else 0)
+        delay = self.cfg.retry_backoff_seconds
+        for attempt in range(attempts):
+            await self._check_circuit()
+            try:
+                result = await self._request(method, params, timeout=timeout)
+            except (asyncio.TimeoutError, ConnectionError):
+                self.breaker.record_failure()
+                if attempt + 1 >= attempts:
+                    raise
+                logger.warning("MCP %s failed (attempt %d/%d); retrying in %.1fs", method, attempt + 1, attempts, delay)
+                await asyncio.sleep(delay)
+                delay *= 2
+                if not self.is_alive:
+                    await self.ensure_connected()
+                continue
+            except MCPError:
+                self.breaker.record_success()  # the server answered; the transport is fine
+                raise
+            self.breaker.record_success()
+            return result
+        raise AssertionError("unreachable")
+
+    async def _check_circuit(self) -> None:
+        if not self.breaker.is_open:
+            return
+        if not self.breaker.probe_due():
+            raise CircuitOpenError(f"MCP circuit open; next probe in {self.breaker.retry_in():.0f}s")
+        async with self._probe_lock:
+            if not self.breaker.is_open:
+                return  # another caller's probe succeeded
+            if not self.breaker.probe_due():
+                raise CircuitOpenError(f"MCP circuit open; next probe in {self.breaker.retry_in():.0f}s")
+            if await self._probe():
+                logger.info("MCP probe succeeded; circuit closed")
+                self.breaker.record_success()
+                return
+            self.breaker.record_failure()
+            raise CircuitOpenError(f"MCP probe failed; next probe in {self.breaker.retry_in():.0f}s")
+
+    async def _probe(self) -> bool:
+        try:
+            if not self.is_alive:
+                await self.ensure_connected()
+            await self._request("ping", {}, timeout=self.cfg.probe_timeout_seconds)
+            return True
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("MCP probe failed: %s", exc)
+            return False
 
     async def post_text(self, page_id: str, message: str) -> PostResult:
         if self.fake_mode:
             return PostResult(success=True, post_id=f"sim-{uuid.uuid4().hex}", page_id=page_id, error=None)
 
-        # Real MCP JSON-RPC call over STDIO
-        if not self.proc or not self.proc.stdin or not self.proc.stdout:
+        if not self.is_alive and not self.breaker.is_open:
             raise RuntimeError("MCP process not started")
 
-        req = {
-            "jsonrpc": "2.0",
-            "id": 1,
-            "method": "post_to_facebook",
-            "params": {"message": message},
-        }
-        payload = (json.dumps(req) + "\n").encode("utf-8")
-        self.proc.stdin.write(payload)
-        await self.proc.stdin.drain()
-
-        resp, info = await self._read_jsonrpc_response()
-        if resp is None:
-            err_msg = "Timeout waiting for MCP response"
-            if self.greeting:
-                err_msg += f" | greeting: {self.greeting}"
-            if info.get("last_stdout"):
-                err_msg += f" | last stdout: {info['last_stdout']}"
-            if info.get("stderr"):
-                err_msg += f" | stderr: {info['stderr']}"
-            return PostResult(success=False, post_id=None, page_id=page_id, error=err_msg)
+        try:
+            arguments = {"message": message, "page_id": page_id} if page_id else {"message": message}
+            # Not idempotent: a timed-out post may have been published, so it is never retried here.
+            result = await self.call_tool("post_to_facebook", arguments)
+        except CircuitOpenError as exc:
+            return PostResult(success=False, post_id=None, page_id=page_id, error=str(exc))
+        except asyncio.TimeoutError:
+            return PostResult(success=False, post_id=None, page_id=page_id, error=self._describe_timeout())
+        except MCPError as exc:
+            return PostResult(success=False, post_id=None, page_id=page_id, error=str(exc))
 
-        if "error" in resp:
-            return PostResult(success=False, post_id=None, page_id=page_id, error=str(resp["error"]))
+        payload = tool_payload(result)
+        if result.get("isError") or (isinstance(payload, dict) and "error" in payload):
+            error = payload.get("error") if isinstance(payload, dict) else payload
+            return PostResult(success=False, post_id=None, page_id=page_id, error=str(error))
 
-        result = resp.get("result", {})
-        post_id = result.get("id") or result.get("post_id") or result.get("result") or result.get("data")
+        post_id = None
+        if isinstance(payload, dict):
+            post_id = payload.get("id") or payload.get("post_id")
+        elif payload is not None:
+            post_id = payload
         return PostResult(success=True, post_id=str(post_id) if post_id is not None else None, page_id=page_id, error=None)
 
-    async def _read_jsonrpc_response(self):
-        """
-        Read stdout lines until a valid JSON-RPC object is found or limits reached.
-        Returns (resp, info) where resp is dict or None, and info carries last_stdout/stderr.
-        """
-        last_stdout = None
-        bytes_read = 0
-        resp = None
-        for _ in range(MAX_STDOUT_LINES):
-            try:
-                line = await asyncio.wait_for(self.proc.stdout.readline(), timeout=60)
-            except asyncio.TimeoutError:
-                break
-            if not line:
-                continue
-            bytes_read += len(line)
-            if bytes_read > MAX_STDOUT_BYTES:
-                break
-            decoded = line.decode("utf-8", "ignore").strip()
-            if not decoded:
-                continue
-            last_stdout = decoded
-            try:
-                resp = json.loads(decoded)
-                break
-            except JSONDecodeError:
-                continue
+    def _describe_timeout(self) -> str:
+        err_msg = "Timeout waiting for MCP response"
+        if self.greeting:
+            err_msg += f" | server: {self.greeting}"
+        if self._last_stdout:
+            err_msg += f" | last stdout: {self._last_stdout}"
+        if self._stderr_tail:
+            err_msg += f" | stderr: {' | '.join(self._stderr_tail)}"
+        return err_msg
+
+    async def _send(self, message: Dict[str, Any]) -> None:
+        if not self.proc or not self.proc.stdin:
+            raise RuntimeError("MCP process not started")
+        payload = (json.dumps(message) + "\n").encode("utf-8")
+        async with self._write_lock:
+            self.proc.stdin.write(payload)
+            await self.proc.stdin.drain()
+
+    async def _notify(self, method: str, params: Optional[Dict[str, Any]] = None) -> None:
+        message: Dict[str, Any] = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._send(message)
 
-        stderr_lines = []
-        if resp is None and self.proc.stderr:
-            for _ in range(MAX_STDERR_LINES):
+    async def _request(self, method: str, params: Dict[str, Any], timeout: float) -> Dict[str, Any]:
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            await self._send({"jsonrpc": "2.0", "id": request_id, "method": method, "params": params})
+            resp = await asyncio.wait_for(future, timeout=timeout)
+        finally:
+            self._pending.pop(request_id, None)
+        if "error" in resp:
+            raise MCPError(str(resp["error"]))
+        return resp.get("result") or {}
+
+    async def _read_stdout(self) -> None:
+        """Route JSON-RPC responses to pending futures until stdout closes."""
+        assert self.proc and self.proc.stdout
+        try:
+            while True:
                 try:
-                    err_line = await asyncio.wait_for(self.proc.stderr.readline(), timeout=1)
-                except asyncio.TimeoutError:
+                    line = await self.proc.stdout.readline()
+                except ValueError:
+                    logger.warning("Dropping MCP stdout line longer than %s bytes", MAX_STDOUT_BYTES)
+                    continue
+                if not line:
                     break
-                if not err_line:
+                decoded = line.decode("utf-8", "ignore").strip()
+                if not decoded:
                     continue
-                stderr_lines.append(err_line.decode("utf-8", "ignore").strip())
+                try:
+                    msg = json.loads(decoded)
+                except JSONDecodeError:
+                    self._last_stdout = decoded
+                    continue
+                if not isinstance(msg, dict):
+                    continue
+                if "method" in msg:
+                    await self._handle_server_message(msg)
+                    continue
+                future = self._pending.get(msg.get("id"))
+                if future is not None and not future.done():
+                    future.set_result(msg)
+        finally:
+            self._fail_pending(ConnectionError("MCP process closed stdout"))
+
+    async def _handle_server_message(self, msg: Dict[str, Any]) -> None:
+        # Server-initiated requests need an answer; notifications are ignored.
+        if "id" not in msg:
+            return
+        if msg["method"] == "ping":
+            await self._send({"jsonrpc": "2.0", "id": msg["id"], "result": {}})
+        else:
+            await self._send(
+                {"jsonrpc": "2.0", "id": msg["id"], "error": {"code": -32601, "message": "Method not found"}}
+            )
 
-        return resp, {"last_stdout": last_stdout, "stderr": " | ".join(stderr_lines) if stderr_lines else None}
+    async def _read_stderr(self) -> None:
+        assert self.proc and self.proc.stderr
+        while True:
+            try:
+                line = await self.proc.stderr.readline()
+            except ValueError:
+                continue
+            if not line:
+                return
+            decoded = line.decode("utf-8", "ignore").strip()
+            if decoded:
+                self._stderr_tail.append(decoded)
 
+    def _fail_pending(self, exc: Exception) -> None:
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(exc)
+
+
+def tool_payload(result: Dict[str, Any]) -> Any:
+    """
+    Extract the tool's return value from a `tools/call` result. FastMCP sends
+    it as structuredContent (non-dict values wrapped in {"result": ...}) and as
+    JSON text content.
+    """
+    structured = result.get("structuredContent")
+    if isinstance(structured, dict):
+        if set(structured) == {"result"}:
+            return structured["result"]
+        return structured
+    for item in result.get("content") or []:
+        if item.get("type") != "text":
+            continue
+        try:
+            return json.loads(item.get("text", ""))
+        except JSONDecodeError:
+            return item.get("text")
+    return None
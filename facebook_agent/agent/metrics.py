@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import json
+import math
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+# Stage latencies range from sub-millisecond index lookups to minute-long LLM/MCP calls.
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_PREFIX = "facebook_agent"
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus semantics: `le` upper bounds)."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative(self) -> Iterator[Tuple[float, int]]:
+        total = 0
+        for bound, count in zip(self.buckets + (math.inf,), self.counts):
+            total += count
+            yield bound, total
+
+
+class CycleMetrics:
+    """
+    Timers and counters for one agent cycle. `span()` times a block into the
+    stage histogram; `inc()` bumps a counter. Nothing here does I/O until
+    `write()` is called.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.started_at = datetime.now(timezone.utc)
+        self.stages: Dict[str, Histogram] = {}
+        self.counters: Dict[str, int] = {}
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.observe(stage, self.clock() - start)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        hist = self.stages.get(stage)
+        if hist is None:
+            hist = self.stages[stage] = Histogram()
+        hist.observe(seconds)
+
+    def inc(self, counter: str, value: int = 1) -> None:
+        self.counters[counter] = self.counters.get(counter, 0) + value
+
+    def summary(self) -> dict:
+        return {
+            "cycle_started": self.started_at.isoformat(),
+            "counters": dict(self.counters),
+            "stages": {
+                name: {
+                    "count": hist.count,
+                    "sum_seconds": round(hist.sum, 6),
+                    "max_seconds": round(hist.max, 6),
+                    "mean_seconds": round(hist.sum / hist.count, 6) if hist.count else 0.0,
+                }
+                for name, hist in self.stages.items()
+            },
+        }
+
+    def prometheus_text(self) -> str:
+        lines = [
+            f"# HELP {METRIC_PREFIX}_cycle_timestamp_seconds Start of the last exported cycle.",
+            f"# TYPE {METRIC_PREFIX}_cycle_timestamp_seconds gauge",
+            f"{METRIC_PREFIX}_cycle_timestamp_seconds {self.started_at.timestamp():.3f}",
+            f"# HELP {METRIC_PREFIX}_cycle_events Events counted during the last cycle.",
+            f"# TYPE {METRIC_PREFIX}_cycle_events gauge",
+        ]
+        for name, value in sorted(self.counters.items()):
+            lines.append(f'{METRIC_PREFIX}_cycle_events{{event="{name}"}} {value}')
+        lines += [
+            f"# HELP {METRIC_PREFIX}_cycle_stage_seconds Time spent per stage during the last cycle.",
+            f"# TYPE {METRIC_PREFIX}_cycle_stage_seconds histogram",
+        ]
+        for name, hist in sorted(self.stages.items()):
+            for bound, total in hist.cumulative():
+                le = "+Inf" if math.isinf(bound) else repr(bound)
+                lines.append(f'{METRIC_PREFIX}_cycle_stage_seconds_bucket{{stage="{name}",le="{le}"}} {total}')
+            lines.append(f'{METRIC_PREFIX}_cycle_stage_seconds_sum{{stage="{name}"}} {hist.sum:.6f}')
+            lines.append(f'{METRIC_PREFIX}_cycle_stage_seconds_count{{stage="{name}"}} {hist.count}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, log_path: Path) -> Tuple[Path, Path]:
+        """
+        Write `<log stem>.prom` (node-exporter textfile collector format) and
+        `<log stem>.metrics.json` next to the log. Files are replaced atomically
+        so a scrape never sees a partial file.
+        """
+        prom_path = log_path.with_name(f"{log_path.stem}.prom")
+        json_path = log_path.with_name(f"{log_path.stem}.metrics.json")
+        prom_path.parent.mkdir(parents=True, exist_ok=True)
+        _atomic_write(prom_path, self.prometheus_text())
+        _atomic_write(json_path, json.dumps(self.summary(), indent=2))
+        return prom_path, json_path
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def read_summary(log_path: Path) -> Optional[dict]:
+    """Last exported JSON summary for the log at `log_path`, if any."""
+    path = log_path.with_name(f"{log_path.stem}.metrics.json")
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
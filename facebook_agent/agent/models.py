@@ -11,21 +11,45 @@ class LLMConfig(BaseModel):
     model: str
     max_tokens: int = Field(default=300)
     temperature: float = Field(default=0.7)
+    base_url: Optional[str] = None  # override for OpenAI-compatible endpoints
+    timeout_seconds: float = Field(default=60.0)
+    max_retries: int = Field(default=2)
+    use_async: bool = Field(default=False)  # AsyncLLMClient instead of the blocking client
+    max_concurrent_requests: int = Field(default=4)  # async client only
 
 
 class SchedulerConfig(BaseModel):
     tick_minutes: int = Field(default=30)
     tolerance_minutes: int = Field(default=15)
+    max_in_flight: int = Field(default=1)  # clients processed concurrently per tick
 
 
 class FacebookMCPConfig(BaseModel):
     command: str
     args: List[str] = Field(default_factory=list)
+    init_timeout_seconds: float = Field(default=30.0)  # covers ssh + container start
+    call_timeout_seconds: float = Field(default=60.0)
+    breaker_threshold: int = Field(default=3)  # consecutive timeouts/disconnects that open the circuit
+    breaker_reset_seconds: float = Field(default=60.0)  # wait before probing an open circuit
+    probe_timeout_seconds: float = Field(default=5.0)
+    retry_attempts: int = Field(default=2)  # extra attempts, idempotent calls only
+    retry_backoff_seconds: float = Field(default=0.5)  # doubled after each attempt
 
 
 class LoggingConfig(BaseModel):
-    type: str = Field(default="csv")
+    type: str = Field(default="csv")  # "csv" or "sqlite"
     file: str
+    partition: str = Field(default="none")  # "none" or "daily" (csv only)
+    retention_days: Optional[int] = None  # delete daily partitions older than this
+    compress_after_days: int = Field(default=2)  # gzip daily partitions this old
+    compact: bool = Field(default=True)  # merge repeated failures before compressing
+    metrics: bool = Field(default=True)  # write <log stem>.prom / .metrics.json after each cycle
+
+
+class OutboxConfig(BaseModel):
+    enabled: bool = Field(default=False)
+    file: str  # SQLite database holding pre-generated drafts
+    lookahead_hours: float = Field(default=12.0)  # draft slots firing within this window
 
 
 class GlobalConfig(BaseModel):
@@ -34,6 +58,7 @@ class GlobalConfig(BaseModel):
     scheduler: SchedulerConfig
     facebook_mcp: FacebookMCPConfig
     logging: LoggingConfig
+    outbox: Optional[OutboxConfig] = None
 
 
 class AgentPersona(BaseModel):
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Optional
+
+OUTBOX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS drafts (
+    client_id TEXT NOT NULL,
+    slot_id TEXT NOT NULL,
+    day TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    PRIMARY KEY (client_id, slot_id, day, platform)
+);
+"""
+
+
+class Outbox:
+    """
+    Durable store of pre-generated post texts, one per (client_id, slot_id,
+    day, platform). `day` is the slot's local date, the same day the dedupe and
+    guardrail checks use. A draft is removed when it is taken for publishing.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        try:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self.conn = sqlite3.connect(str(db_path))
+            self.conn.executescript(OUTBOX_SCHEMA)
+        except Exception as exc:  # pragma: no cover - defensive
+            raise RuntimeError(f"Cannot open outbox database at {db_path}: {exc}") from exc
+
+    def put(self, client_id: str, slot_id: str, day: date, platform: str, message: str) -> bool:
+        """Store a draft unless one already exists. Returns True if it was stored."""
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT OR IGNORE INTO drafts (client_id, slot_id, day, platform, message, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (client_id, slot_id, day.isoformat(), platform, message, datetime.now(timezone.utc).isoformat()),
+            )
+        return cur.rowcount > 0
+
+    def has(self, client_id: str, slot_id: str, day: date, platform: str) -> bool:
+        cur = self.conn.execute(
+            "SELECT 1 FROM drafts WHERE client_id = ? AND slot_id = ? AND day = ? AND platform = ?",
+            (client_id, slot_id, day.isoformat(), platform),
+        )
+        return cur.fetchone() is not None
+
+    def peek(self, client_id: str, slot_id: str, day: date, platform: str) -> Optional[str]:
+        cur = self.conn.execute(
+            "SELECT message FROM drafts WHERE client_id = ? AND slot_id = ? AND day = ? AND platform = ?",
+            (client_id, slot_id, day.isoformat(), platform),
+        )
+        row = cur.fetchone()
+        return row[0] if row else None
+
+    def remove(self, client_id: str, slot_id: str, day: date, platform: str) -> None:
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM drafts WHERE client_id = ? AND slot_id = ? AND day = ? AND platform = ?",
+                (client_id, slot_id, day.isoformat(), platform),
+            )
+
+    def purge_before(self, day: date) -> int:
+        """Drop drafts for days before `day` (their slots have passed). Returns rows removed."""
+        with self.conn:
+            cur = self.conn.execute("DELETE FROM drafts WHERE day < ?", (day.isoformat(),))
+        return cur.rowcount
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM drafts").fetchone()[0]
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from datetime import datetime, timezone
+from pathlib import Path
+
+from .agent_core import run_pregenerate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Fill the outbox with drafts for upcoming slots (e.g. nightly cron)")
+    parser.add_argument("--hours", type=float, default=None, help="lookahead window (default: outbox.lookahead_hours)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    base_dir = Path(__file__).resolve().parent.parent
+    now = datetime.now(timezone.utc)
+    stored = asyncio.run(run_pregenerate(base_dir, now, lookahead_hours=args.hours))
+    print(f"Stored {stored} drafts")
+
+
+if __name__ == "__main__":
+    main()
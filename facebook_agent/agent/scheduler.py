@@ -1,16 +1,61 @@
 from __future__ import annotations
 
-from datetime import datetime, time
-from typing import List, Tuple
+import heapq
+import itertools
+from datetime import datetime, time, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
 from zoneinfo import ZoneInfo
 
-from .logger_csv import has_success_for_slot
+from .log_store import CsvLogStore, LogStore
 from .models import ClientConfig, Slot
 
 
+@lru_cache(maxsize=4096)
+def parse_slot_time(value: str) -> time:
+    hh, mm = map(int, value.split(":"))
+    return time(hour=hh, minute=mm)
+
+
 def _slot_datetime(slot: Slot, tz: ZoneInfo, base_date) -> datetime:
-    hh, mm = map(int, slot.time.split(":"))
-    return datetime.combine(base_date, time(hour=hh, minute=mm), tzinfo=tz)
+    return datetime.combine(base_date, parse_slot_time(slot.time), tzinfo=tz)
+
+
+def next_fire_time(slot: Slot, tz: ZoneInfo, after: datetime) -> Optional[datetime]:
+    """
+    First occurrence of `slot` at or after `after`, as an aware UTC datetime.
+    Wall-clock times are resolved with fold=0: a time skipped by a spring-forward
+    transition fires at the equivalent instant after the jump, and a time repeated
+    by a fall-back transition fires once (first occurrence).
+    """
+    local_after = after.astimezone(tz)
+    slot_time = parse_slot_time(slot.time)
+    for offset in range(8):
+        day = local_after.date() + timedelta(days=offset)
+        if day.isoweekday() not in slot.days_of_week:
+            continue
+        candidate = datetime.combine(day, slot_time, tzinfo=tz).astimezone(timezone.utc)
+        if candidate >= after:
+            return candidate
+    return None
+
+
+def upcoming_fire_times(
+    client: ClientConfig, start: datetime, end: datetime, platform: str = "facebook"
+) -> List[Tuple[Slot, datetime]]:
+    """(slot, fire time in UTC) for every occurrence in [start, end], ordered by fire time."""
+    tz = ZoneInfo(client.tz_name)
+    upcoming: List[Tuple[Slot, datetime]] = []
+    for slot in client.slots:
+        if platform not in slot.platforms:
+            continue
+        fire = next_fire_time(slot, tz, start)
+        while fire is not None and fire <= end:
+            upcoming.append((slot, fire))
+            fire = next_fire_time(slot, tz, fire + timedelta(seconds=1))
+    upcoming.sort(key=lambda item: item[1])
+    return upcoming
 
 
 def get_due_slots_for_client(
@@ -19,11 +64,14 @@ def get_due_slots_for_client(
     log_path,
     tolerance_minutes: int = 15,
     platform: str = "facebook",
+    log_store: Optional[LogStore] = None,
 ) -> List[Tuple[Slot, str]]:
     """
     Return list of (slot, platform) that are due for the given client at "now".
-    Avoid duplicates by checking the CSV log for same client_id+slot_id+date+platform with success status.
+    Avoid duplicates by checking the log for same client_id+slot_id+date+platform with success status.
+    `log_store` takes precedence over `log_path` when given.
     """
+    store = log_store or CsvLogStore(Path(log_path))
     tz = ZoneInfo(client.tz_name)
     local_now = now.astimezone(tz)
     today = local_now.date()
@@ -38,8 +86,126 @@ def get_due_slots_for_client(
         delta_min = abs((local_now - slot_dt).total_seconds()) / 60.0
         if delta_min > tolerance_minutes:
             continue
-        if has_success_for_slot(log_path, today, client.client_id, slot.id, platform):
+        if store.has_success_for_slot(today, client.client_id, slot.id, platform):
             continue
         due.append((slot, platform))
     return due
 
+
+class SlotQueue:
+    """
+    Min-heap of upcoming slot windows across all clients.
+
+    Each (client, slot) has one heap entry keyed by the start of its window.
+    `due(now)` pops only the windows that have opened; a window stays active
+    (and is returned on every call, so failed posts are retried) until
+    `tolerance` after the fire time, then the slot's next occurrence is pushed.
+    Evaluation cost therefore scales with due slots, not with total slots.
+
+    With `open_early` a window opens `tolerance` before the fire time, like the
+    tick scheduler, for cron runs whose next tick may come after the window has
+    closed. The daemon wakes at fire times (`next_wakeup`), so it opens windows
+    at the fire time and uses the tolerance only to catch up on late ticks.
+    """
+
+    def __init__(self, tolerance_minutes: int = 15, platform: str = "facebook", open_early: bool = True):
+        self.tolerance = timedelta(minutes=tolerance_minutes)
+        self.platform = platform
+        self.early = self.tolerance if open_early else timedelta(0)
+        self._heap: List[Tuple[datetime, int, int, str, int, datetime]] = []
+        self._seq = itertools.count()
+        self._clients: Dict[str, Tuple[int, ClientConfig, ZoneInfo]] = {}
+        self._generation: Dict[str, int] = {}
+        self._order = itertools.count()
+        self._active: Dict[Tuple[str, int], Tuple[int, datetime]] = {}
+        self._last_now: Optional[datetime] = None
+
+    @classmethod
+    def build(
+        cls,
+        clients,
+        now: datetime,
+        tolerance_minutes: int = 15,
+        platform: str = "facebook",
+        open_early: bool = True,
+    ) -> "SlotQueue":
+        queue = cls(tolerance_minutes=tolerance_minutes, platform=platform, open_early=open_early)
+        for client in clients:
+            queue.add_client(client, now)
+        queue._last_now = now
+        return queue
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def add_client(self, client: ClientConfig, now: datetime) -> None:
+        """Add or replace a client; its previous entries are discarded lazily."""
+        generation = self._generation.get(client.client_id, 0) + 1
+        self._generation[client.client_id] = generation
+        order = self._clients[client.client_id][0] if client.client_id in self._clients else next(self._order)
+        tz = ZoneInfo(client.tz_name)
+        self._clients[client.client_id] = (order, client, tz)
+        for index, slot in enumerate(client.slots):
+            if self.platform in slot.platforms:
+                self._push(client.client_id, generation, index, now - self.tolerance)
+
+    def remove_client(self, client_id: str) -> None:
+        self._clients.pop(client_id, None)
+        self._generation[client_id] = self._generation.get(client_id, 0) + 1
+
+    def _push(self, client_id: str, generation: int, index: int, after: datetime) -> None:
+        _, client, tz = self._clients[client_id]
+        fire = next_fire_time(client.slots[index], tz, after)
+        if fire is None:
+            return
+        heapq.heappush(self._heap, (fire - self.early, next(self._seq), generation, client_id, index, fire))
+
+    def _is_current(self, client_id: str, generation: int) -> bool:
+        return client_id in self._clients and self._generation.get(client_id) == generation
+
+    def due(self, now: datetime) -> List[Tuple[ClientConfig, List[Tuple[Slot, datetime]]]]:
+        """
+        Slots whose window contains `now` with their fire time, grouped per client
+        in config order. A window can cross local midnight, so callers key the
+        slot's day on the fire time, not on `now`.
+        """
+        if self._last_now is not None and now < self._last_now:
+            self._rebuild(now)
+        self._last_now = now
+
+        while self._heap and self._heap[0][0] <= now:
+            _, _, generation, client_id, index, fire = heapq.heappop(self._heap)
+            if self._is_current(client_id, generation):
+                self._active[(client_id, index)] = (generation, fire)
+
+        grouped: Dict[str, List[Tuple[int, datetime]]] = {}
+        for (client_id, index), (generation, fire) in list(self._active.items()):
+            if not self._is_current(client_id, generation):
+                del self._active[(client_id, index)]
+                continue
+            if now > fire + self.tolerance:
+                del self._active[(client_id, index)]
+                # Skip any occurrences that were missed entirely (e.g. after a long sleep).
+                self._push(client_id, generation, index, max(fire + timedelta(seconds=1), now - self.tolerance))
+                continue
+            grouped.setdefault(client_id, []).append((index, fire))
+
+        result = []
+        for client_id in sorted(grouped, key=lambda cid: self._clients[cid][0]):
+            client = self._clients[client_id][1]
+            result.append((client, [(client.slots[i], fire) for i, fire in sorted(grouped[client_id])]))
+        return result
+
+    def next_wakeup(self) -> Optional[datetime]:
+        """Start of the earliest window that has not opened yet."""
+        while self._heap and not self._is_current(self._heap[0][3], self._heap[0][2]):
+            heapq.heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def _rebuild(self, now: datetime) -> None:
+        clients = [entry[1] for entry in sorted(self._clients.values(), key=lambda e: e[0])]
+        self._heap.clear()
+        self._active.clear()
+        self._clients.clear()
+        for client in clients:
+            self.add_client(client, now)
@@ -0,0 +1,300 @@
+"""
+Scalability benchmark for SocialMediaAgent.run_cycle_once.
+
+Builds a synthetic config tree (clients with 2-4 slots each), pre-fills the
+posts log, swaps in fake LLM/MCP clients with configurable latency and failure
+rates, then runs one cycle and prints JSON with wall time, peak RSS, a
+per-stage breakdown and the agent's own cycle metrics summary:
+
+    python -m facebook_agent.benchmarks.cycle_bench --clients 10,1000,10000 --log-rows 10000
+    python -m facebook_agent.benchmarks.cycle_bench --clients 1000 --log-rows 10000000 --log-type sqlite
+
+When several client/row counts are given each combination runs in its own
+process, so peak RSS is per scenario. Save the output of two commits and diff
+them to spot regressions in the scheduler, log store or config loader.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterator, List
+from zoneinfo import ZoneInfo
+
+from ..agent.agent_core import SocialMediaAgent
+from ..agent.log_store import LogStore, PartitionedCsvLogStore, migrate_csv_to_sqlite, split_into_partitions
+from ..agent.logger_csv import LOG_HEADER
+from ..agent.metrics import read_summary
+from ..agent.models import PostResult
+
+TIMEZONE = "Europe/Bucharest"
+SLOT_TIMES = ["08:00", "09:00", "12:30", "18:00", "20:30"]
+# A Wednesday; every client gets at least one daily 09:00 slot so it is due.
+NOW = datetime(2026, 1, 7, 9, 5, tzinfo=ZoneInfo(TIMEZONE))
+
+
+class Stages:
+    """Accumulated seconds and call counts per stage name."""
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.calls: Dict[str, int] = defaultdict(int)
+
+    @contextmanager
+    def timed(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.seconds[name] += time.perf_counter() - start
+            self.calls[name] += 1
+
+    def as_dict(self) -> Dict[str, dict]:
+        return {
+            name: {"seconds": round(self.seconds[name], 6), "calls": self.calls[name]} for name in self.seconds
+        }
+
+
+class BenchLLM:
+    def __init__(self, stages: Stages, latency: float, failure_rate: float, rng: random.Random):
+        self.stages, self.latency, self.failure_rate, self.rng = stages, latency, failure_rate, rng
+
+    async def generate_post_text(self, persona, client, campaign, now) -> str:
+        with self.stages.timed("llm"):
+            await asyncio.sleep(self.latency)
+            if self.rng.random() < self.failure_rate:
+                raise RuntimeError("bench: LLM failure")
+            return f"{client.display_name}: {campaign.objective}"
+
+
+class BenchMCP:
+    def __init__(self, stages: Stages, latency: float, failure_rate: float, rng: random.Random):
+        self.stages, self.latency, self.failure_rate, self.rng = stages, latency, failure_rate, rng
+
+    async def ensure_connected(self) -> None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+    async def post_text(self, page_id: str, message: str) -> PostResult:
+        with self.stages.timed("mcp"):
+            await asyncio.sleep(self.latency)
+            if self.rng.random() < self.failure_rate:
+                return PostResult(success=False, page_id=page_id, error="bench: MCP failure")
+            return PostResult(success=True, post_id=f"bench-{uuid.uuid4().hex}", page_id=page_id)
+
+
+class TimedLogStore(LogStore):
+    """Wraps the agent's log store to attribute time to lookups and appends."""
+
+    def __init__(self, inner: LogStore, stages: Stages):
+        self.inner, self.stages = inner, stages
+
+    def append(self, **kwargs) -> None:
+        with self.stages.timed("log_append"):
+            self.inner.append(**kwargs)
+
+    def has_success_for_slot(self, *args) -> bool:
+        with self.stages.timed("log_dedupe_lookup"):
+            return self.inner.has_success_for_slot(*args)
+
+    def count_success_for_day(self, *args) -> int:
+        with self.stages.timed("log_guardrail_lookup"):
+            return self.inner.count_success_for_day(*args)
+
+    def maintain(self, today) -> None:
+        with self.stages.timed("log_maintain"):
+            self.inner.maintain(today)
+
+    def close(self) -> None:
+        self.inner.close()
+
+
+def _client_slots(index: int, rng: random.Random) -> List[dict]:
+    slots = [
+        {"id": "daily_0900", "days_of_week": [1, 2, 3, 4, 5, 6, 7], "time": "09:00", "platforms": ["facebook"], "campaign": "awareness"}
+    ]
+    for n in range(rng.randint(1, 3)):
+        slots.append(
+            {
+                "id": f"slot_{n}",
+                "days_of_week": sorted(rng.sample(range(1, 8), rng.randint(2, 5))),
+                "time": rng.choice(SLOT_TIMES),
+                "platforms": ["facebook"],
+                "campaign": rng.choice(["awareness", "promo"]),
+            }
+        )
+    return slots
+
+
+def write_config_tree(base: Path, clients: int, log_type: str, partition: str, rng: random.Random) -> Path:
+    """Write global.json, agents.json and `clients` client files under base/config. Returns the log path."""
+    suffix = ".sqlite3" if log_type == "sqlite" else ".csv"
+    log_path = base / "logs" / f"posts_log{suffix}"
+    log_path.parent.mkdir(parents=True)
+    clients_dir = base / "config" / "clients"
+    clients_dir.mkdir(parents=True)
+    global_cfg = {
+        "timezone": TIMEZONE,
+        "llm": {"model": "bench", "use_async": True},
+        "scheduler": {"tick_minutes": 30, "tolerance_minutes": 15, "max_in_flight": 64},
+        "facebook_mcp": {"command": "true"},
+        "logging": {"type": log_type, "file": str(log_path), "partition": partition},
+    }
+    (base / "config" / "global.json").write_text(json.dumps(global_cfg), encoding="utf-8")
+    persona = {"name": "Bench", "language": "ro", "tone": "neutru", "style_notes": "scurt", "max_chars": 200}
+    (base / "config" / "agents.json").write_text(json.dumps({"agents": {"bench": persona}}), encoding="utf-8")
+    for i in range(clients):
+        client = {
+            "client_id": f"client_{i:05d}",
+            "display_name": f"Client {i}",
+            "agent_id": "bench",
+            "business": {"niche": "retail", "city": "Cluj-Napoca", "language": "ro"},
+            "platforms": {"facebook": {"enabled": True, "page_id": str(100000 + i)}},
+            "schedule": {"timezone": TIMEZONE, "slots": _client_slots(i, rng)},
+            "campaigns": {"awareness": {"objective": "Notorietate"}, "promo": {"objective": "Oferte"}},
+            "guardrails": {"max_posts_per_day": 3},
+        }
+        (clients_dir / f"client_{i:05d}.json").write_text(json.dumps(client), encoding="utf-8")
+    return log_path
+
+
+def prefill_log(log_path: Path, log_type: str, partition: str, clients: int, rows: int) -> None:
+    """
+    Write `rows` historical rows spread over the previous year, plus a success
+    for today's 09:00 slot for every tenth client so dedupe has hits.
+    """
+    tz = ZoneInfo(TIMEZONE)
+    csv_path = log_path if log_type == "csv" and partition == "none" else log_path.with_name("prefill.csv")
+    with csv_path.open("w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(LOG_HEADER)
+        for i in range(rows):
+            client = i % clients
+            day = NOW - timedelta(days=(i // clients) % 365 + 1)
+            status = "failed" if i % 20 == 0 else "success"
+            writer.writerow(
+                [day.astimezone(tz).isoformat(), f"client_{client:05d}", "daily_0900", "awareness", "facebook",
+                 str(100000 + client), f"hist-{i}", status, "bench: old failure" if status == "failed" else "",
+                 day.astimezone(tz).date().isoformat()]
+            )
+        for client in range(0, clients, 10):
+            writer.writerow(
+                [NOW.replace(hour=9, minute=0).isoformat(), f"client_{client:05d}", "daily_0900", "awareness",
+                 "facebook", str(100000 + client), f"today-{client}", "success", "", NOW.date().isoformat()]
+            )
+    if log_type == "sqlite":
+        migrate_csv_to_sqlite(csv_path, log_path)
+    elif partition == "daily":
+        split_into_partitions(csv_path, PartitionedCsvLogStore(log_path))
+    if csv_path != log_path:
+        csv_path.unlink()
+
+
+async def _run_cycle(agent: SocialMediaAgent, stages: Stages, mcp: BenchMCP) -> None:
+    with stages.timed("cycle"):
+        await agent.run_cycle_once(NOW, mcp=mcp)
+
+
+def run_scenario(args: argparse.Namespace, clients: int, rows: int) -> dict:
+    rng = random.Random(args.seed)
+    stages = Stages()
+    with tempfile.TemporaryDirectory(prefix="cycle-bench-") as tmp:
+        base = Path(tmp)
+        setup_start = time.perf_counter()
+        log_path = write_config_tree(base, clients, args.log_type, args.partition, rng)
+        prefill_log(log_path, args.log_type, args.partition, clients, rows)
+        setup_seconds = time.perf_counter() - setup_start
+
+        os.environ.setdefault("OPENAI_API_KEY", "bench")
+        start = time.perf_counter()
+        with stages.timed("config_load"):
+            agent = SocialMediaAgent(base_dir=base)
+        agent.llm_client = BenchLLM(stages, args.llm_latency, args.llm_failure_rate, rng)
+        agent.log_store = TimedLogStore(agent.log_store, stages)
+        mcp = BenchMCP(stages, args.mcp_latency, args.mcp_failure_rate, rng)
+        asyncio.run(_run_cycle(agent, stages, mcp))
+        wall = time.perf_counter() - start
+        agent_metrics = read_summary(log_path)
+        agent.log_store.close()
+
+    return {
+        "clients": clients,
+        "log_rows": rows,
+        "log_type": args.log_type,
+        "partition": args.partition,
+        "setup_seconds": round(setup_seconds, 3),
+        "wall_seconds": round(wall, 6),
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        "attempts_logged": stages.calls.get("log_append", 0),
+        "stages": stages.as_dict(),
+        "agent_metrics": agent_metrics,
+    }
+
+
+def _parse_counts(value: str) -> List[int]:
+    return [int(v.replace("_", "")) for v in value.split(",") if v]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=_parse_counts, default=[10, 1000, 10000])
+    parser.add_argument("--log-rows", type=_parse_counts, default=[10000])
+    parser.add_argument("--log-type", choices=["csv", "sqlite"], default="csv")
+    parser.add_argument("--partition", choices=["none", "daily"], default="none")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds per completion")
+    parser.add_argument("--llm-failure-rate", type=float, default=0.01)
+    parser.add_argument("--mcp-latency", type=float, default=0.1, help="seconds per post")
+    parser.add_argument("--mcp-failure-rate", type=float, default=0.02)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    # Injected failures are expected; keep their tracebacks out of the output.
+    logging.getLogger("facebook_agent").setLevel(logging.CRITICAL)
+
+    scenarios = [(c, r) for c in args.clients for r in args.log_rows]
+    if len(scenarios) == 1:
+        print(json.dumps(run_scenario(args, *scenarios[0]), indent=2))
+        return
+
+    results = []
+    for clients, rows in scenarios:
+        argv = _without_counts(sys.argv[1:]) + ["--clients", str(clients), "--log-rows", str(rows)]
+        out = subprocess.run(
+            [sys.executable, "-m", __spec__.name, *argv], check=True, capture_output=True, text=True
+        ).stdout
+        results.append(json.loads(out))
+    print(json.dumps(results, indent=2))
+
+
+def _without_counts(argv: List[str]) -> List[str]:
+    out, skip = [], False
+    for arg in argv:
+        if skip:
+            skip = False
+            continue
+        if arg in ("--clients", "--log-rows"):
+            skip = True
+            continue
+        if arg.startswith(("--clients=", "--log-rows=")):
+            continue
+        out.append(arg)
+    return out
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Stand-in MCP server for tests, speaking newline-delimited JSON-RPC on stdio.
+
+post_to_facebook messages control the behaviour: "slow:<seconds>" delays the
+answer (so responses arrive out of order), "hang" never answers, "die" exits.
+"""
+import json
+import os
+import sys
+import threading
+import time
+
+_out = threading.Lock()
+
+
+def send(msg):
+    with _out:
+        sys.stdout.write(json.dumps(msg) + "\n")
+        sys.stdout.flush()
+
+
+def answer_call(req):
+    args = req["params"]["arguments"]
+    message = args.get("message", "")
+    if message == "hang":
+        return
+    if message == "die":
+        os._exit(3)
+    if message.startswith("slow:"):
+        time.sleep(float(message.split(":", 1)[1]))
+    payload = {"id": f"{args.get('page_id', 'page')}_{message}"}
+    send(
+        {
+            "jsonrpc": "2.0",
+            "id": req["id"],
+            "result": {"content": [{"type": "text", "text": json.dumps(payload)}], "structuredContent": payload, "isError": False},
+        }
+    )
+
+
+def main():
+    # Noise that must never be mistaken for a response.
+    print("starting fake MCP server", flush=True)
+    for line in sys.stdin:
+        req = json.loads(line)
+        method = req.get("method")
+        if "id" not in req:
+            continue
+        if method == "initialize":
+            send(
+                {
+                    "jsonrpc": "2.0",
+                    "id": req["id"],
+                    "result": {"protocolVersion": req["params"]["protocolVersion"], "capabilities": {"tools": {}}, "serverInfo": {"name": "FakeMCP", "version": "0.1"}},
+                }
+            )
+        elif method == "tools/list":
+            send({"jsonrpc": "2.0", "id": req["id"], "result": {"tools": [{"name": "post_to_facebook"}]}})
+        elif method == "ping":
+            send({"jsonrpc": "2.0", "id": req["id"], "result": {}})
+        elif method == "tools/call":
+            threading.Thread(target=answer_call, args=(req,), daemon=True).start()
+        else:
+            send({"jsonrpc": "2.0", "id": req["id"], "error": {"code": -32601, "message": "Method not found"}})
+
+
+if __name__ == "__main__":
+    main()
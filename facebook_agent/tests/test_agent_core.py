@@ -1,9 +1,11 @@
 import asyncio
 import json
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
 
 import facebook_agent.agent.agent_core as agent_core_module
+from facebook_agent.agent.log_store import iter_csv_rows
+from facebook_agent.agent.metrics import read_summary
 from facebook_agent.agent.models import PostResult
 
 
@@ -98,3 +100,211 @@ def test_agent_run_cycle(monkeypatch, tmp_path: Path):
     assert "c1" in content
     assert "s1" in content
 
+    summary = read_summary(log_path)
+    assert summary["counters"]["posts_attempted"] == 1
+    assert summary["counters"]["posts_succeeded"] == 1
+    assert {"config_load", "cycle", "llm", "mcp_post", "log_append"} <= set(summary["stages"])
+    prom = (base / "log.prom").read_text(encoding="utf-8")
+    assert 'facebook_agent_cycle_events{event="posts_succeeded"} 1' in prom
+
+
+class SlowMCP:
+    def __init__(self, clock: datetime):
+        self.clock = clock
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.called = []
+
+    async def post_text(self, page_id: str, message: str):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        self.called.append((page_id, message))
+        return PostResult(
+            success=True, post_id=f"p-{len(self.called)}", page_id=page_id, error=None, timestamp=self.clock
+        )
+
+
+def test_agent_run_cycle_concurrent_clients(monkeypatch, tmp_path: Path):
+    base = tmp_path / "facebook_agent"
+    log_path = base / "log.csv"
+    _write_configs(base, log_path)
+
+    global_path = base / "config" / "global.json"
+    global_cfg = json.loads(global_path.read_text(encoding="utf-8"))
+    global_cfg["scheduler"]["max_in_flight"] = 3
+    global_path.write_text(json.dumps(global_cfg), encoding="utf-8")
+
+    template = json.loads((base / "config" / "clients" / "c1.json").read_text(encoding="utf-8"))
+    for i in range(2, 9):
+        cfg = dict(template, client_id=f"c{i}")
+        cfg["platforms"] = {"facebook": {"enabled": True, "page_id": f"p{i}"}}
+        cfg["schedule"] = {
+            "timezone": "Europe/Bucharest",
+            "slots": [
+                {"id": f"s{n}", "days_of_week": [1, 2, 3, 4, 5, 6, 7], "time": "09:00", "platforms": ["facebook"], "campaign": "camp"}
+                for n in range(1, 5)
+            ],
+        }
+        cfg["guardrails"] = {"max_posts_per_day": 2}
+        (base / "config" / "clients" / f"c{i}.json").write_text(json.dumps(cfg), encoding="utf-8")
+
+    now = datetime(2026, 1, 2, 7, 5, tzinfo=timezone.utc)
+    monkeypatch.setattr(agent_core_module, "LLMClient", FakeLLM)
+    slow_mcp = SlowMCP(clock=now)
+
+    class SlowMCPContext:
+        def __init__(self, cfg):
+            self.cfg = cfg
+
+        async def __aenter__(self):
+            return slow_mcp
+
+        async def __aexit__(self, exc_type, exc, tb):
+            return False
+
+    monkeypatch.setattr(agent_core_module, "MCPClient", SlowMCPContext)
+
+    agent = agent_core_module.SocialMediaAgent(base_dir=base)
+    asyncio.run(agent.run_cycle_once(now))
+
+    assert 1 < slow_mcp.max_in_flight <= 3
+    # c1 posts once, c2..c8 are capped by their guardrail at 2 posts each
+    assert len(slow_mcp.called) == 1 + 7 * 2
+
+    rows = [line.split(",") for line in log_path.read_text(encoding="utf-8").splitlines()[1:]]
+    for i in range(2, 9):
+        slots = [r[2] for r in rows if r[1] == f"c{i}"]
+        assert slots == ["s1", "s2"]
+
+
+def test_agent_reload_clients_reschedules_changed_client(monkeypatch, tmp_path: Path):
+    base = tmp_path / "facebook_agent"
+    _write_configs(base, base / "log.csv")
+    monkeypatch.setattr(agent_core_module, "LLMClient", FakeLLM)
+    agent = agent_core_module.SocialMediaAgent(base_dir=base)
+
+    now = datetime(2026, 1, 2, 6, 0, tzinfo=timezone.utc)  # 08:00 local
+    assert agent._collect_due_slots(now) == []
+
+    client_path = base / "config" / "clients" / "c1.json"
+    cfg = json.loads(client_path.read_text(encoding="utf-8"))
+    cfg["schedule"]["slots"][0]["time"] = "08:05"
+    client_path.write_text(json.dumps(cfg), encoding="utf-8")
+
+    diff = agent.reload_clients(now)
+    assert [c.client_id for c in diff.updated] == ["c1"]
+    work = agent._collect_due_slots(now)
+    assert [(c.client_id, [s.id for s, _, _ in slots]) for c, slots in work] == [("c1", ["s1"])]
+
+
+def test_slot_window_across_midnight_posts_once(monkeypatch, tmp_path: Path):
+    base = tmp_path / "facebook_agent"
+    log_path = base / "log.csv"
+    _write_configs(base, log_path)
+    client_path = base / "config" / "clients" / "c1.json"
+    cfg = json.loads(client_path.read_text(encoding="utf-8"))
+    cfg["schedule"]["slots"][0]["time"] = "23:55"
+    client_path.write_text(json.dumps(cfg), encoding="utf-8")
+    monkeypatch.setattr(agent_core_module, "LLMClient", FakeLLM)
+    agent = agent_core_module.SocialMediaAgent(base_dir=base)
+
+    # 23:45 and 00:05 Bucharest time are both inside the 23:55 slot's window.
+    before = datetime(2026, 1, 2, 21, 45, tzinfo=timezone.utc)
+    after = datetime(2026, 1, 2, 22, 5, tzinfo=timezone.utc)
+    mcp = SlowMCP(clock=before)
+    asyncio.run(agent._run_work(mcp, agent._collect_due_slots(before), before))
+    mcp.clock = after
+    assert agent._collect_due_slots(after) == []
+    assert len(mcp.called) == 1
+
+
+def test_slot_posted_after_midnight_is_logged_on_its_day(monkeypatch, tmp_path: Path):
+    base = tmp_path / "facebook_agent"
+    log_path = base / "log.csv"
+    _write_configs(base, log_path)
+    client_path = base / "config" / "clients" / "c1.json"
+    cfg = json.loads(client_path.read_text(encoding="utf-8"))
+    cfg["schedule"]["slots"][0]["time"] = "23:55"
+    cfg["guardrails"]["max_posts_per_day"] = 1
+    client_path.write_text(json.dumps(cfg), encoding="utf-8")
+    monkeypatch.setattr(agent_core_module, "LLMClient", FakeLLM)
+    agent = agent_core_module.SocialMediaAgent(base_dir=base)
+
+    after = datetime(2026, 1, 2, 22, 5, tzinfo=timezone.utc)  # 00:05 on Jan 3, local
+    mcp = SlowMCP(clock=after)
+    asyncio.run(agent._run_work(mcp, agent._collect_due_slots(after), after))
+    assert len(mcp.called) == 1
+    assert agent.log_store.has_success_for_slot(date(2026, 1, 2), "c1", "s1", "facebook")
+    assert agent.log_store.count_success_for_day(date(2026, 1, 3), "c1", "facebook") == 0
+    assert agent._collect_due_slots(after + timedelta(minutes=3)) == []
+    # The row keeps the real send time; only its slot day is Jan 2.
+    [row] = iter_csv_rows(log_path)
+    assert row["timestamp_iso"] == "2026-01-03T00:05:00+02:00"
+    assert row["slot_day"] == "2026-01-02"
+
+
+def test_outbox_drafts_are_published_without_llm_call(monkeypatch, tmp_path: Path):
+    base = tmp_path / "facebook_agent"
+    log_path = base / "log.csv"
+    _write_configs(base, log_path)
+    global_path = base / "config" / "global.json"
+    global_cfg = json.loads(global_path.read_text(encoding="utf-8"))
+    global_cfg["outbox"] = {"enabled": True, "file": str(base / "outbox.sqlite3"), "lookahead_hours": 6}
+    global_path.write_text(json.dumps(global_cfg), encoding="utf-8")
+
+    generated = []
+
+    class CountingLLM(FakeLLM):
+        def generate_post_text(self, persona, client, campaign, now):
+            generated.append(now)
+            return f"draft for {now.date()}"
+
+    monkeypatch.setattr(agent_core_module, "LLMClient", CountingLLM)
+    now = datetime(2026, 1, 2, 7, 5, tzinfo=timezone.utc)
+    mcp = SlowMCP(clock=now)
+
+    agent = agent_core_module.SocialMediaAgent(base_dir=base)
+    # 03:00 UTC: the 09:00 local (07:00 UTC) slot is inside the 6h lookahead.
+    assert asyncio.run(agent.pregenerate(datetime(2026, 1, 2, 3, 0, tzinfo=timezone.utc))) == 1
+    assert asyncio.run(agent.pregenerate(datetime(2026, 1, 2, 3, 30, tzinfo=timezone.utc))) == 0
+    assert len(generated) == 1
+
+    asyncio.run(agent._run_work(mcp, agent._collect_due_slots(now), now))
+    assert mcp.called == [("p1", "draft for 2026-01-02")]
+    assert len(generated) == 1
+    assert len(agent.outbox) == 0
+
+
+def test_outbox_draft_for_late_slot_is_consumed_after_midnight(monkeypatch, tmp_path: Path):
+    base = tmp_path / "facebook_agent"
+    log_path = base / "log.csv"
+    _write_configs(base, log_path)
+    global_path = base / "config" / "global.json"
+    global_cfg = json.loads(global_path.read_text(encoding="utf-8"))
+    global_cfg["outbox"] = {"enabled": True, "file": str(base / "outbox.sqlite3"), "lookahead_hours": 6}
+    global_path.write_text(json.dumps(global_cfg), encoding="utf-8")
+    client_path = base / "config" / "clients" / "c1.json"
+    cfg = json.loads(client_path.read_text(encoding="utf-8"))
+    cfg["schedule"]["slots"][0]["time"] = "23:55"
+    client_path.write_text(json.dumps(cfg), encoding="utf-8")
+
+    generated = []
+
+    class CountingLLM(FakeLLM):
+        def generate_post_text(self, persona, client, campaign, now):
+            generated.append(now)
+            return f"draft for {now.date()}"
+
+    monkeypatch.setattr(agent_core_module, "LLMClient", CountingLLM)
+    agent = agent_core_module.SocialMediaAgent(base_dir=base)
+    # 20:00 local on Jan 2 pre-generates the 23:55 slot's draft.
+    assert asyncio.run(agent.pregenerate(datetime(2026, 1, 2, 18, 0, tzinfo=timezone.utc))) == 1
+
+    after = datetime(2026, 1, 2, 22, 5, tzinfo=timezone.utc)  # 00:05 on Jan 3, local
+    mcp = SlowMCP(clock=after)
+    asyncio.run(agent._run_work(mcp, agent._collect_due_slots(after), after))
+    assert mcp.called == [("p1", "draft for 2026-01-02")]
+    assert len(generated) == 1
+    assert len(agent.outbox) == 0
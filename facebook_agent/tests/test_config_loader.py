@@ -1,3 +1,5 @@
+import json
+import os
 from pathlib import Path
 
 from facebook_agent.agent import config_loader
@@ -39,3 +41,68 @@ def test_load_configs(tmp_path: Path):
     clients = config_loader.load_clients(base)
     assert clients[0].client_id == "c1"
 
+
+
+def _client_json(client_id: str, time: str = "10:00", page_id: str = "p1") -> str:
+    return json.dumps(
+        {
+            "client_id": client_id,
+            "display_name": "Test",
+            "agent_id": "a1",
+            "business": {"niche": "n", "city": "c", "language": "ro"},
+            "platforms": {"facebook": {"enabled": True, "page_id": page_id}},
+            "schedule": {
+                "timezone": "Europe/Bucharest",
+                "slots": [{"id": "s1", "days_of_week": [1], "time": time, "platforms": ["facebook"], "campaign": "camp"}],
+            },
+            "campaigns": {"camp": {"objective": "o"}},
+        }
+    )
+
+
+def _touch_write(path: Path, text: str, bump: int) -> None:
+    path.write_text(text, encoding="utf-8")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump * 1_000_000_000))
+
+
+def test_client_registry_incremental_refresh(tmp_path: Path, monkeypatch):
+    clients_dir = tmp_path / "config" / "clients"
+    clients_dir.mkdir(parents=True)
+    (clients_dir / "a.json").write_text(_client_json("a"), encoding="utf-8")
+    (clients_dir / "b.json").write_text(_client_json("b"), encoding="utf-8")
+
+    registry = config_loader.ClientRegistry(tmp_path)
+    assert [c.client_id for c in registry.load()] == ["a", "b"]
+
+    validated = []
+    original = config_loader._validate_client
+    monkeypatch.setattr(
+        config_loader, "_validate_client", lambda data, path: validated.append(path.name) or original(data, path)
+    )
+
+    assert not registry.refresh()
+    assert validated == []
+
+    # same content, new mtime: hashed but not re-validated
+    _touch_write(clients_dir / "a.json", _client_json("a"), 1)
+    assert not registry.refresh()
+    assert validated == []
+
+    _touch_write(clients_dir / "b.json", _client_json("b", time="11:00"), 2)
+    (clients_dir / "c.json").write_text(_client_json("c"), encoding="utf-8")
+    diff = registry.refresh()
+    assert sorted(validated) == ["b.json", "c.json"]
+    assert [c.client_id for c in diff.updated] == ["b"] and [c.client_id for c in diff.added] == ["c"]
+    assert registry.clients[1].slots[0].time == "11:00"
+
+    # a broken edit keeps the last good version
+    _touch_write(clients_dir / "b.json", _client_json("b", page_id=""), 3)
+    diff = registry.refresh()
+    assert not diff and len(diff.failed) == 1
+    assert registry.clients[1].slots[0].time == "11:00"
+
+    (clients_dir / "a.json").unlink()
+    diff = registry.refresh()
+    assert diff.removed == ("a",)
+    assert [c.client_id for c in registry.clients] == ["b", "c"]
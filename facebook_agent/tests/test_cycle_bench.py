@@ -0,0 +1,22 @@
+import argparse
+
+from facebook_agent.benchmarks.cycle_bench import run_scenario
+
+
+def test_cycle_bench_smoke():
+    args = argparse.Namespace(
+        log_type="csv",
+        partition="none",
+        llm_latency=0.0,
+        llm_failure_rate=0.0,
+        mcp_latency=0.0,
+        mcp_failure_rate=0.0,
+        seed=1,
+    )
+    result = run_scenario(args, clients=20, rows=200)
+    # Every client has a daily 09:00 slot; every tenth already posted it today.
+    assert result["stages"]["mcp"]["calls"] >= 18
+    assert result["stages"]["log_dedupe_lookup"]["calls"] >= 20
+    assert result["peak_rss_kb"] > 0
+    assert {"config_load", "cycle"} <= set(result["stages"])
+    assert result["agent_metrics"]["counters"]["posts_attempted"] == result["stages"]["mcp"]["calls"]
@@ -0,0 +1,144 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+import facebook_agent.agent.agent_core as agent_core_module
+import facebook_agent.agent.daemon as daemon_module
+from facebook_agent.agent.metrics import read_summary
+from facebook_agent.agent.models import PostResult
+from facebook_agent.tests.test_agent_core import FakeLLM, _write_configs
+
+
+class FlakySession:
+    """Fails the first post so the slot is retried on the next tick."""
+
+    def __init__(self, cfg):
+        self.cfg = cfg
+        self.alive = False
+        self.connects = 0
+        self.closed = False
+        self.posts = 0
+
+    async def ensure_connected(self):
+        if not self.alive:
+            self.connects += 1
+            self.alive = True
+
+    async def close(self):
+        self.closed = True
+
+    async def post_text(self, page_id: str, message: str):
+        self.posts += 1
+        if self.posts == 1:
+            return PostResult(success=False, page_id=page_id, error="boom")
+        return PostResult(success=True, post_id="p1", page_id=page_id)
+
+
+def test_next_tick_alignment():
+    now = datetime(2026, 1, 2, 7, 20, 30, tzinfo=timezone.utc)
+    assert daemon_module.seconds_until_next_tick(now, 30) == 9.5 * 60
+
+
+def test_daemon_reuses_session_across_ticks(monkeypatch, tmp_path: Path):
+    base = tmp_path / "facebook_agent"
+    log_path = base / "log.csv"
+    _write_configs(base, log_path)
+    client_path = base / "config" / "clients" / "c1.json"
+    client_cfg = json.loads(client_path.read_text(encoding="utf-8"))
+    local_now = datetime.now(timezone.utc).astimezone(ZoneInfo("Europe/Bucharest"))
+    client_cfg["schedule"]["slots"][0]["time"] = local_now.strftime("%H:%M")
+    client_path.write_text(json.dumps(client_cfg), encoding="utf-8")
+
+    sessions = []
+
+    def session_factory(cfg):
+        sessions.append(FlakySession(cfg))
+        return sessions[-1]
+
+    monkeypatch.setattr(agent_core_module, "LLMClient", FakeLLM)
+    monkeypatch.setattr(daemon_module, "MCPClient", session_factory)
+    monkeypatch.setattr(daemon_module, "seconds_until_next_tick", lambda now, tick: 0)
+
+    asyncio.run(daemon_module.run_daemon(base, max_ticks=3))
+
+    assert len(sessions) == 1
+    session = sessions[0]
+    assert session.connects == 1
+    assert session.posts == 2  # failed once, retried once, then deduped
+    assert session.closed
+    statuses = [line.split(",")[7] for line in log_path.read_text(encoding="utf-8").splitlines()[1:]]
+    assert statuses == ["failed", "success"]
+
+
+def test_daemon_posts_at_slot_time(monkeypatch, tmp_path: Path):
+    base = tmp_path / "facebook_agent"
+    log_path = base / "log.csv"
+    _write_configs(base, log_path)
+    client_path = base / "config" / "clients" / "c1.json"
+    client_cfg = json.loads(client_path.read_text(encoding="utf-8"))
+    client_cfg["schedule"]["slots"][0]["time"] = "08:52"
+    client_path.write_text(json.dumps(client_cfg), encoding="utf-8")
+    slot_time = datetime(2026, 1, 2, 8, 52, tzinfo=ZoneInfo("Europe/Bucharest"))
+
+    # The daemon starts at 08:47, inside the slot's tolerance but before its time.
+    clock = [slot_time - timedelta(minutes=5)]
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return clock[0].astimezone(tz)
+
+    async def fake_wait(stop, seconds):
+        clock[0] += timedelta(seconds=seconds)
+
+    class RecordingSession(FlakySession):
+        posted_at = []
+
+        async def post_text(self, page_id: str, message: str):
+            self.posted_at.append(clock[0])
+            return PostResult(success=True, post_id="p1", page_id=page_id, timestamp=clock[0])
+
+    monkeypatch.setattr(agent_core_module, "LLMClient", FakeLLM)
+    monkeypatch.setattr(daemon_module, "MCPClient", RecordingSession)
+    monkeypatch.setattr(daemon_module, "datetime", FakeDatetime)
+    monkeypatch.setattr(daemon_module, "_wait", fake_wait)
+
+    asyncio.run(daemon_module.run_daemon(base, max_ticks=3))
+
+    assert RecordingSession.posted_at == [slot_time]
+
+
+def test_daemon_closes_async_llm_and_reports_only_cycle_work(monkeypatch, tmp_path: Path):
+    base = tmp_path / "facebook_agent"
+    log_path = base / "log.csv"
+    _write_configs(base, log_path)
+    global_path = base / "config" / "global.json"
+    global_cfg = json.loads(global_path.read_text(encoding="utf-8"))
+    global_cfg["llm"]["use_async"] = True
+    global_path.write_text(json.dumps(global_cfg), encoding="utf-8")
+
+    class FakeAsyncLLM:
+        closed = 0
+
+        def __init__(self, cfg):
+            self.cfg = cfg
+
+        async def aclose(self):
+            FakeAsyncLLM.closed += 1
+
+    async def pregenerate(self, now, lookahead_hours=None):
+        self.metrics.inc("drafts_generated", 3)
+        return 3
+
+    monkeypatch.setattr(agent_core_module, "AsyncLLMClient", FakeAsyncLLM)
+    monkeypatch.setattr(agent_core_module.SocialMediaAgent, "pregenerate", pregenerate)
+    monkeypatch.setattr(daemon_module, "MCPClient", FlakySession)
+    monkeypatch.setattr(daemon_module, "seconds_until_next_tick", lambda now, tick: 0)
+
+    asyncio.run(daemon_module.run_daemon(base, max_ticks=2))
+
+    assert FakeAsyncLLM.closed == 1
+    # The second cycle's metrics do not include the first tick's drafting.
+    assert "drafts_generated" not in read_summary(log_path)["counters"]
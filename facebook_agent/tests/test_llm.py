@@ -0,0 +1,118 @@
+import asyncio
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import openai
+import pytest
+
+from facebook_agent.agent.llm import AsyncLLMClient
+from facebook_agent.agent.models import AgentPersona, ClientConfig, LLMConfig
+
+
+class FakeCompletionServer:
+    """Minimal OpenAI-compatible /v1/chat/completions endpoint on localhost."""
+
+    def __init__(self, delay: float = 0.0, text: str = "Hello from the bakery"):
+        self.delay = delay
+        self.text = text
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.requests = 0
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length))
+                with server._lock:
+                    server.requests += 1
+                    server.in_flight += 1
+                    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+                time.sleep(server.delay)
+                with server._lock:
+                    server.in_flight -= 1
+                payload = json.dumps(
+                    {
+                        "id": "chatcmpl-1",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": body["model"],
+                        "choices": [
+                            {
+                                "index": 0,
+                                "finish_reason": "stop",
+                                "message": {"role": "assistant", "content": f"  {server.text}  "},
+                            }
+                        ],
+                    }
+                ).encode("utf-8")
+                try:
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+
+    def __enter__(self):
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def _inputs():
+    persona = AgentPersona(name="A", language="ro", tone="calm", style_notes="s", max_chars=12)
+    client = ClientConfig.model_validate(
+        {
+            "client_id": "c1",
+            "display_name": "Brand",
+            "agent_id": "a1",
+            "business": {"niche": "n", "city": "c", "language": "ro"},
+            "platforms": {"facebook": {"enabled": True, "page_id": "p1"}},
+            "schedule": {"timezone": "Europe/Bucharest", "slots": []},
+            "campaigns": {"camp": {"objective": "o"}},
+        }
+    )
+    return persona, client, client.campaigns["camp"], datetime(2026, 1, 2, 7, 0, tzinfo=timezone.utc)
+
+
+def _cfg(server: FakeCompletionServer, **overrides) -> LLMConfig:
+    return LLMConfig(model="gpt-test", base_url=server.base_url, max_retries=0, **overrides)
+
+
+@pytest.mark.asyncio
+async def test_async_llm_caps_concurrent_requests(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    with FakeCompletionServer(delay=0.05) as server:
+        llm = AsyncLLMClient(_cfg(server, max_concurrent_requests=2))
+        texts = await asyncio.gather(*(llm.generate_post_text(*_inputs()) for _ in range(6)))
+        await llm.aclose()
+
+    assert server.requests == 6
+    assert server.max_in_flight == 2
+    # trimmed and truncated to persona.max_chars
+    assert texts == ["Hello from…"] * 6
+
+
+@pytest.mark.asyncio
+async def test_async_llm_request_timeout(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    with FakeCompletionServer(delay=1.0) as server:
+        llm = AsyncLLMClient(_cfg(server, timeout_seconds=0.2))
+        with pytest.raises(openai.APITimeoutError):
+            await llm.generate_post_text(*_inputs())
+        await llm.aclose()
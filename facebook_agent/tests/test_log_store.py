@@ -0,0 +1,228 @@
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import pytest
+
+from facebook_agent.agent.log_store import (
+    CsvLogStore,
+    LogStore,
+    PartitionedCsvLogStore,
+    SqliteLogStore,
+    iter_csv_rows,
+    migrate_csv_to_sqlite,
+    open_log_store,
+    split_into_partitions,
+)
+from facebook_agent.agent.logger_csv import append_log
+from facebook_agent.agent.models import LoggingConfig
+
+
+def _append(store, day_hour, slot_id="s1", status="success", client_id="c1"):
+    store.append(
+        timestamp=datetime(2026, 1, 2, day_hour, 0, tzinfo=timezone.utc),
+        client_id=client_id,
+        slot_id=slot_id,
+        campaign="camp",
+        platform="facebook",
+        page_id="p1",
+        post_id="x",
+        status=status,
+        error=None,
+    )
+
+
+@pytest.mark.parametrize("kind,partition", [("csv", "none"), ("csv", "daily"), ("sqlite", "none")])
+def test_store_lookups(tmp_path: Path, kind, partition):
+    store = open_log_store(LoggingConfig(type=kind, file=str(tmp_path / f"log.{kind}"), partition=partition))
+    day = date(2026, 1, 2)
+    assert not store.has_success_for_slot(day, "c1", "s1", "facebook")
+    assert store.count_success_for_day(day, "c1", "facebook") == 0
+
+    _append(store, 7)
+    _append(store, 8, slot_id="s2", status="failed")
+    _append(store, 9, slot_id="s3")
+    _append(store, 9, client_id="c2")
+
+    assert store.has_success_for_slot(day, "c1", "s1", "facebook")
+    assert not store.has_success_for_slot(day, "c1", "s2", "facebook")
+    assert not store.has_success_for_slot(date(2026, 1, 3), "c1", "s1", "facebook")
+    assert store.count_success_for_day(day, "c1", "facebook") == 2
+    store.close()
+
+
+@pytest.mark.parametrize("kind,partition", [("csv", "none"), ("csv", "daily"), ("sqlite", "none")])
+def test_rows_count_against_their_slot_day(tmp_path: Path, kind, partition):
+    store = open_log_store(LoggingConfig(type=kind, file=str(tmp_path / f"log.{kind}"), partition=partition))
+    # A 23:55 slot on Jan 2 that went out at 00:05 on Jan 3.
+    store.append(
+        timestamp=datetime(2026, 1, 3, 0, 5),
+        client_id="c1",
+        slot_id="s1",
+        campaign="camp",
+        platform="facebook",
+        page_id="p1",
+        post_id="x",
+        status="success",
+        slot_day=date(2026, 1, 2),
+    )
+    assert store.has_success_for_slot(date(2026, 1, 2), "c1", "s1", "facebook")
+    assert store.count_success_for_day(date(2026, 1, 3), "c1", "facebook") == 0
+    store.close()
+
+
+def test_csv_without_slot_day_column_is_still_read(tmp_path: Path):
+    log_path = tmp_path / "log.csv"
+    log_path.write_text(
+        "timestamp_iso,client_id,slot_id,campaign,platform,page_id,post_id,status,error\n"
+        "2026-01-02T07:00:00,c1,s1,camp,facebook,p1,x,success,\n",
+        encoding="utf-8",
+    )
+    store = CsvLogStore(log_path)
+    assert store.count_success_for_day(date(2026, 1, 2), "c1", "facebook") == 1
+    append_log(
+        log_path,
+        timestamp=datetime(2026, 1, 3, 0, 5),
+        client_id="c1",
+        slot_id="s2",
+        campaign="camp",
+        platform="facebook",
+        page_id="p1",
+        post_id="y",
+        status="success",
+        slot_day=date(2026, 1, 2),
+    )
+    assert store.count_success_for_day(date(2026, 1, 2), "c1", "facebook") == 2
+    assert [row.get("slot_day") for row in iter_csv_rows(log_path)] == [None, "2026-01-02"]
+
+
+def test_log_store_requires_the_lookup_methods():
+    class AppendOnly(LogStore):
+        def append(self, timestamp, client_id, slot_id, campaign, platform, page_id, post_id, status, error=None,
+                   slot_day=None):
+            pass
+
+    with pytest.raises(TypeError, match="count_success_for_day"):
+        AppendOnly()
+
+
+def test_csv_store_sees_external_writes(tmp_path: Path):
+    log_path = tmp_path / "log.csv"
+    store = CsvLogStore(log_path)
+    day = date(2026, 1, 2)
+    assert store.count_success_for_day(day, "c1", "facebook") == 0
+
+    append_log(
+        log_path,
+        timestamp=datetime(2026, 1, 2, 7, 0),
+        client_id="c1",
+        slot_id="s1",
+        campaign="camp",
+        platform="facebook",
+        page_id="p1",
+        post_id="x",
+        status="success",
+    )
+    assert store.count_success_for_day(day, "c1", "facebook") == 1
+
+
+def test_migrate_and_export_roundtrip(tmp_path: Path):
+    csv_path = tmp_path / "log.csv"
+    _append(CsvLogStore(csv_path), 7)
+    _append(CsvLogStore(csv_path), 8, slot_id="s2", status="failed")
+
+    db_path = tmp_path / "log.sqlite3"
+    assert migrate_csv_to_sqlite(csv_path, db_path) == 2
+    # Running the migration again must not duplicate the rows.
+    with pytest.raises(ValueError, match="already has rows"):
+        migrate_csv_to_sqlite(csv_path, db_path)
+
+    store = SqliteLogStore(db_path)
+    assert store.has_success_for_slot(date(2026, 1, 2), "c1", "s1", "facebook")
+    out_path = tmp_path / "export.csv"
+    assert store.export_csv(out_path) == 2
+    # Exporting again replaces the file instead of appending a second copy.
+    assert store.export_csv(out_path) == 2
+    store.close()
+    assert out_path.read_text(encoding="utf-8") == csv_path.read_text(encoding="utf-8")
+    assert not out_path.with_name("export.csv.tmp").exists()
+
+
+def _append_on(store, day, slot_id="s1", status="success", error=None):
+    store.append(
+        timestamp=datetime(day.year, day.month, day.day, 7, 0),
+        client_id="c1",
+        slot_id=slot_id,
+        campaign="camp",
+        platform="facebook",
+        page_id="p1",
+        post_id="x",
+        status=status,
+        error=error,
+    )
+
+
+def test_partitioned_store_compacts_compresses_and_expires(tmp_path: Path):
+    store = PartitionedCsvLogStore(tmp_path / "log.csv", retention_days=5, compress_after_days=2)
+    old, recent, today = date(2026, 1, 1), date(2026, 1, 5), date(2026, 1, 8)
+    _append_on(store, old)
+    _append_on(store, recent)
+    for i in range(3):
+        _append_on(store, recent, slot_id="s2", status="failed", error=f"boom {i}")
+    _append_on(store, today)
+
+    store.maintain(today)
+
+    assert not store.partition_path(old).exists()
+    assert not store.partition_path(recent).exists()
+    compressed = store.partition_path(recent).with_name(store.partition_path(recent).name + ".gz")
+    rows = list(iter_csv_rows(compressed))
+    assert [r["status"] for r in rows] == ["success", "failed"]
+    assert rows[1]["error"].startswith("3 failed attempts") and rows[1]["error"].endswith("boom 2")
+    assert store.partition_path(today).exists()
+
+    assert store.has_success_for_slot(recent, "c1", "s1", "facebook")
+    assert store.count_success_for_day(today, "c1", "facebook") == 1
+
+    # A late write for a compressed day is still visible and gets folded in next time.
+    _append_on(store, recent, slot_id="s3")
+    assert store.count_success_for_day(recent, "c1", "facebook") == 2
+    store.maintain(date(2026, 1, 9))
+    assert not store.partition_path(recent).exists()
+    assert store.count_success_for_day(recent, "c1", "facebook") == 2
+
+
+def test_split_legacy_csv_into_partitions(tmp_path: Path):
+    csv_path = tmp_path / "log.csv"
+    legacy = CsvLogStore(csv_path)
+    _append_on(legacy, date(2026, 1, 1))
+    _append_on(legacy, date(2026, 1, 2))
+    _append_on(legacy, date(2026, 1, 2), slot_id="s2")
+
+    store = PartitionedCsvLogStore(csv_path)
+    assert split_into_partitions(csv_path, store) == 3
+    assert store.count_success_for_day(date(2026, 1, 2), "c1", "facebook") == 2
+    assert len(store.partitions()) == 2
+
+    # A second run copies only rows the partitions do not hold yet.
+    assert split_into_partitions(csv_path, store) == 0
+    _append_on(legacy, date(2026, 1, 2), slot_id="s3")
+    store.maintain(date(2026, 1, 5))  # copies s3, sets the file aside and gzips Jan 1 and Jan 2
+    migrated = csv_path.with_name("log.csv.migrated")
+    assert not csv_path.exists()
+    assert split_into_partitions(migrated, store) == 0
+    assert store.count_success_for_day(date(2026, 1, 1), "c1", "facebook") == 1
+    assert store.count_success_for_day(date(2026, 1, 2), "c1", "facebook") == 3
+
+
+def test_partitioned_store_takes_over_a_single_file_log(tmp_path: Path):
+    csv_path = tmp_path / "log.csv"
+    legacy = CsvLogStore(csv_path)
+    _append_on(legacy, date(2026, 1, 1))
+    _append_on(legacy, date(2026, 1, 2))
+
+    store = PartitionedCsvLogStore(csv_path)
+    store.maintain(date(2026, 1, 2))
+    assert not csv_path.exists()
+    assert csv_path.with_name("log.csv.migrated").exists()
+    assert store.count_success_for_day(date(2026, 1, 1), "c1", "facebook") == 1
+    assert store.has_success_for_slot(date(2026, 1, 2), "c1", "s1", "facebook")
@@ -1,4 +1,6 @@
 import asyncio
+import sys
+from pathlib import Path
 
 import pytest
 
@@ -16,3 +18,80 @@ async def test_mcp_client_fake_mode():
         assert res.success
         assert res.post_id.startswith("sim-")
 
+
+
+FAKE_SERVER = str(Path(__file__).with_name("fake_mcp_server.py"))
+
+
+def _real_client(**overrides) -> MCPClient:
+    cfg = FacebookMCPConfig(command=sys.executable, args=[FAKE_SERVER], **overrides)
+    return MCPClient(cfg, fake_mode=False)
+
+
+@pytest.mark.asyncio
+async def test_mcp_client_handshake_and_concurrent_calls():
+    async with _real_client() as mcp:
+        assert mcp.greeting == "FakeMCP 0.1"
+        assert await mcp.list_tools() == ["post_to_facebook"]
+        results = await asyncio.gather(
+            mcp.post_text(page_id="p1", message="slow:0.3"),
+            mcp.post_text(page_id="p1", message="slow:0.1"),
+            mcp.post_text(page_id="p1", message="fast"),
+        )
+    assert [r.post_id for r in results] == ["p1_slow:0.3", "p1_slow:0.1", "p1_fast"]
+    assert all(r.success for r in results)
+
+
+@pytest.mark.asyncio
+async def test_mcp_client_timeout_does_not_block_other_calls():
+    async with _real_client(call_timeout_seconds=0.5) as mcp:
+        hung, ok = await asyncio.gather(
+            mcp.post_text(page_id="p1", message="hang"),
+            mcp.post_text(page_id="p1", message="fast"),
+        )
+    assert not hung.success and hung.error.startswith("Timeout waiting for MCP response")
+    assert ok.success and ok.post_id == "p1_fast"
+
+
+@pytest.mark.asyncio
+async def test_mcp_client_reconnects_dead_process():
+    mcp = _real_client()
+    await mcp.ensure_connected()
+    first = mcp.proc
+    assert mcp.is_alive
+
+    await mcp.ensure_connected()
+    assert mcp.proc is first
+
+    with pytest.raises(ConnectionError):
+        await mcp.post_text(page_id="p1", message="die")
+    await first.wait()
+    assert not mcp.is_alive
+    await mcp.ensure_connected()
+    assert mcp.is_alive and mcp.proc is not first
+    res = await mcp.post_text(page_id="p1", message="again")
+    assert res.success
+    await mcp.close()
+
+
+@pytest.mark.asyncio
+async def test_mcp_client_circuit_breaker_fails_fast_and_recovers():
+    async with _real_client(call_timeout_seconds=0.3, breaker_threshold=2, breaker_reset_seconds=0.5) as mcp:
+        hung = await asyncio.gather(
+            mcp.post_text(page_id="p1", message="hang"),
+            mcp.post_text(page_id="p1", message="hang"),
+        )
+        assert all(r.error.startswith("Timeout waiting for MCP response") for r in hung)
+        assert mcp.breaker.is_open
+
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        blocked = await mcp.post_text(page_id="p1", message="fast")
+        assert loop.time() - start < 0.1
+        assert not blocked.success and "circuit open" in blocked.error
+
+        await asyncio.sleep(0.5)
+        # The ping probe succeeds, so the circuit closes and the post goes through.
+        res = await mcp.post_text(page_id="p1", message="fast")
+        assert res.success and res.post_id == "p1_fast"
+        assert not mcp.breaker.is_open
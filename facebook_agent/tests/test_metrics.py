@@ -0,0 +1,31 @@
+from facebook_agent.agent.metrics import CycleMetrics, Histogram
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram(buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        hist.observe(value)
+    assert list(hist.cumulative())[:2] == [(0.1, 2), (1.0, 3)]
+    assert list(hist.cumulative())[-1][1] == 4
+    assert hist.max == 3.0
+
+
+def test_span_and_export(tmp_path):
+    ticks = iter([0.0, 0.2, 1.0, 1.5])
+    metrics = CycleMetrics(clock=lambda: next(ticks))
+    with metrics.span("llm"):
+        pass
+    with metrics.span("llm"):
+        pass
+    metrics.inc("posts_attempted", 2)
+
+    prom_path, json_path = metrics.write(tmp_path / "posts_log.csv")
+    assert prom_path.name == "posts_log.prom"
+    text = prom_path.read_text(encoding="utf-8")
+    assert 'facebook_agent_cycle_stage_seconds_bucket{stage="llm",le="0.25"} 1' in text
+    assert 'facebook_agent_cycle_stage_seconds_bucket{stage="llm",le="+Inf"} 2' in text
+    assert 'facebook_agent_cycle_stage_seconds_count{stage="llm"} 2' in text
+    summary = metrics.summary()
+    assert summary["stages"]["llm"]["sum_seconds"] == 0.7
+    assert summary["counters"] == {"posts_attempted": 2}
+    assert json_path.exists()
@@ -1,9 +1,10 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from zoneinfo import ZoneInfo
 
 from facebook_agent.agent.logger_csv import append_log
 from facebook_agent.agent.models import ClientConfig
-from facebook_agent.agent.scheduler import get_due_slots_for_client
+from facebook_agent.agent.scheduler import SlotQueue, get_due_slots_for_client, next_fire_time
 
 
 def _sample_client():
@@ -61,3 +62,99 @@ def test_duplicate_prevents_run(tmp_path: Path):
     due = get_due_slots_for_client(client, now, log_path=log_path, tolerance_minutes=15, platform="facebook")
     assert due == []
 
+
+
+def _client_with_slots(client_id: str, slots, tz="Europe/Bucharest"):
+    data = _sample_client().model_dump()
+    data.update(client_id=client_id, schedule={"timezone": tz, "slots": slots})
+    data.pop("slots")
+    return ClientConfig.model_validate(data)
+
+
+def _slot(slot_id, time, days=(1, 2, 3, 4, 5, 6, 7)):
+    return {"id": slot_id, "days_of_week": list(days), "time": time, "platforms": ["facebook"], "campaign": "camp1"}
+
+
+def _due_ids(queue, now):
+    return [(client.client_id, [s.id for s, _ in slots]) for client, slots in queue.due(now)]
+
+
+def test_next_fire_time_spring_forward_gap():
+    client = _client_with_slots("c1", [_slot("s1", "03:30")])
+    tz = ZoneInfo("Europe/Bucharest")
+    # 2026-03-29 03:00 EET jumps to 04:00 EEST; 03:30 does not exist that day.
+    fire = next_fire_time(client.slots[0], tz, datetime(2026, 3, 28, 23, 0, tzinfo=timezone.utc))
+    assert fire == datetime(2026, 3, 29, 1, 30, tzinfo=timezone.utc)
+    assert fire.astimezone(tz).strftime("%H:%M %Z") == "04:30 EEST"
+    nxt = next_fire_time(client.slots[0], tz, fire + timedelta(seconds=1))
+    assert nxt == datetime(2026, 3, 30, 0, 30, tzinfo=timezone.utc)
+
+
+def test_slot_queue_fall_back_fires_once():
+    # 2026-10-25 04:00 EEST falls back to 03:00 EET; 03:30 happens twice.
+    client = _client_with_slots("c1", [_slot("s1", "03:30")])
+    start = datetime(2026, 10, 24, 22, 0, tzinfo=timezone.utc)
+    queue = SlotQueue.build([client], start, tolerance_minutes=15)
+    assert queue.next_wakeup() == datetime(2026, 10, 25, 0, 15, tzinfo=timezone.utc)
+
+    fired = []
+    now = start
+    while now < datetime(2026, 10, 25, 3, 0, tzinfo=timezone.utc):
+        if queue.due(now):
+            fired.append(now)
+        now += timedelta(minutes=5)
+    # one window around the first 03:30 (00:30 UTC), none around the repeated one (01:30 UTC)
+    assert fired[0] == datetime(2026, 10, 25, 0, 15, tzinfo=timezone.utc)
+    assert fired[-1] == datetime(2026, 10, 25, 0, 45, tzinfo=timezone.utc)
+    assert queue.next_wakeup() == datetime(2026, 10, 26, 1, 15, tzinfo=timezone.utc)
+
+
+def test_slot_queue_without_early_window_opens_at_fire_time():
+    client = _client_with_slots("c1", [_slot("s1", "09:00")])
+    start = datetime(2026, 1, 2, 6, 0, tzinfo=timezone.utc)
+    fire = datetime(2026, 1, 2, 7, 0, tzinfo=timezone.utc)  # 09:00 in Bucharest
+    queue = SlotQueue.build([client], start, tolerance_minutes=15, open_early=False)
+    assert queue.next_wakeup() == fire
+    assert queue.due(fire - timedelta(minutes=5)) == []
+    assert [fired for _, slots in queue.due(fire) for _, fired in slots] == [fire]
+    # A late tick still catches up within the tolerance.
+    assert queue.due(fire + timedelta(minutes=15))
+    assert queue.due(fire + timedelta(minutes=16)) == []
+
+
+def test_slot_queue_matches_tick_scheduler(tmp_path: Path):
+    client = _sample_client()
+    now = datetime(2026, 1, 2, 7, 10, tzinfo=timezone.utc)
+    queue = SlotQueue.build([client], now - timedelta(hours=1), tolerance_minutes=15)
+    expected = get_due_slots_for_client(client, now, log_path=tmp_path / "log.csv", tolerance_minutes=15)
+    assert _due_ids(queue, now) == [("c1", [slot.id for slot, _ in expected])]
+    # the window stays active for retries until it closes
+    assert _due_ids(queue, now + timedelta(minutes=5)) == [("c1", ["slot1"])]
+    assert _due_ids(queue, now + timedelta(minutes=10)) == []
+
+
+def test_slot_queue_scales_with_due_slots():
+    weekdays = [_slot("morning", "09:00", days=(1, 2, 3, 4, 5)), _slot("evening", "18:30", days=(2, 4))]
+    clients = [
+        _client_with_slots(f"c{i}", weekdays + [_slot("late", f"{10 + i % 8}:00")]) for i in range(5000)
+    ]
+    start = datetime(2026, 1, 1, 22, 0, tzinfo=timezone.utc)  # Fri 00:00 in Bucharest
+    queue = SlotQueue.build(clients, start, tolerance_minutes=15)
+    assert len(queue) == 5000 * 3  # one heap entry per slot
+
+    due = queue.due(datetime(2026, 1, 2, 7, 0, tzinfo=timezone.utc))  # Fri 09:00 local
+    assert len(due) == 5000
+    assert all([s.id for s, _ in slots] == ["morning"] for _, slots in due)
+
+    due = queue.due(datetime(2026, 1, 2, 9, 0, tzinfo=timezone.utc))  # Fri 11:00 local
+    assert sorted({c.client_id for c, _ in due}) == sorted(f"c{i}" for i in range(5000) if i % 8 == 1)
+
+
+def test_slot_queue_replaces_and_removes_clients():
+    now = datetime(2026, 1, 2, 7, 0, tzinfo=timezone.utc)
+    queue = SlotQueue.build([_client_with_slots("c1", [_slot("s1", "09:00")])], now - timedelta(hours=1))
+    queue.add_client(_client_with_slots("c1", [_slot("s2", "09:05")]), now)
+    queue.add_client(_client_with_slots("c2", [_slot("s1", "09:00")]), now)
+    assert _due_ids(queue, now) == [("c1", ["s2"]), ("c2", ["s1"])]
+    queue.remove_client("c1")
+    assert _due_ids(queue, now) == [("c2", ["s1"])]